@@ -1,11 +1,22 @@
+import tempfile
 from pathlib import Path
 
 from maccor_utility.read import MaccorDataRawFile
+from maccor_utility.synthetic import SyntheticRawFile, write_synthetic_raw_file
 
 # To read a raw file, use the following code
 # The test file is not included in this repository, use your own file
 cwd = Path(__file__)
 path2file = cwd.parents[1] / "test_data" / "231004_test_data_raw.024"
-file = MaccorDataRawFile(path2file)
+if path2file.exists():
+    file = MaccorDataRawFile(path2file)
+else:
+    # Without a raw file or on non-Windows operating systems: a synthetic test,
+    # read through a stand-in for the Maccor DLL. Written to a temporary directory,
+    # not into the source tree
+    path2file = write_synthetic_raw_file(
+        Path(tempfile.mkdtemp()) / "synthetic.024", num_records=10_000
+    )
+    file = SyntheticRawFile(path2file)
 file.read()
 data = file.data
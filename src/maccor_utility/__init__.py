@@ -1,10 +1,14 @@
-from importlib.metadata import PackageNotFoundError, version
+def __getattr__(name: str):
+    """Look up the version on first access, as importlib.metadata is slow to import"""
+    if name != "__version__":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib.metadata import PackageNotFoundError, version
 
-try:
-    # Change here if project is renamed and does not equal the package name
-    dist_name = "maccor-utility"
-    __version__ = version(dist_name)
-except PackageNotFoundError:  # pragma: no cover
-    __version__ = "unknown"
-finally:
-    del version, PackageNotFoundError
+    try:
+        # Change here if project is renamed and does not equal the package name
+        dist_name = "maccor-utility"
+        __version__ = version(dist_name)
+    except PackageNotFoundError:  # pragma: no cover
+        __version__ = "unknown"
+    globals()["__version__"] = __version__
+    return __version__
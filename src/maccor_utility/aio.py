@@ -0,0 +1,328 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+__docformat__ = "NumPy"
+__author__ = "Lukas Gold, Simon Stier"
+
+__doc__ = """
+asyncio API to read Maccor data files without blocking the event loop. Example:
+
+    async with AsyncMaccorReader(max_concurrency=4) as reader:
+        async for chunk in reader.iter_chunks("test.txt", MaccorDataFormat.mims_server2):
+            ...
+"""
+
+# Python version dependent import statement:
+try:
+    from enum import StrEnum
+except ImportError:
+    from strenum import StrEnum
+
+import asyncio
+import multiprocessing
+import os
+import weakref
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from queue import Empty
+
+import pandas as pd
+from typing_extensions import AsyncIterator, Optional, Union
+
+from maccor_utility.helper_functions import to_plain
+from maccor_utility.progress import CancellationToken
+from maccor_utility.read import (
+    MaccorDataFormat,
+    MaccorDataRawFile,
+    MaccorDataTxtFile,
+    iter_maccor_data_file,
+    read_maccor_data_file,
+)
+
+# Constants
+DEFAULT_MAX_CONCURRENCY = os.cpu_count() or 1  # Files read at the same time
+QUEUE_SIZE = 2  # Chunks buffered per file read in a worker process
+POLL_INTERVAL = 0.1  # in s, to check whether the worker process is still alive
+_END = "__end__"  # Marks the last chunk on the queue
+
+_default_reader: Optional["AsyncMaccorReader"] = None
+
+
+# Classes
+class ExecutorType(StrEnum):
+    thread = "thread"  # Text exports: the pandas parser releases the GIL
+    process = "process"  # Raw files: the record loop holds the GIL
+
+
+class AsyncMaccorReader(object):
+    """Reads Maccor data files in executors, awaitable from asyncio. Text exports are
+    parsed in a thread pool, raw files in a process pool by default. At most
+    'max_concurrency' files are read at the same time, further reads wait.
+
+    Parameters
+    ----------
+    max_concurrency : int
+        Number of files read at the same time
+    max_workers : int
+        Number of threads and processes of the pools. Defaults to 'max_concurrency'.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_workers: Optional[int] = None,
+    ):
+        self.max_concurrency = max(int(max_concurrency), 1)
+        self.max_workers = max_workers or self.max_concurrency
+        # Waiting for the queues of worker processes also takes a thread
+        self._threads = ThreadPoolExecutor(max_workers=2 * self.max_workers)
+        self._processes: Optional[ProcessPoolExecutor] = None
+        self._manager = None
+        # One semaphore per event loop, as they are bound to the loop of first use
+        self._semaphores = weakref.WeakKeyDictionary()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        self.close()
+
+    def close(self):
+        self._threads.shutdown(wait=False)
+        if self._processes is not None:
+            self._processes.shutdown(wait=False)
+        if self._manager is not None:
+            self._manager.shutdown()
+
+    async def read(
+        self,
+        file_path: Union[str, Path],
+        frmt: MaccorDataFormat,
+        dll_path: Optional[Union[str, Path]] = None,
+        meta_only: bool = False,
+        executor: Optional[ExecutorType] = None,
+    ) -> Union[MaccorDataRawFile, MaccorDataTxtFile]:
+        """Read a file like read_maccor_data_file. The test parameters of raw files
+        read in a process are returned as str instead of ctypes string buffers."""
+        executor_type = _get_executor_type(frmt, executor)
+        async with self._get_semaphore():
+            return await asyncio.get_running_loop().run_in_executor(
+                self._get_executor(executor_type),
+                _read,
+                file_path,
+                frmt,
+                dll_path,
+                meta_only,
+                executor_type == ExecutorType.process,
+            )
+
+    async def iter_chunks(
+        self,
+        file_path: Union[str, Path],
+        frmt: MaccorDataFormat,
+        chunksize: int = 100_000,
+        dll_path: Optional[Union[str, Path]] = None,
+        executor: Optional[ExecutorType] = None,
+    ) -> AsyncIterator[pd.DataFrame]:
+        """Read a file chunk by chunk like iter_maccor_data_file. The file counts
+        against 'max_concurrency' until the iteration ends. Leaving the iteration
+        early closes the file."""
+        executor_type = _get_executor_type(frmt, executor)
+        async with self._get_semaphore():
+            if executor_type == ExecutorType.thread:
+                chunks = self._iter_in_thread(file_path, frmt, chunksize, dll_path)
+            else:
+                chunks = self._iter_in_process(file_path, frmt, chunksize, dll_path)
+            async for chunk in chunks:
+                yield chunk
+
+    async def _iter_in_thread(
+        self,
+        file_path: Union[str, Path],
+        frmt: MaccorDataFormat,
+        chunksize: int,
+        dll_path: Optional[Union[str, Path]],
+    ) -> AsyncIterator[pd.DataFrame]:
+        loop = asyncio.get_running_loop()
+        chunks = iter_maccor_data_file(
+            file_path, frmt=frmt, chunksize=chunksize, dll_path=dll_path
+        )
+        try:
+            while True:
+                chunk = await loop.run_in_executor(self._threads, next, chunks, None)
+                if chunk is None:
+                    break
+                yield chunk
+        finally:
+            await loop.run_in_executor(self._threads, chunks.close)
+
+    async def _iter_in_process(
+        self,
+        file_path: Union[str, Path],
+        frmt: MaccorDataFormat,
+        chunksize: int,
+        dll_path: Optional[Union[str, Path]],
+    ) -> AsyncIterator[pd.DataFrame]:
+        """The worker process puts the chunks on a bounded queue, so that it reads
+        ahead at most QUEUE_SIZE chunks"""
+        loop = asyncio.get_running_loop()
+        manager = self._get_manager()
+        queue = manager.Queue(maxsize=QUEUE_SIZE)
+        stop = manager.Event()
+        future = self._get_executor(ExecutorType.process).submit(
+            _put_chunks,
+            queue,
+            stop,
+            file_path,
+            frmt,
+            chunksize,
+            dll_path,
+        )
+        try:
+            while True:
+                item = await loop.run_in_executor(
+                    self._threads, _get_item, queue, future
+                )
+                if isinstance(item, str) and item == _END:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            if not future.done():
+                stop.set()
+                # Unblock the worker if it waits for space on the queue
+                await loop.run_in_executor(self._threads, _drain, queue, future)
+            await asyncio.wrap_future(future)
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if loop not in self._semaphores:
+            self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphores[loop]
+
+    def _get_executor(self, executor_type: ExecutorType) -> Executor:
+        if executor_type == ExecutorType.thread:
+            return self._threads
+        if self._processes is None:
+            self._processes = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._processes
+
+    def _get_manager(self):
+        if self._manager is None:
+            self._manager = multiprocessing.Manager()
+        return self._manager
+
+
+# Functions
+async def read_maccor_data_file_async(
+    file_path: Union[str, Path],
+    frmt: MaccorDataFormat,
+    dll_path: Optional[Union[str, Path]] = None,
+    meta_only: bool = False,
+) -> Union[MaccorDataRawFile, MaccorDataTxtFile]:
+    """Awaitable read_maccor_data_file, using a shared AsyncMaccorReader with the
+    default concurrency cap"""
+    return await get_default_reader().read(
+        file_path, frmt=frmt, dll_path=dll_path, meta_only=meta_only
+    )
+
+
+async def iter_maccor_data_file_async(
+    file_path: Union[str, Path],
+    frmt: MaccorDataFormat,
+    chunksize: int = 100_000,
+    dll_path: Optional[Union[str, Path]] = None,
+) -> AsyncIterator[pd.DataFrame]:
+    """Async iterator over the chunks of iter_maccor_data_file, using a shared
+    AsyncMaccorReader with the default concurrency cap"""
+    async for chunk in get_default_reader().iter_chunks(
+        file_path, frmt=frmt, chunksize=chunksize, dll_path=dll_path
+    ):
+        yield chunk
+
+
+def get_default_reader() -> AsyncMaccorReader:
+    global _default_reader
+    if _default_reader is None:
+        _default_reader = AsyncMaccorReader()
+    return _default_reader
+
+
+def _get_executor_type(
+    frmt: MaccorDataFormat, executor: Optional[ExecutorType]
+) -> ExecutorType:
+    if executor is not None:
+        return ExecutorType(executor)
+    if frmt == MaccorDataFormat.raw:
+        return ExecutorType.process
+    return ExecutorType.thread
+
+
+def _read(
+    file_path: Union[str, Path],
+    frmt: MaccorDataFormat,
+    dll_path: Optional[Union[str, Path]],
+    meta_only: bool,
+    picklable: bool,
+) -> Union[MaccorDataRawFile, MaccorDataTxtFile]:
+    result = read_maccor_data_file(
+        file_path, frmt=frmt, dll_path=dll_path, meta_only=meta_only
+    )
+    if picklable and result.meta is not None:
+        result.meta = to_plain(result.meta)
+    return result
+
+
+def _put_chunks(
+    queue,
+    stop,
+    file_path: Union[str, Path],
+    frmt: MaccorDataFormat,
+    chunksize: int,
+    dll_path: Optional[Union[str, Path]],
+):
+    """Worker process: put the chunks on the queue until 'stop' is set"""
+    try:
+        for chunk in iter_maccor_data_file(
+            file_path,
+            frmt=frmt,
+            chunksize=chunksize,
+            dll_path=dll_path,
+            cancel=CancellationToken(event=stop),
+        ):
+            queue.put(chunk)
+        queue.put(_END)
+    except BaseException as e:
+        if not stop.is_set():
+            queue.put(e)
+
+
+def _get_item(queue, future):
+    """Next item of the queue. Raises the error of the worker process, if it ended
+    without putting the last item, e.g., as it crashed (BrokenProcessPool)."""
+    while True:
+        try:
+            return queue.get(timeout=POLL_INTERVAL)
+        except Empty:
+            if not future.done():
+                continue
+        try:  # The worker may have put its last item right before it finished
+            return queue.get_nowait()
+        except Empty:
+            error = future.exception()
+            if error is None:
+                error = RuntimeError("The worker process ended without all chunks!")
+            raise error
+
+
+def _drain(queue, future):
+    """Empty the queue until the worker process finished"""
+    while not future.done():
+        try:
+            queue.get(timeout=0.05)
+        except Exception:
+            pass
+
+
+# Line before the last line of the file
@@ -0,0 +1,262 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+__docformat__ = "NumPy"
+__author__ = "Lukas Gold, Simon Stier"
+
+__doc__ = """
+Export of parsed Maccor results to Apache Arrow, e.g., for DuckDB or Polars. Numeric
+columns are wrapped without copying. The units of the columns are stored in the
+field metadata ('unit'), the format and the meta data of the file in the schema
+metadata. The results also implement the Arrow PyCapsule interface
+(__arrow_c_stream__), so that, e.g., polars.from_arrow() takes them directly.
+"""
+
+import ctypes
+import datetime
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from batt_utility.helper_functions import inverse_dict_one_to_x
+from typing_extensions import Any, Dict, Iterable, Iterator, Optional, Union
+
+from maccor_utility.lookup import MACCOR_COLUMN_UNITS
+from maccor_utility.read import (
+    MaccorDataFormat,
+    MaccorDataRawFile,
+    MaccorDataTxtFile,
+    MaccorTabularData,
+    Translations,
+    cast_chunk,
+    get_chunk_columns,
+    get_column_dtypes,
+    reindex_chunk,
+)
+
+# Optional dependency
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+# Constants
+FORMAT_KEY = b"maccor.data_format"
+META_KEY = b"maccor.meta"  # Meta data of the file as JSON
+UNIT_KEY = b"unit"
+ZERO_COPY_KINDS = "iufM"  # NumPy dtype kinds Arrow can wrap without copying
+
+
+# Functions
+def to_arrow_table(
+    data: Union[pd.DataFrame, MaccorTabularData, MaccorDataRawFile, MaccorDataTxtFile],
+    data_format: Optional[MaccorDataFormat] = None,
+    meta: Optional[dict] = None,
+) -> "pyarrow.Table":
+    """The time series of a parsed Maccor result as Arrow table. Numeric columns
+    without missing values share the buffers of the DataFrame, i.e., are not copied.
+    NaN is kept as value, not as null.
+
+    Parameters
+    ----------
+    data : pandas.DataFrame or MaccorTabularData or MaccorDataRawFile or
+        MaccorDataTxtFile
+        The parsed time series
+    data_format : MaccorDataFormat
+        Format of the column names of DataFrames, to look up the units. Taken from
+        'data' otherwise. Defaults to raw.
+    meta : dict
+        Meta data of the file, stored as JSON in the schema metadata. Taken from
+        reader results, if None.
+    """
+    _require_pyarrow()
+    if isinstance(data, (MaccorDataRawFile, MaccorDataTxtFile)):
+        if data.data is None:
+            raise ValueError("The file was not read yet, call read() first!")
+        meta = data.meta if meta is None else meta
+        data = data.data
+    if isinstance(data, MaccorTabularData):
+        data_format = data.data_format if data_format is None else data_format
+        data = data.as_dataframe
+    if data_format is None:
+        data_format = MaccorDataFormat.raw
+    arrays = {str(name): _to_arrow_array(data[name]) for name in data.columns}
+    schema = get_arrow_schema(arrays, data_format, meta)
+    return pyarrow.Table.from_arrays(
+        [arrays[field.name].cast(field.type) for field in schema], schema=schema
+    )
+
+
+def get_arrow_schema(
+    arrays: Dict[str, Union["pyarrow.Array", "pyarrow.DataType"]],
+    data_format: MaccorDataFormat = MaccorDataFormat.raw,
+    meta: Optional[dict] = None,
+) -> "pyarrow.Schema":
+    """Schema of the columns, with the units as field metadata and the format and
+    'meta' as schema metadata. Columns without any value are typed as strings, so
+    that later chunks with values can be cast to the schema. 'arrays' may also
+    hold the types of the columns."""
+    units = get_column_units(arrays.keys(), data_format)
+    fields = []
+    for name, array in arrays.items():
+        arrow_type = array if isinstance(array, pyarrow.DataType) else array.type
+        if pyarrow.types.is_null(arrow_type):
+            arrow_type = pyarrow.string()
+        metadata = {UNIT_KEY: units[name].encode()} if name in units else None
+        fields.append(pyarrow.field(name, arrow_type, metadata=metadata))
+    metadata = {FORMAT_KEY: MaccorDataFormat(data_format).value.encode()}
+    if meta is not None:
+        metadata[META_KEY] = json.dumps(meta, default=_to_json).encode()
+    return pyarrow.schema(fields, metadata=metadata)
+
+
+def get_arrow_type(dtype: Any) -> "pyarrow.DataType":
+    """Arrow type of the pandas data types of read.get_column_dtypes: Int64 as
+    nullable int64, object as string"""
+    _require_pyarrow()
+    if str(dtype) == "Int64":
+        return pyarrow.int64()
+    if str(dtype) == "object":
+        return pyarrow.string()
+    return pyarrow.from_numpy_dtype(np.dtype(dtype))
+
+
+def get_column_units(
+    columns: Iterable[str], data_format: MaccorDataFormat = MaccorDataFormat.raw
+) -> Dict[str, str]:
+    """Units of the columns as in MACCOR_COLUMN_UNITS. Columns are looked up by
+    their raw name and by their name in 'data_format'. Columns without a known unit
+    are left out."""
+    to_raw = inverse_dict_one_to_x(
+        Translations[MaccorDataFormat(data_format).name].table
+    )
+    units = {}
+    for column in columns:
+        unit = MACCOR_COLUMN_UNITS.get(
+            column, MACCOR_COLUMN_UNITS.get(to_raw.get(column))
+        )
+        if unit:
+            units[column] = unit
+    return units
+
+
+def get_meta(schema: "pyarrow.Schema") -> Optional[dict]:
+    """The meta data of the file stored in the schema metadata, if any"""
+    if schema.metadata is None or META_KEY not in schema.metadata:
+        return None
+    return json.loads(schema.metadata[META_KEY])
+
+
+def iter_arrow_batches(
+    file_path: Union[str, Path],
+    frmt: MaccorDataFormat,
+    chunksize: int = 100_000,
+    dll_path: Optional[Union[str, Path]] = None,
+    **kwargs: Any,
+) -> "pyarrow.RecordBatchReader":
+    """Read a Maccor data file chunk by chunk as stream of Arrow record batches with
+    raw column names. The schema holds the columns of the first chunk and, for raw
+    files, the further columns declared by the header, e.g., 'Var' columns of later
+    records. The types follow the column schema of the raw file, not the values of
+    the first chunk, see read.get_column_dtypes: integer fields are nullable int64,
+    other numeric columns float64. Columns not in the schema raise a ValueError.
+    The meta data of the file is stored in the schema metadata.
+
+    Parameters
+    ----------
+    file_path : str or Path
+        The path to the file
+    frmt : MaccorDataFormat
+        The format of the file
+    chunksize : int
+        The number of records per batch
+    dll_path : str or Path
+        The path to the DLL file - only required to read raw files
+    kwargs : Any
+        Passed to the reader, e.g., 'metrics', 'progress' or 'cancel'
+
+    Returns
+    -------
+    pyarrow.RecordBatchReader
+        Also passable to consumers of the Arrow C stream interface
+    """
+    _require_pyarrow()
+    frmt = MaccorDataFormat(frmt)
+    if frmt == MaccorDataFormat.raw:
+        reader = MaccorDataRawFile(file_path, dll_path=dll_path, **kwargs)
+    else:
+        reader = MaccorDataTxtFile(file_path=file_path, export_format=frmt, **kwargs)
+    chunks = reader.iter_chunks(chunksize=chunksize)
+    first = next(chunks, None)
+    if first is None:
+        first = pd.DataFrame()
+    # The header and the meta data are available once the first chunk was read
+    first = reindex_chunk(first, get_chunk_columns(reader, first))
+    dtypes = get_column_dtypes(first)
+    schema = get_arrow_schema(
+        {str(name): get_arrow_type(dtype) for name, dtype in dtypes.items()},
+        MaccorDataFormat.raw,
+        reader.meta,
+    )
+    first_batch = _to_record_batch(first, schema, dtypes)
+    return pyarrow.RecordBatchReader.from_batches(
+        schema, _iter_batches(first_batch, chunks, schema, dtypes)
+    )
+
+
+def _iter_batches(
+    first_batch: "pyarrow.RecordBatch",
+    chunks: Iterator[pd.DataFrame],
+    schema: "pyarrow.Schema",
+    dtypes: Dict[str, str],
+) -> Iterator["pyarrow.RecordBatch"]:
+    try:
+        if first_batch.num_rows > 0:
+            yield first_batch
+        for chunk in chunks:
+            yield _to_record_batch(chunk, schema, dtypes)
+    finally:
+        chunks.close()
+
+
+def _to_record_batch(
+    chunk: pd.DataFrame, schema: "pyarrow.Schema", dtypes: Dict[str, str]
+) -> "pyarrow.RecordBatch":
+    """The chunk with the columns and types of the schema. Columns missing in the
+    chunk are null, further columns raise a ValueError."""
+    chunk = cast_chunk(reindex_chunk(chunk, schema.names), dtypes)
+    arrays = [_to_arrow_array(chunk[field.name]).cast(field.type) for field in schema]
+    return pyarrow.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def _to_arrow_array(series: pd.Series) -> "pyarrow.Array":
+    """Wrap numeric values without copying, convert the others with missing values
+    as nulls"""
+    if isinstance(series.dtype, np.dtype) and series.dtype.kind in ZERO_COPY_KINDS:
+        return pyarrow.array(series.to_numpy())
+    return pyarrow.array(series, from_pandas=True)
+
+
+def _to_json(value: Any) -> Any:
+    """JSON representation of the values in 'meta' not serializable by default"""
+    if isinstance(value, ctypes.Array):
+        return value.value
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, bytes):
+        return value.decode(errors="replace")
+    return str(value)
+
+
+def _require_pyarrow():
+    if pyarrow is None:
+        raise ImportError(
+            "The Arrow export requires the package 'pyarrow'. Install it with "
+            "'pip install maccor-utility[arrow]'."
+        )
+
+
+# Line before the last line of the file
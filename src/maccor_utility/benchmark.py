@@ -0,0 +1,353 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+__docformat__ = "NumPy"
+__author__ = "Lukas Gold, Simon Stier"
+
+__doc__ = """
+Benchmarks of reading synthetic Maccor files of all formats, renaming columns,
+parsing the meta data and importing the package in a fresh interpreter. Time and peak memory are compared to a stored baseline, a
+regression fails the run. Example:
+
+    python -m maccor_utility.benchmark --baseline benchmarks/baseline.json
+
+Timings are stored relative to a calibration workload, so that baselines recorded
+on another machine remain comparable.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel
+from typing_extensions import Callable, Dict, List, Optional, Union
+
+from maccor_utility.read import (
+    MaccorDataFormat,
+    MaccorTabularData,
+    read_maccor_data_file,
+    rename_columns,
+)
+from maccor_utility.synthetic import (
+    SyntheticRawFile,
+    generate_records,
+    write_synthetic_file,
+)
+
+# Constants
+DEFAULT_NUM_RECORDS = 50_000
+DEFAULT_REPEAT = 3  # The fastest run counts
+DEFAULT_TOLERANCE = 0.5  # Allowed relative increase of time and peak memory
+MIN_SECONDS = 0.01  # Shorter timings are too noisy to be compared
+MIN_PEAK_MEMORY = 1.0  # in MB, smaller peaks are not compared
+CALIBRATION_RECORDS = 200_000
+# Imported in a fresh interpreter, incl. the start of the interpreter
+IMPORT_CASES = {
+    "import_package": "maccor_utility",
+    "import_read": "maccor_utility.read",
+}
+BYTES_PER_MB = 2**20
+
+
+# Classes
+class BenchmarkResult(BaseModel):
+    name: str
+    num_records: int
+    seconds: float  # Fastest of the repeats
+    relative: float  # 'seconds' divided by the time of the calibration workload
+    peak_memory: Optional[float] = None  # in MB, as traced by tracemalloc
+    records_per_second: float
+
+
+# Functions
+def run_benchmarks(
+    num_records: int = DEFAULT_NUM_RECORDS,
+    repeat: int = DEFAULT_REPEAT,
+    seed: int = 0,
+    directory: Optional[Union[str, Path]] = None,
+    memory: bool = True,
+) -> List[BenchmarkResult]:
+    """Write a synthetic test in each format and run all benchmarks on it
+
+    Parameters
+    ----------
+    num_records : int
+        Records of the synthetic tests
+    repeat : int
+        Runs per benchmark, the fastest counts
+    seed : int
+        Seed of the synthetic tests
+    directory : str or Path
+        Directory of the synthetic files. A temporary directory if None.
+    memory : bool
+        Trace the peak memory in an additional run of each benchmark. Tracing slows
+        down the run by about an order of magnitude.
+    """
+    with contextlib.ExitStack() as stack:
+        if directory is None:
+            directory = stack.enter_context(tempfile.TemporaryDirectory())
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        cases = get_cases(directory, num_records, seed)
+        calibration = _best_time(_calibration_workload, repeat)
+        return [
+            _run_case(name, func, num_records, repeat, calibration, memory)
+            for name, func in cases.items()
+        ]
+
+
+def get_cases(
+    directory: Path, num_records: int, seed: int = 0
+) -> Dict[str, Callable[[], object]]:
+    """The benchmarks by name, reading the synthetic files written to 'directory'"""
+    cases = {}
+    for frmt in MaccorDataFormat:
+        file_path = write_synthetic_file(
+            directory / f"synthetic_{frmt.name}.txt", frmt, num_records, seed=seed
+        )
+        if frmt == MaccorDataFormat.raw:
+            cases["read_raw"] = lambda path=file_path: SyntheticRawFile(path).read()
+            cases["meta_raw"] = lambda path=file_path: SyntheticRawFile(
+                path
+            ).read_meta()
+        else:
+            cases[f"read_{frmt.name}"] = lambda path=file_path, f=frmt: (
+                read_maccor_data_file(path, frmt=f)
+            )
+    server2_file = directory / f"synthetic_{MaccorDataFormat.mims_server2.name}.txt"
+    cases["meta_mims_server2"] = lambda: read_maccor_data_file(
+        server2_file, frmt=MaccorDataFormat.mims_server2, meta_only=True
+    )
+    records = generate_records(num_records, seed=seed)
+    cases["rename_columns"] = lambda: rename_columns(
+        records,
+        input_format=MaccorDataFormat.raw,
+        target_format=MaccorDataFormat.mims_server2,
+    )
+    data = MaccorTabularData(
+        as_list=records.to_dict(orient="records"), data_format=MaccorDataFormat.raw
+    )
+
+    def change_column_names():
+        # Back and forth, so that each run starts from raw column names
+        data.change_column_names(MaccorDataFormat.maccor_export2)
+        data.change_column_names(MaccorDataFormat.raw)
+
+    cases["change_column_names"] = change_column_names
+    for name, module in IMPORT_CASES.items():
+        cases[name] = lambda module=module: _import_in_subprocess(module)
+    return cases
+
+
+def compare_to_baseline(
+    results: List[BenchmarkResult],
+    baseline: Dict[str, dict],
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> List[str]:
+    """Regressions of the results against the baseline, as messages. Benchmarks not
+    in the baseline or run with another number of records are skipped."""
+    regressions = []
+    for result in results:
+        base = baseline.get(result.name)
+        if base is None or base["num_records"] != result.num_records:
+            continue
+        limit = 1 + tolerance
+        if result.seconds >= MIN_SECONDS and result.relative > base["relative"] * limit:
+            regressions.append(
+                f"{result.name}: time {result.relative:.2f} > {limit:.2f} x "
+                f"baseline {base['relative']:.2f} (relative to calibration)"
+            )
+        if (
+            result.peak_memory is not None
+            and base["peak_memory"] is not None
+            and base["peak_memory"] >= MIN_PEAK_MEMORY
+            and result.peak_memory > base["peak_memory"] * limit
+        ):
+            regressions.append(
+                f"{result.name}: peak memory {result.peak_memory:.1f} MB > "
+                f"{limit:.2f} x baseline {base['peak_memory']:.1f} MB"
+            )
+    return regressions
+
+
+def load_baseline(file_path: Union[str, Path]) -> Dict[str, dict]:
+    return json.loads(Path(file_path).read_text(encoding="utf-8"))
+
+
+def save_baseline(results: List[BenchmarkResult], file_path: Union[str, Path]):
+    file_path = Path(file_path)
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    baseline = {result.name: result.model_dump() for result in results}
+    file_path.write_text(json.dumps(baseline, indent=2) + "\n", encoding="utf-8")
+
+
+def format_results(results: List[BenchmarkResult]) -> str:
+    """The results as table for the console"""
+    lines = [f"{'Benchmark':<24}{'s':>10}{'relative':>10}{'MB':>10}{'records/s':>14}"]
+    for result in results:
+        peak_memory = "-" if result.peak_memory is None else f"{result.peak_memory:.1f}"
+        lines.append(
+            f"{result.name:<24}{result.seconds:>10.3f}{result.relative:>10.2f}"
+            f"{peak_memory:>10}{result.records_per_second:>14.0f}"
+        )
+    return "\n".join(lines)
+
+
+def parse_args(args: List[str]) -> argparse.Namespace:
+    """Parse command line parameters
+
+    Parameters
+    ----------
+    args : list of str
+        Command line parameters, e.g., ["--help"]
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark reading synthetic Maccor files against a baseline"
+    )
+    parser.add_argument(
+        "-n",
+        "--records",
+        type=int,
+        default=DEFAULT_NUM_RECORDS,
+        help="Records of the synthetic files (default: %(default)s)",
+    )
+    parser.add_argument(
+        "-r",
+        "--repeat",
+        type=int,
+        default=DEFAULT_REPEAT,
+        help="Runs per benchmark, the fastest counts (default: %(default)s)",
+    )
+    parser.add_argument(
+        "-b", "--baseline", default=None, help="JSON file of the baseline"
+    )
+    parser.add_argument(
+        "-u",
+        "--update-baseline",
+        action="store_true",
+        help="Store the results as new baseline instead of comparing",
+    )
+    parser.add_argument(
+        "--no-memory",
+        dest="memory",
+        action="store_false",
+        help="Skip tracing the peak memory, which takes most of the time",
+    )
+    parser.add_argument(
+        "-t",
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="Allowed relative increase of time and memory (default: %(default)s)",
+    )
+    return parser.parse_args(args)
+
+
+def main(args: List[str]) -> int:
+    """Run the benchmarks. Returns the exit code: 1 if a benchmark regressed against
+    the baseline, 2 if the baseline does not exist (use '--update-baseline' to store
+    it), else 0."""
+    parsed = parse_args(args)
+    if (
+        parsed.baseline is not None
+        and not parsed.update_baseline
+        and not Path(parsed.baseline).exists()
+    ):
+        print(
+            f"Baseline '{parsed.baseline}' not found, store it with "
+            f"'--update-baseline'",
+            file=sys.stderr,
+        )
+        return 2
+    results = run_benchmarks(
+        num_records=parsed.records, repeat=parsed.repeat, memory=parsed.memory
+    )
+    print(format_results(results))
+    if parsed.baseline is None:
+        return 0
+    if parsed.update_baseline:
+        save_baseline(results, parsed.baseline)
+        print(f"Stored the baseline in '{parsed.baseline}'")
+        return 0
+    regressions = compare_to_baseline(
+        results, load_baseline(parsed.baseline), tolerance=parsed.tolerance
+    )
+    for regression in regressions:
+        print(f"Regression: {regression}")
+    return int(len(regressions) > 0)
+
+
+def run():
+    """Entry point for 'python -m maccor_utility.benchmark'"""
+    sys.exit(main(sys.argv[1:]))
+
+
+def _run_case(
+    name: str,
+    func: Callable[[], object],
+    num_records: int,
+    repeat: int,
+    calibration: float,
+    memory: bool = True,
+) -> BenchmarkResult:
+    seconds = _best_time(func, repeat)
+    peak_memory = None
+    if memory:
+        # Traced separately, as tracing slows down the allocations
+        tracemalloc.start()
+        try:
+            _quiet(func)
+            peak_memory = tracemalloc.get_traced_memory()[1] / BYTES_PER_MB
+        finally:
+            tracemalloc.stop()
+    return BenchmarkResult(
+        name=name,
+        num_records=num_records,
+        seconds=seconds,
+        relative=seconds / calibration,
+        peak_memory=peak_memory,
+        records_per_second=num_records / max(seconds, 1e-9),
+    )
+
+
+def _import_in_subprocess(module: str):
+    subprocess.run([sys.executable, "-c", f"import {module}"], check=True)
+
+
+def _best_time(func: Callable[[], object], repeat: int) -> float:
+    seconds = []
+    for _ in range(max(repeat, 1)):
+        start = time.perf_counter()
+        _quiet(func)
+        seconds.append(time.perf_counter() - start)
+    return min(seconds)
+
+
+def _quiet(func: Callable[[], object]):
+    """Run 'func' without its console output, e.g., of the raw reader"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        func()
+
+
+def _calibration_workload():
+    """Fixed mix of parsing, vectorized and per-row work, like the readers"""
+    values = np.arange(CALIBRATION_RECORDS, dtype=np.float64) / 7
+    text = "\n".join(f"{value:.4f}\t{index}" for index, value in enumerate(values))
+    df = pd.read_csv(io.StringIO(text), sep="\t", header=None)
+    df.to_dict(orient="records")
+
+
+if __name__ == "__main__":
+    run()
+
+
+# Line before the last line of the file
@@ -0,0 +1,358 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+__docformat__ = "NumPy"
+__author__ = "Lukas Gold, Simon Stier"
+
+import contextlib
+import datetime
+import fnmatch
+import io
+import json
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel
+from typing_extensions import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from maccor_utility.helper_functions import column_to_numeric
+from maccor_utility.read import (
+    MaccorDataFormat,
+    MaccorDataRawFile,
+    MaccorDataTxtFile,
+)
+
+# Constants
+DEFAULT_PATTERNS = {"*.[0-9][0-9][0-9]": MaccorDataFormat.raw}  # Raw files, e.g. .024
+DEFAULT_EXCLUDE = ("*.000",)  # Test procedures, not data files
+DELPHI_EPOCH = datetime.datetime(year=1899, month=12, day=30)
+CATALOG_COLUMNS = {  # Column: SQLite type
+    "path": "TEXT PRIMARY KEY",
+    "format": "TEXT",
+    "size": "INTEGER",
+    "mtime_ns": "INTEGER",
+    "test_name": "TEXT",  # Of text exports: the name of the raw file, w/o extension
+    "procedure": "TEXT",  # Not stored in text exports, NULL for them
+    "channel": "INTEGER",
+    "start_date_time": "REAL",  # Days since the Delphi epoch, like 'DPtTime'
+    "file_type": "INTEGER",
+    "mass": "REAL",
+    "num_records": "INTEGER",
+    "first_cycle": "INTEGER",
+    "last_cycle": "INTEGER",
+    "header": "TEXT",  # All header data as JSON
+    "error": "TEXT",  # Error message, if the file could not be read
+}
+
+
+# Classes
+class ScanSummary(BaseModel):
+    num_scanned: int = 0  # New or changed files, read
+    num_unchanged: int = 0
+    num_removed: int = 0  # Files no longer present, removed from the catalog
+    num_failed: int = 0  # Files that could not be read
+
+
+class Catalog(object):
+    """Local SQLite catalog of the header data of Maccor files. A rescan only reads
+    files that are new or whose size or modification time changed.
+
+    Parameters
+    ----------
+    db_path : str or Path
+        The SQLite database, created if it does not exist
+    """
+
+    def __init__(self, db_path: Union[str, Path]):
+        self.db_path = Path(db_path)
+        self.connection = sqlite3.connect(str(self.db_path))
+        columns = ", ".join(f"{col} {typ}" for col, typ in CATALOG_COLUMNS.items())
+        with self.connection:
+            self.connection.execute(f"CREATE TABLE IF NOT EXISTS files ({columns})")
+            for col in ["channel", "procedure", "start_date_time"]:
+                self.connection.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_{col} ON files ({col})"
+                )
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def scan(
+        self,
+        directories: Iterable[Union[str, Path]],
+        patterns: Optional[Dict[str, MaccorDataFormat]] = None,
+        read_records: bool = False,
+        prune: bool = True,
+        max_workers: Optional[int] = None,
+        dll_path: Optional[Union[str, Path]] = None,
+        exclude: Optional[Iterable[str]] = None,
+    ) -> ScanSummary:
+        """Scan directories recursively and add new or changed files to the catalog
+
+        Parameters
+        ----------
+        directories : iterable of str or Path
+            Directories to scan
+        patterns : dict
+            File name pattern (fnmatch): format of the matching files. Defaults to raw
+            files with a three-digit extension. Text exports need to be added, e.g.,
+            {'*.txt': MaccorDataFormat.mims_server2}.
+        read_records : bool
+            Read all records to get the number of records and the cycle range. Else,
+            only the header is read and the number of records is taken from
+            'LastRecNum' of raw files.
+        prune : bool
+            Remove files within the directories that no longer exist
+        max_workers : int
+            Number of processes reading the files, defaults to the number of CPUs.
+            1 reads the files in this process.
+        dll_path : str or Path
+            The path to the DLL file - only required to read raw files
+        exclude : iterable of str
+            File name patterns (fnmatch) to skip even if they match 'patterns'.
+            Defaults to test procedures ('*.000').
+        """
+        patterns = DEFAULT_PATTERNS if patterns is None else patterns
+        exclude = DEFAULT_EXCLUDE if exclude is None else tuple(exclude)
+        summary = ScanSummary()
+        found = {}  # path: (format, size, mtime_ns)
+        for directory in directories:
+            for root, _, file_names in os.walk(directory):
+                for file_name in file_names:
+                    if any(fnmatch.fnmatch(file_name, pat) for pat in exclude):
+                        continue
+                    frmt = _match_format(file_name, patterns)
+                    if frmt is None:
+                        continue
+                    path = str(Path(root, file_name).resolve())
+                    stat = os.stat(path)
+                    found[path] = (frmt, stat.st_size, stat.st_mtime_ns)
+        known = {
+            path: (size, mtime_ns)
+            for path, size, mtime_ns in self.connection.execute(
+                "SELECT path, size, mtime_ns FROM files"
+            )
+        }
+        to_scan = [
+            (path, frmt, size, mtime_ns)
+            for path, (frmt, size, mtime_ns) in found.items()
+            if known.get(path) != (size, mtime_ns)
+        ]
+        summary.num_unchanged = len(found) - len(to_scan)
+        if max_workers == 1 or len(to_scan) <= 1:
+            rows = [_scan_file(*args, read_records, dll_path) for args in to_scan]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                rows = list(
+                    executor.map(
+                        _scan_file,
+                        *zip(*to_scan),
+                        [read_records] * len(to_scan),
+                        [dll_path] * len(to_scan),
+                        chunksize=max(1, len(to_scan) // 64),
+                    )
+                )
+        summary.num_scanned = len(rows)
+        summary.num_failed = sum(row["error"] is not None for row in rows)
+        with self.connection:
+            self.connection.executemany(
+                f"INSERT OR REPLACE INTO files ({', '.join(CATALOG_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(CATALOG_COLUMNS))})",
+                [tuple(row[col] for col in CATALOG_COLUMNS) for row in rows],
+            )
+            if prune:
+                roots = [str(Path(directory).resolve()) for directory in directories]
+                removed = [
+                    (path,)
+                    for path in known
+                    if path not in found
+                    and any(_is_relative_to(path, root) for root in roots)
+                ]
+                self.connection.executemany("DELETE FROM files WHERE path = ?", removed)
+                summary.num_removed = len(removed)
+        return summary
+
+    def query(
+        self,
+        channel: Optional[int] = None,
+        procedure: Optional[str] = None,
+        test_name: Optional[str] = None,
+        since: Optional[datetime.datetime] = None,
+        until: Optional[datetime.datetime] = None,
+        frmt: Optional[MaccorDataFormat] = None,
+        include_failed: bool = False,
+    ) -> List[Tuple[Path, MaccorDataFormat]]:
+        """Files matching all given criteria, ordered by their start, as tuples
+        (file_path, format) ready for read_maccor_data_file. 'procedure' and
+        'test_name' may contain the SQL wildcards '%' and '_'."""
+        return [
+            (Path(path), MaccorDataFormat(frmt))
+            for path, frmt in self._select(
+                "path, format",
+                channel=channel,
+                procedure=procedure,
+                test_name=test_name,
+                since=since,
+                until=until,
+                frmt=frmt,
+                include_failed=include_failed,
+            )
+        ]
+
+    def to_dataframe(self, **criteria: Any) -> pd.DataFrame:
+        """All catalog columns of the files matching the criteria of query()"""
+        return pd.DataFrame(
+            self._select(", ".join(CATALOG_COLUMNS), **criteria),
+            columns=list(CATALOG_COLUMNS),
+        )
+
+    def _select(
+        self,
+        columns: str,
+        channel: Optional[int] = None,
+        procedure: Optional[str] = None,
+        test_name: Optional[str] = None,
+        since: Optional[datetime.datetime] = None,
+        until: Optional[datetime.datetime] = None,
+        frmt: Optional[MaccorDataFormat] = None,
+        include_failed: bool = False,
+    ) -> List[tuple]:
+        conditions, params = [], []
+        for condition, value in [
+            ("channel = ?", channel),
+            ("procedure LIKE ?", procedure),
+            ("test_name LIKE ?", test_name),
+            ("start_date_time >= ?", _to_delphi(since)),
+            ("start_date_time <= ?", _to_delphi(until)),
+            ("format = ?", None if frmt is None else str(MaccorDataFormat(frmt))),
+        ]:
+            if value is not None:
+                conditions.append(condition)
+                params.append(value)
+        if not include_failed:
+            conditions.append("error IS NULL")
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        return self.connection.execute(
+            f"SELECT {columns} FROM files{where} ORDER BY start_date_time, path",
+            params,
+        ).fetchall()
+
+
+# Functions
+def _scan_file(
+    path: str,
+    frmt: MaccorDataFormat,
+    size: int,
+    mtime_ns: int,
+    read_records: bool,
+    dll_path: Optional[Union[str, Path]],
+) -> Dict[str, Any]:
+    """Catalog row of a file. Errors are stored in the row instead of raised, the
+    console output of the readers is suppressed."""
+    row = {col: None for col in CATALOG_COLUMNS}
+    row.update({"path": path, "format": str(frmt), "size": size, "mtime_ns": mtime_ns})
+    with contextlib.redirect_stdout(io.StringIO()):
+        try:
+            if frmt == MaccorDataFormat.raw:
+                reader = MaccorDataRawFile(file_path=path, dll_path=dll_path)
+                meta = reader.read_meta()
+                header = meta["Header data"]
+                row.update(
+                    {
+                        "test_name": _to_str(meta.get("Test name")),
+                        "procedure": _to_str(meta.get("Test procedure")),
+                        "channel": header.get("TestChan"),
+                        "start_date_time": header.get("StartDateTime"),
+                        "file_type": header.get("FileType"),
+                        "mass": header.get("Mass"),
+                        "num_records": header.get("LastRecNum"),
+                        "header": json.dumps(header, default=str),
+                    }
+                )
+            else:
+                reader = MaccorDataTxtFile(file_path=path, export_format=frmt)
+                chunks = reader.iter_chunks(chunksize=1)
+                try:
+                    first_chunk = next(chunks, None)
+                finally:
+                    # Closes the file
+                    chunks.close()
+                if first_chunk is not None and "DPtTime" in first_chunk:
+                    start = column_to_numeric(first_chunk["DPtTime"])[0]
+                    row["start_date_time"] = None if np.isnan(start) else float(start)
+                row["test_name"] = _get_test_name(reader.meta, path)
+                row["header"] = json.dumps(reader.meta, default=str)
+            if read_records:
+                row.update(_count_records(reader))
+        except Exception as e:
+            row["error"] = f"{type(e).__name__}: {e}"
+    return row
+
+
+def _count_records(
+    reader: Union[MaccorDataRawFile, MaccorDataTxtFile],
+) -> Dict[str, Any]:
+    """Number of records and cycle range, chunk by chunk"""
+    num_records, first_cycle, last_cycle = 0, np.inf, -np.inf
+    chunks = reader.iter_chunks()
+    try:
+        for chunk in chunks:
+            num_records += len(chunk)
+            if "CycleNumProc" in chunk and len(chunk) > 0:
+                cycle = column_to_numeric(chunk["CycleNumProc"])
+                first_cycle = np.fmin(first_cycle, np.nanmin(cycle))
+                last_cycle = np.fmax(last_cycle, np.nanmax(cycle))
+    finally:
+        chunks.close()
+    return {
+        "num_records": num_records,
+        "first_cycle": int(first_cycle) if np.isfinite(first_cycle) else None,
+        "last_cycle": int(last_cycle) if np.isfinite(last_cycle) else None,
+    }
+
+
+def _get_test_name(meta: Optional[dict], path: str) -> str:
+    """Name of the raw file the text export was made from, without its extension,
+    e.g., 'test' for 'test.024'. Taken from the file name of the export, if the
+    header does not contain it."""
+    file_name = (meta or {}).get("Filename") or Path(path).name
+    return str(file_name).split(".")[0]
+
+
+def _match_format(
+    file_name: str, patterns: Dict[str, MaccorDataFormat]
+) -> Optional[MaccorDataFormat]:
+    for pattern, frmt in patterns.items():
+        if fnmatch.fnmatch(file_name, pattern):
+            return MaccorDataFormat(frmt)
+    return None
+
+
+def _is_relative_to(path: str, root: str) -> bool:
+    return path == root or path.startswith(root.rstrip(os.sep) + os.sep)
+
+
+def _to_delphi(value: Optional[datetime.datetime]) -> Optional[float]:
+    if value is None:
+        return None
+    return (value - DELPHI_EPOCH) / datetime.timedelta(days=1)
+
+
+def _to_str(value: Any) -> Optional[str]:
+    """Value of a ctypes string buffer or the value itself as string"""
+    if value is None:
+        return None
+    return str(getattr(value, "value", value))
+
+
+# Line before the last line of the file
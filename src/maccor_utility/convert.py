@@ -0,0 +1,423 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+__docformat__ = "NumPy"
+__author__ = "Lukas Gold, Simon Stier"
+
+__doc__ = """
+Console script 'maccor-convert' to convert Maccor data files to Parquet, Arrow IPC or
+CSV, chunk by chunk. Example:
+
+    maccor-convert "data/*.024" --input-format raw --to parquet --output-dir out
+"""
+
+# Python version dependent import statement:
+try:
+    from enum import StrEnum
+except ImportError:
+    from strenum import StrEnum
+
+import argparse
+import glob
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+from pydantic import BaseModel
+from typing_extensions import List, Optional, Sequence, Union
+
+import maccor_utility
+from maccor_utility.arrow import get_arrow_type
+from maccor_utility.read import (
+    MaccorDataFormat,
+    MaccorDataRawFile,
+    MaccorDataTxtFile,
+    cast_chunk,
+    get_chunk_columns,
+    get_column_dtypes,
+    reindex_chunk,
+    rename_columns,
+)
+
+# Optional dependency for Parquet and Arrow IPC output
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# Constants
+# Rough upper estimate of the memory per record while reading, incl. the row dicts
+# of raw files
+BYTES_PER_RECORD = 2048
+DEFAULT_MAX_MEMORY = 1024  # in MB, for all workers together
+MIN_CHUNKSIZE = 1_000
+
+_logger = logging.getLogger(__name__)
+
+
+# Classes
+class OutputFormat(StrEnum):
+    parquet = "parquet"
+    arrow = "arrow"  # Arrow IPC file
+    csv = "csv"
+
+
+class ConversionStats(BaseModel):
+    file_path: str
+    output_path: str
+    num_records: int = 0
+    num_bytes: int = 0  # Size of the input file
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+
+class _ChunkWriter(object):
+    """Appends chunks to one output file. The schema of Parquet and Arrow files is
+    taken from the data types of the first chunk, which are fixed per file by
+    read.get_column_dtypes, later chunks are cast to it."""
+
+    def __init__(self, output_path: Path, output_format: OutputFormat):
+        if output_format != OutputFormat.csv and pyarrow is None:
+            raise ImportError(
+                f"Writing {output_format} requires the package 'pyarrow'. Install it "
+                f"with 'pip install maccor-utility[arrow]'."
+            )
+        self.output_path = output_path
+        self.output_format = output_format
+        self._writer = None
+        self._schema = None
+        self._first = True
+
+    def write(self, chunk: pd.DataFrame):
+        if self.output_format == OutputFormat.csv:
+            chunk.to_csv(
+                self.output_path,
+                mode="w" if self._first else "a",
+                header=self._first,
+                index=False,
+            )
+        else:
+            if self._schema is None:
+                self._schema = pyarrow.schema(
+                    [
+                        (str(name), get_arrow_type(dtype))
+                        for name, dtype in chunk.dtypes.items()
+                    ]
+                )
+            table = pyarrow.Table.from_pandas(
+                chunk, schema=self._schema, preserve_index=False
+            )
+            if self._writer is None:
+                if self.output_format == OutputFormat.parquet:
+                    self._writer = pyarrow.parquet.ParquetWriter(
+                        str(self.output_path), self._schema
+                    )
+                else:
+                    self._writer = pyarrow.ipc.new_file(
+                        str(self.output_path), self._schema
+                    )
+            self._writer.write_table(table)
+        self._first = False
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        elif self._first and self.output_format == OutputFormat.csv:
+            self.output_path.write_text("")
+
+
+# Functions
+def convert_file(
+    file_path: Union[str, Path],
+    frmt: MaccorDataFormat,
+    output_path: Union[str, Path],
+    output_format: OutputFormat = OutputFormat.parquet,
+    naming: MaccorDataFormat = MaccorDataFormat.raw,
+    chunksize: int = 100_000,
+    dll_path: Optional[Union[str, Path]] = None,
+    overwrite: bool = False,
+) -> ConversionStats:
+    """Convert one Maccor data file chunk by chunk. All chunks are written with the
+    columns of the first chunk and, for raw files, the columns declared by the header,
+    e.g., 'Var' columns that only appear later in the test. Missing values are NaN.
+    The data types follow the column schema of the raw file, see
+    read.get_column_dtypes. Errors are returned in the stats instead of raised, the
+    partial output file is removed.
+
+    Parameters
+    ----------
+    file_path : str or Path
+        The file to convert
+    frmt : MaccorDataFormat
+        The format of the file
+    output_path : str or Path
+        The file to write
+    output_format : OutputFormat
+        Parquet, Arrow IPC or CSV
+    naming : MaccorDataFormat
+        Column names of the output, e.g., raw or one of the export formats
+    chunksize : int
+        Number of records held in memory at once
+    dll_path : str or Path
+        The path to the DLL file - only required to read raw files
+    overwrite : bool
+        Replace an existing output file. Else, the conversion fails.
+    """
+    start = time.perf_counter()
+    stats = ConversionStats(
+        file_path=str(file_path),
+        output_path=str(output_path),
+        num_bytes=os.path.getsize(file_path),
+    )
+    writer = None
+    try:
+        if not overwrite and Path(output_path).exists():
+            raise FileExistsError(f"Output file '{output_path}' exists already!")
+        writer = _ChunkWriter(Path(output_path), OutputFormat(output_format))
+        if MaccorDataFormat(frmt) == MaccorDataFormat.raw:
+            reader = MaccorDataRawFile(file_path=file_path, dll_path=dll_path)
+        else:
+            reader = MaccorDataTxtFile(file_path=file_path, export_format=frmt)
+        columns = dtypes = None
+        for chunk in reader.iter_chunks(chunksize=chunksize):
+            if columns is None:
+                columns = get_chunk_columns(reader, chunk)
+                dtypes = get_column_dtypes(reindex_chunk(chunk, columns))
+            chunk = cast_chunk(reindex_chunk(chunk, columns), dtypes)
+            if naming != MaccorDataFormat.raw:
+                chunk = rename_columns(
+                    chunk, input_format=MaccorDataFormat.raw, target_format=naming
+                )
+            writer.write(chunk)
+            stats.num_records += len(chunk)
+    except Exception as e:
+        stats.error = f"{type(e).__name__}: {e}"
+    finally:
+        if writer is not None:
+            writer.close()
+    if stats.error is not None and writer is not None:
+        # No partial output
+        Path(output_path).unlink(missing_ok=True)
+    stats.seconds = time.perf_counter() - start
+    return stats
+
+
+def convert_files(
+    file_paths: Sequence[Union[str, Path]],
+    frmt: MaccorDataFormat,
+    output_dir: Union[str, Path],
+    output_format: OutputFormat = OutputFormat.parquet,
+    naming: MaccorDataFormat = MaccorDataFormat.raw,
+    max_memory: float = DEFAULT_MAX_MEMORY,
+    max_workers: Optional[int] = None,
+    dll_path: Optional[Union[str, Path]] = None,
+    overwrite: bool = False,
+) -> List[ConversionStats]:
+    """Convert several files in a process pool. The chunk size of each worker is
+    derived from 'max_memory' in MB, shared by all workers, and BYTES_PER_RECORD.
+    The output files are named after the input files plus the extension of the
+    output format, e.g., 'test.024.parquet', in the directories of the input files
+    relative to their common parent directory, so that files of the same name in
+    different directories do not collide. Existing output files are only replaced
+    with 'overwrite'."""
+    max_workers = max_workers or os.cpu_count() or 1
+    max_workers = max(1, min(max_workers, len(file_paths)))
+    chunksize = max(
+        MIN_CHUNKSIZE, int(max_memory * 2**20 / max_workers / BYTES_PER_RECORD)
+    )
+    output_paths = get_output_paths(file_paths, output_dir, output_format)
+    for output_path in set(output_paths):
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+    args = [
+        (
+            file_path,
+            frmt,
+            output_path,
+            output_format,
+            naming,
+            chunksize,
+            dll_path,
+            overwrite,
+        )
+        for file_path, output_path in zip(file_paths, output_paths)
+    ]
+    if max_workers == 1:
+        return [convert_file(*arg) for arg in args]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(convert_file, *zip(*args)))
+
+
+def get_output_paths(
+    file_paths: Sequence[Union[str, Path]],
+    output_dir: Union[str, Path],
+    output_format: OutputFormat,
+) -> List[Path]:
+    """Output file of each input file, see convert_files. Inputs on different drives
+    are numbered instead, e.g., 'test.024.1.parquet', if their names collide."""
+    extension = OutputFormat(output_format).value
+    resolved = [Path(file_path).resolve() for file_path in file_paths]
+    if len(resolved) == 0:
+        return []
+    try:
+        root = Path(os.path.commonpath([path.parent for path in resolved]))
+    except ValueError:  # Different drives
+        root = None
+    output_paths = []
+    for path in resolved:
+        if root is not None:
+            output_paths.append(
+                Path(output_dir)
+                / path.parent.relative_to(root)
+                / f"{path.name}.{extension}"
+            )
+            continue
+        name, number = f"{path.name}.{extension}", 0
+        while Path(output_dir) / name in output_paths:
+            number += 1
+            name = f"{path.name}.{number}.{extension}"
+        output_paths.append(Path(output_dir) / name)
+    return output_paths
+
+
+def format_summary(stats: Sequence[ConversionStats], seconds: float) -> str:
+    """Throughput of a conversion for the console"""
+    num_records = sum(stat.num_records for stat in stats)
+    num_mb = sum(stat.num_bytes for stat in stats) / 2**20
+    num_failed = sum(stat.error is not None for stat in stats)
+    seconds = max(seconds, 1e-9)
+    return (
+        f"Converted {len(stats) - num_failed} of {len(stats)} files: "
+        f"{num_records} records, {num_mb:.1f} MB in {seconds:.2f} s "
+        f"({num_records / seconds:.0f} records/s, {num_mb / seconds:.1f} MB/s)"
+    )
+
+
+def parse_args(args: List[str]) -> argparse.Namespace:
+    """Parse command line parameters
+
+    Parameters
+    ----------
+    args : list of str
+        Command line parameters, e.g., ["--help"]
+    """
+    parser = argparse.ArgumentParser(
+        description="Convert Maccor data files to Parquet, Arrow IPC or CSV"
+    )
+    parser.add_argument(
+        "--version",
+        action="version",
+        version=f"maccor-utility {maccor_utility.__version__}",
+    )
+    parser.add_argument("inputs", nargs="+", help="Files or glob patterns")
+    parser.add_argument(
+        "-f",
+        "--input-format",
+        required=True,
+        choices=[frmt.name for frmt in MaccorDataFormat],
+        help="Format of the input files",
+    )
+    parser.add_argument(
+        "-t",
+        "--to",
+        default=OutputFormat.parquet.value,
+        choices=[frmt.value for frmt in OutputFormat],
+        help="Output format (default: %(default)s)",
+    )
+    parser.add_argument(
+        "-o",
+        "--output-dir",
+        default=".",
+        help="Output directory (default: %(default)s)",
+    )
+    parser.add_argument(
+        "-n",
+        "--naming",
+        default=MaccorDataFormat.raw.name,
+        choices=[frmt.name for frmt in MaccorDataFormat],
+        help="Column names of the output (default: %(default)s)",
+    )
+    parser.add_argument(
+        "-m",
+        "--max-memory",
+        type=float,
+        default=DEFAULT_MAX_MEMORY,
+        help="Approximate memory ceiling in MB for all workers (default: %(default)s)",
+    )
+    parser.add_argument(
+        "-w", "--workers", type=int, default=None, help="Number of worker processes"
+    )
+    parser.add_argument("--dll-path", default=None, help="Path to the Maccor DLL")
+    parser.add_argument(
+        "--overwrite", action="store_true", help="Replace existing output files"
+    )
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        dest="loglevel",
+        action="store_const",
+        const=logging.INFO,
+        default=logging.WARNING,
+        help="Set the log level to INFO",
+    )
+    return parser.parse_args(args)
+
+
+def expand_inputs(inputs: Sequence[str]) -> List[str]:
+    """Expand glob patterns, as not all shells do. Files are listed once."""
+    file_paths = []
+    for pattern in inputs:
+        matches = sorted(glob.glob(pattern, recursive=True)) or [pattern]
+        file_paths.extend(path for path in matches if path not in file_paths)
+    return file_paths
+
+
+def main(args: List[str]) -> int:
+    """Convert the files given on the command line. Returns the exit code: 0 if all
+    files were converted, else 1."""
+    parsed = parse_args(args)
+    logging.basicConfig(
+        level=parsed.loglevel,
+        stream=sys.stdout,
+        format="[%(asctime)s] %(levelname)s:%(name)s:%(message)s",
+    )
+    file_paths = expand_inputs(parsed.inputs)
+    start = time.perf_counter()
+    stats = convert_files(
+        file_paths,
+        frmt=MaccorDataFormat[parsed.input_format],
+        output_dir=parsed.output_dir,
+        output_format=OutputFormat(parsed.to),
+        naming=MaccorDataFormat[parsed.naming],
+        max_memory=parsed.max_memory,
+        max_workers=parsed.workers,
+        dll_path=parsed.dll_path,
+        overwrite=parsed.overwrite,
+    )
+    for stat in stats:
+        if stat.error is not None:
+            _logger.error(f"{stat.file_path}: {stat.error}")
+        else:
+            _logger.info(
+                f"{stat.file_path} -> {stat.output_path}: {stat.num_records} records "
+                f"in {stat.seconds:.2f} s"
+            )
+    print(format_summary(stats, time.perf_counter() - start))
+    return int(any(stat.error is not None for stat in stats))
+
+
+def run():
+    """Entry point of the console script 'maccor-convert'"""
+    sys.exit(main(sys.argv[1:]))
+
+
+if __name__ == "__main__":
+    run()
+
+
+# Line before the last line of the file
@@ -0,0 +1,323 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+__docformat__ = "NumPy"
+__author__ = "Lukas Gold, Simon Stier"
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from batt_utility.data_models import (
+    DecimalSeparator,
+    Encoding,
+    ReadTableResult,
+    ThousandsSeparator,
+)
+from pydantic import ConfigDict
+from typing_extensions import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    Optional,
+    Self,
+    Tuple,
+    Union,
+)
+
+from maccor_utility.helper_functions import column_to_numeric, get_segment_bounds
+from maccor_utility.read import get_raw_dataframe
+
+# Constants
+DTYPE_SAMPLE_ROWS = 1000  # Rows read to determine the dtypes of the columns
+
+
+# Classes
+class MaccorCycleStatsFile(ReadTableResult):
+    """Cycle statistics export, one row per cycle. The dtypes of the columns are
+    determined once from the first rows (or given explicitly), so that all chunks
+    share them. The lines above the column names are stored in 'meta'.
+
+    Parameters
+    ----------
+    file_path : str or Path
+        The path to the file
+    header : int
+        Number of non-empty lines above the column names
+    dtypes : dict
+        Column name: dtype. Determined by read_dtypes() if None.
+    """
+
+    file_path: Union[str, Path]
+    meta: Optional[dict] = None
+    data: Optional[pd.DataFrame] = None
+    header: int = 6
+    decimal: DecimalSeparator = DecimalSeparator.comma
+    thousands: ThousandsSeparator = ThousandsSeparator.none
+    encoding: Encoding = Encoding.cp1252
+    dtypes: Optional[Dict[str, str]] = None
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    def read(self) -> Self:
+        """Read the whole file. If an integer column holds a decimal value after the
+        rows read_dtypes() looked at, it is read as float64 instead."""
+        self.read_meta()
+        try:
+            self.data = pd.read_table(
+                filepath_or_buffer=self.file_path, **self.read_params()
+            )
+        except (TypeError, ValueError):
+            if "Int64" not in self.dtypes.values():
+                raise
+            self.dtypes = {
+                col: "float64" if dtype == "Int64" else dtype
+                for col, dtype in self.dtypes.items()
+            }
+            self.data = pd.read_table(
+                filepath_or_buffer=self.file_path, **self.read_params()
+            )
+        return self
+
+    def iter_chunks(self, chunksize: int = 100_000) -> Iterator[pd.DataFrame]:
+        """Read the file chunk by chunk
+
+        Parameters
+        ----------
+        chunksize : int
+            Number of cycles per chunk
+        """
+        self.read_meta()
+        with pd.read_table(
+            filepath_or_buffer=self.file_path, chunksize=chunksize, **self.read_params()
+        ) as reader:
+            yield from reader
+
+    def read_params(self) -> Dict[str, Any]:
+        """Keyword arguments for pandas.read_table"""
+        if self.dtypes is None:
+            self.read_dtypes()
+        return {**self._base_params(), "dtype": self.dtypes}
+
+    def read_dtypes(self, num_rows: int = DTYPE_SAMPLE_ROWS) -> Dict[str, str]:
+        """Determine the dtypes from the first 'num_rows' rows: 'Int64' for the cycle
+        column, if integer, 'float64' for all other numeric and 'object' for all
+        other columns. Other integer columns are read as float64, as a decimal value
+        after the first rows would fail the read."""
+        sample = pd.read_table(
+            filepath_or_buffer=self.file_path, nrows=num_rows, **self._base_params()
+        )
+        cycle_column = _find_cycle_column(sample.columns)
+        self.dtypes = {}
+        for col in sample.columns:
+            if col == cycle_column and pd.api.types.is_integer_dtype(sample[col]):
+                self.dtypes[col] = "Int64"
+            elif pd.api.types.is_numeric_dtype(sample[col]):
+                self.dtypes[col] = "float64"
+            else:
+                self.dtypes[col] = "object"
+        return self.dtypes
+
+    def read_meta(self) -> dict:
+        """Parse the lines above the column names, e.g., 'Key:\tValue', without
+        reading the rest of the file"""
+        self.meta = {}
+        num_lines = 0
+        with open(self.file_path, encoding=self.encoding.value) as file:
+            for line in file:
+                if num_lines >= self.header:
+                    break
+                if line.strip() == "":
+                    continue
+                num_lines += 1
+                fields = [field.strip() for field in line.rstrip("\r\n").split("\t")]
+                key = fields[0].rstrip(":")
+                values = [field for field in fields[1:] if field != ""]
+                if len(values) == 0 and ":" in key:
+                    key, value = key.split(":", 1)
+                    values = [value.strip()]
+                if key != "":
+                    self.meta[key] = values[0] if len(values) == 1 else values
+        return self.meta
+
+    @property
+    def cycle_column(self) -> Optional[str]:
+        """The first column whose name starts with 'Cyc', e.g., 'Cycle' or 'Cyc#'"""
+        columns = self.dtypes if self.dtypes is not None else self.read_dtypes()
+        return _find_cycle_column(columns)
+
+    def _base_params(self) -> Dict[str, Any]:
+        return {
+            "sep": "\t",
+            "header": self.header,
+            "decimal": self.decimal.value,
+            "thousands": self.thousands.value,
+            "encoding": self.encoding.value,
+            "index_col": False,
+        }
+
+
+class MaccorCyclingDataFile(MaccorCycleStatsFile):
+    """Cycling data export, e.g., read by read.import_maccor_cycling_data: one line
+    above the column names, a point as decimal and a comma as thousands separator.
+    See MaccorCycleStatsFile."""
+
+    header: int = 1
+    decimal: DecimalSeparator = DecimalSeparator.point
+    thousands: ThousandsSeparator = ThousandsSeparator.comma
+    encoding: Encoding = Encoding.utf8
+
+
+class CycleIndex(object):
+    """Row range (and 'RecNum' range) of each cycle of a time series. The cycle
+    numbers are kept sorted, with the ranges in arrays of the same order and a dict
+    from the cycle number to its position, so that the records of a cycle are found
+    in O(1). Memory grows with the number of cycles, not with the largest cycle
+    number. Chunks are processed one after the other. A cycle that is interrupted by
+    other cycles covers all its records and everything in between.
+
+    Parameters
+    ----------
+    column : str
+        Cycle column of the time series (raw column name)
+    """
+
+    def __init__(self, column: str = "CycleNumProc"):
+        self.column = column
+        self.num_records = 0
+        self.cycles = np.zeros(0, dtype=np.int64)  # Sorted cycle numbers
+        self.starts = np.zeros(0, dtype=np.int64)  # Row of the first record
+        self.ends = np.zeros(0, dtype=np.int64)  # Row after the last record
+        self.first_rec_num = np.zeros(0, dtype=np.int64)
+        self.last_rec_num = np.zeros(0, dtype=np.int64)
+        self._positions: Dict[int, int] = {}  # Cycle number: position in the arrays
+
+    def process(self, chunk: pd.DataFrame) -> Self:
+        """Add the next chunk, which must have raw column names"""
+        offset = self.num_records
+        self.num_records += len(chunk)
+        cycle = column_to_numeric(chunk[self.column])
+        valid = np.isfinite(cycle) & (cycle >= 0)
+        cycle = np.where(valid, cycle, -1).astype(np.int64)
+        starts, ends = get_segment_bounds([cycle])
+        keep = cycle[starts] >= 0
+        starts, ends = starts[keep], ends[keep]
+        cycles = cycle[starts]
+        if len(cycles) == 0:
+            return self
+        self._add_cycles(np.unique(cycles))
+        positions = np.searchsorted(self.cycles, cycles)
+        np.minimum.at(self.starts, positions, starts + offset)
+        np.maximum.at(self.ends, positions, ends + offset)
+        if "RecNum" in chunk:
+            rec_num = column_to_numeric(chunk["RecNum"])
+            rec_num = np.nan_to_num(rec_num, nan=-1).astype(np.int64)
+            np.minimum.at(self.first_rec_num, positions, rec_num[starts])
+            np.maximum.at(self.last_rec_num, positions, rec_num[ends - 1])
+        return self
+
+    def get(self, cycle: int) -> slice:
+        """Rows of the cycle, an empty slice for unknown cycles"""
+        position = self._positions.get(cycle)
+        if position is None:
+            return slice(0, 0)
+        return slice(int(self.starts[position]), int(self.ends[position]))
+
+    def get_bounds(self, cycles: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """First row and row after the last record of each cycle, vectorized.
+        Unknown cycles give (0, 0)."""
+        cycles = np.asarray(cycles, dtype=np.float64)
+        if len(self.cycles) == 0:
+            return np.zeros(len(cycles), np.int64), np.zeros(len(cycles), np.int64)
+        positions = np.searchsorted(self.cycles, cycles).clip(max=len(self.cycles) - 1)
+        known = self.cycles[positions] == cycles
+        return (
+            np.where(known, self.starts[positions], 0),
+            np.where(known, self.ends[positions], 0),
+        )
+
+    def to_frame(self) -> pd.DataFrame:
+        """One row per cycle with 'Start', 'End', 'First RecNum' and 'Last RecNum'"""
+        return pd.DataFrame(
+            {
+                self.column: self.cycles,
+                "Start": self.starts,
+                "End": self.ends,
+                "First RecNum": self.first_rec_num,
+                "Last RecNum": self.last_rec_num,
+            }
+        )
+
+    def _add_cycles(self, cycles: np.ndarray):
+        """Insert the cycles not known yet, keeping the arrays sorted"""
+        new = np.setdiff1d(cycles, self.cycles, assume_unique=True)
+        if len(new) == 0:
+            return
+        merged = np.union1d(self.cycles, new)
+        old_positions = np.searchsorted(merged, self.cycles)
+        max_int = np.iinfo(np.int64).max
+        for name, fill in [
+            ("starts", max_int),
+            ("ends", 0),
+            ("first_rec_num", max_int),
+            ("last_rec_num", -1),
+        ]:
+            grown = np.full(len(merged), fill, dtype=np.int64)
+            grown[old_positions] = getattr(self, name)
+            setattr(self, name, grown)
+        self.cycles = merged
+        self._positions = {int(cycle): pos for pos, cycle in enumerate(merged)}
+
+
+# Functions
+def read_cycle_stats(file_path: Union[str, Path], **kwargs: Any) -> pd.DataFrame:
+    """Read a cycle statistics export. kwargs are passed on to MaccorCycleStatsFile."""
+    return MaccorCycleStatsFile(file_path=file_path, **kwargs).read().data
+
+
+def get_cycle_index(data, column: str = "CycleNumProc") -> CycleIndex:
+    """Index the cycles of a parsed Maccor time series
+
+    Parameters
+    ----------
+    data : pandas.DataFrame or MaccorTabularData or MaccorDataRawFile or
+        MaccorDataTxtFile
+        The parsed time series
+    column : str
+        Cycle column (raw column name)
+    """
+    return CycleIndex(column=column).process(get_raw_dataframe(data))
+
+
+def join_cycle_stats(
+    stats: pd.DataFrame, index: CycleIndex, cycle_column: Optional[str] = None
+) -> pd.DataFrame:
+    """Add the columns 'Start' and 'End' to the cycle statistics, i.e., the rows of
+    the time series belonging to each cycle, e.g., time_series.iloc[start:end]. The
+    cycle numbers of the statistics must match those of the indexed column.
+
+    Parameters
+    ----------
+    stats : pandas.DataFrame
+        Cycle statistics, e.g., from read_cycle_stats
+    index : CycleIndex
+        Index of the time series
+    cycle_column : str
+        Cycle column of the statistics. Defaults to the first column whose name
+        starts with 'Cyc'.
+    """
+    if cycle_column is None:
+        cycle_column = _find_cycle_column(stats.columns)
+        if cycle_column is None:
+            raise KeyError("No cycle column found in the cycle statistics!")
+    starts, ends = index.get_bounds(column_to_numeric(stats[cycle_column]))
+    return stats.assign(Start=starts, End=ends)
+
+
+def _find_cycle_column(columns: Iterable[Any]) -> Optional[str]:
+    """The first column whose name starts with 'Cyc', e.g., 'Cycle' or 'Cyc#'"""
+    return next((col for col in columns if str(col).lower().startswith("cyc")), None)
+
+
+# Line before the last line of the file
@@ -0,0 +1,284 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+__docformat__ = "NumPy"
+__author__ = "Lukas Gold, Simon Stier"
+
+# Python version dependent import statement:
+try:
+    from enum import StrEnum
+except ImportError:
+    from strenum import StrEnum
+
+import numpy as np
+import pandas as pd
+from typing_extensions import List, Optional, Tuple
+
+from maccor_utility.helper_functions import concatenate_ranges, get_segment_bounds
+from maccor_utility.read import get_raw_dataframe
+
+# Constants
+LEVEL_COLUMNS = ["TestTime", "CycleNumProc", "StepNum"]
+
+
+# Classes
+class DownsampleMethod(StrEnum):
+    lttb = "lttb"  # Largest-Triangle-Three-Buckets
+    min_max = "min_max"
+
+
+class GroupBy(StrEnum):
+    test = "test"
+    cycle = "cycle"
+    window = "window"
+
+
+class DownsamplePyramid(object):
+    """Multi-resolution levels of a downsampled time series for instant zooming.
+    Level 0 holds 'n_points' for the whole test. Each further level splits the test
+    into 'factor' times more 'TestTime' windows with 'n_points' each. The finest
+    level holds all records.
+
+    Parameters
+    ----------
+    data : pandas.DataFrame or MaccorTabularData or MaccorDataRawFile or
+        MaccorDataTxtFile
+        The parsed time series
+    column : str
+        The column to preserve the shape of, e.g., 'Voltage'
+    n_points : int
+        Target number of points of a view
+    factor : int
+        Zoom factor between two levels
+    method : DownsampleMethod
+        See downsample()
+    """
+
+    def __init__(
+        self,
+        data,
+        column: str = "Voltage",
+        n_points: int = 2000,
+        factor: int = 4,
+        method: DownsampleMethod = DownsampleMethod.lttb,
+    ):
+        if factor < 2:
+            raise ValueError(f"Zoom factor must be at least 2, got {factor}!")
+        df = get_raw_dataframe(data)
+        df = df[[col for col in LEVEL_COLUMNS if col in df.columns] + [column]]
+        self.column = column
+        self.factor = factor
+        self.n_points = n_points
+        test_time = df["TestTime"].to_numpy()
+        self.duration = float(test_time[-1] - test_time[0]) if len(df) > 0 else 0.0
+        self.levels: List[pd.DataFrame] = [
+            downsample(df, n_points=n_points, column=column, method=method)
+        ]
+        # Add levels as long as they reduce the number of records by 'factor'
+        while (
+            self.n_points * self.factor ** (len(self.levels) + 1) <= len(df)
+            and self.duration > 0
+        ):
+            window = self.duration / self.factor ** len(self.levels)
+            self.levels.append(
+                downsample(
+                    df,
+                    n_points=n_points,
+                    column=column,
+                    method=method,
+                    group_by=GroupBy.window,
+                    window=window,
+                )
+            )
+        # The finest level holds all records
+        if len(self.levels[-1]) < len(df):
+            self.levels.append(df)
+
+    def get(
+        self, t_min: Optional[float] = None, t_max: Optional[float] = None
+    ) -> pd.DataFrame:
+        """Return the points within t_min <= 'TestTime' <= t_max from the coarsest
+        level that resolves this range with about 'n_points'"""
+        level = self.levels[0]
+        t_min = level["TestTime"].iloc[0] if t_min is None else t_min
+        t_max = level["TestTime"].iloc[-1] if t_max is None else t_max
+        if t_max > t_min and self.duration > 0:
+            zoom = np.log(self.duration / (t_max - t_min)) / np.log(self.factor)
+            level = self.levels[int(np.clip(np.ceil(zoom), 0, len(self.levels) - 1))]
+        test_time = level["TestTime"].to_numpy()
+        lower = np.searchsorted(test_time, t_min, side="left")
+        upper = np.searchsorted(test_time, t_max, side="right")
+        return level.iloc[lower:upper]
+
+
+# Functions
+def downsample(
+    data,
+    n_points: int,
+    column: str = "Voltage",
+    method: DownsampleMethod = DownsampleMethod.lttb,
+    group_by: GroupBy = GroupBy.test,
+    window: Optional[float] = None,
+) -> pd.DataFrame:
+    """Reduce a parsed Maccor time series to about 'n_points' per group while
+    preserving the shape of 'column' over 'TestTime'. The first and the last record of
+    every step (runs of 'CycleNumProc' and 'StepNum') are always kept, so step
+    transitions remain visible.
+
+    Parameters
+    ----------
+    data : pandas.DataFrame or MaccorTabularData or MaccorDataRawFile or
+        MaccorDataTxtFile
+        The parsed time series
+    n_points : int
+        Target number of points per group. At least 3 for LTTB and 2 for min/max
+        bucketing.
+    column : str
+        The column to preserve the shape of
+    method : DownsampleMethod
+        LTTB selects the point spanning the largest triangle per bucket, min/max keeps
+        the minimum and the maximum of each bucket
+    group_by : GroupBy
+        Apply 'n_points' to the whole test, to each cycle or to each 'TestTime'
+        window of length 'window'
+    window : float
+        Window length in seconds, required for group_by='window'
+
+    Returns
+    -------
+    pandas.DataFrame
+        The selected records with all columns, in their original order
+    """
+    df = get_raw_dataframe(data)
+    test_time = df["TestTime"].to_numpy(dtype=np.float64)
+    values = df[column].to_numpy(dtype=np.float64)
+    starts, ends = _get_groups(df, group_by=GroupBy(group_by), window=window)
+    if DownsampleMethod(method) == DownsampleMethod.lttb:
+        if n_points < 3:
+            raise ValueError("LTTB requires at least 3 points per group!")
+        selected = _lttb(test_time, values, starts, ends, n_points)
+    else:
+        if n_points < 2:
+            raise ValueError("Min/max bucketing requires at least 2 points per group!")
+        selected = _min_max(values, starts, ends, n_points)
+    step_keys = [df[col].to_numpy() for col in ["CycleNumProc", "StepNum"] if col in df]
+    # Without step columns, the whole test is one segment
+    step_starts, step_ends = get_segment_bounds(step_keys or [np.zeros(len(df))])
+    keep = np.zeros(len(df), dtype=bool)
+    for idx in [selected, step_starts, step_ends - 1]:
+        keep[idx] = True
+    return df.iloc[np.flatnonzero(keep)]
+
+
+def _get_groups(
+    df: pd.DataFrame, group_by: GroupBy, window: Optional[float]
+) -> Tuple[np.ndarray, np.ndarray]:
+    if group_by == GroupBy.test:
+        return np.array([0]), np.array([len(df)])
+    if group_by == GroupBy.cycle:
+        return get_segment_bounds([df["CycleNumProc"].to_numpy()])
+    if window is None or window <= 0:
+        raise ValueError("A positive window length is required to group by window!")
+    test_time = df["TestTime"].to_numpy(dtype=np.float64)
+    return get_segment_bounds([np.floor((test_time - test_time[0]) / window)])
+
+
+def _get_bucket_edges(
+    starts: np.ndarray, ends: np.ndarray, num_buckets: int
+) -> np.ndarray:
+    """Split each range [start, end) into 'num_buckets' buckets of about equal size,
+    shape (num_groups, num_buckets + 1)"""
+    fraction = np.arange(num_buckets + 1) / num_buckets
+    return starts[:, None] + np.floor(
+        fraction[None, :] * (ends - starts)[:, None]
+    ).astype(np.int64)
+
+
+def _arg_extreme(values: np.ndarray, lengths: np.ndarray, maximum: bool = True):
+    """Position of the first maximum (or minimum) within consecutive segments of
+    'values' with the given, non-zero lengths. NaN values are ignored, segments
+    containing only NaN values return their first position."""
+    offsets = np.cumsum(lengths) - lengths
+    extreme = (np.fmax if maximum else np.fmin).reduceat(values, offsets)
+    segment = np.repeat(np.arange(len(lengths)), lengths)
+    candidates = np.flatnonzero(values == extreme[segment])
+    found = segment[candidates]
+    first = np.ones(len(found), dtype=bool)
+    first[1:] = found[1:] != found[:-1]
+    positions = offsets.copy()
+    positions[found[first]] = candidates[first]
+    return positions
+
+
+def _nan_mean(values: np.ndarray, starts: np.ndarray, lengths: np.ndarray):
+    """Mean of consecutive ranges of 'values' with the given, non-zero lengths. NaN
+    values are ignored, ranges containing only NaN values return NaN."""
+    segment_values = values[concatenate_ranges(starts, lengths)]
+    valid = ~np.isnan(segment_values)
+    offsets = np.cumsum(lengths) - lengths
+    sums = np.add.reduceat(np.where(valid, segment_values, 0.0), offsets)
+    counts = np.add.reduceat(valid.astype(np.int64), offsets)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return sums / counts
+
+
+def _lttb(
+    x: np.ndarray,
+    y: np.ndarray,
+    starts: np.ndarray,
+    ends: np.ndarray,
+    n_points: int,
+) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets for all groups at once. The buckets are
+    processed one after the other, each of them for all groups in one go."""
+    lengths = ends - starts
+    small = lengths <= n_points
+    selected = [concatenate_ranges(starts[small], lengths[small])]
+    starts, ends = starts[~small], ends[~small]
+    if len(starts) == 0:
+        return np.concatenate(selected)
+    # First and last point are always selected, the others split into buckets
+    num_buckets = n_points - 2
+    edges = _get_bucket_edges(starts + 1, ends - 1, num_buckets)
+    selected.extend([starts, ends - 1])
+    prev = starts
+    for bucket in range(num_buckets):
+        lower, upper = edges[:, bucket], edges[:, bucket + 1]
+        if bucket < num_buckets - 1:  # Average of the next bucket
+            next_lower, next_upper = upper, edges[:, bucket + 2]
+            next_x = _nan_mean(x, next_lower, next_upper - next_lower)
+            next_y = _nan_mean(y, next_lower, next_upper - next_lower)
+        else:  # Last point
+            next_x, next_y = x[ends - 1], y[ends - 1]
+        idx = concatenate_ranges(lower, upper - lower)
+        group = np.repeat(np.arange(len(starts)), upper - lower)
+        prev_x, prev_y = x[prev][group], y[prev][group]
+        area = np.abs(
+            (prev_x - next_x[group]) * (y[idx] - prev_y)
+            - (prev_x - x[idx]) * (next_y[group] - prev_y)
+        )
+        prev = idx[_arg_extreme(area, upper - lower)]
+        selected.append(prev)
+    return np.concatenate(selected)
+
+
+def _min_max(
+    y: np.ndarray, starts: np.ndarray, ends: np.ndarray, n_points: int
+) -> np.ndarray:
+    """Minimum and maximum of n_points // 2 buckets per group, all buckets at once"""
+    lengths = ends - starts
+    small = lengths <= n_points
+    selected = [concatenate_ranges(starts[small], lengths[small])]
+    starts, ends = starts[~small], ends[~small]
+    if len(starts) == 0:
+        return np.concatenate(selected)
+    edges = _get_bucket_edges(starts, ends, n_points // 2)
+    bucket_starts = edges[:, :-1].ravel()
+    bucket_lengths = (edges[:, 1:] - edges[:, :-1]).ravel()
+    idx = concatenate_ranges(bucket_starts, bucket_lengths)
+    for maximum in [False, True]:
+        selected.append(idx[_arg_extreme(y[idx], bucket_lengths, maximum)])
+    return np.concatenate(selected)
+
+
+# Line before the last line of the file
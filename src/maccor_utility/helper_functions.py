@@ -10,16 +10,101 @@ A collection of functions to be used repeatedly throughout the scripts in this p
 """
 
 # Importing required modules
+import bz2
+import ctypes
+import gzip
+import io
+import lzma
+import warnings
+import zipfile
+from contextlib import ExitStack, contextmanager
+from itertools import islice
 from pathlib import Path
 
-from batt_utility.helper_functions import read_specific_line_from_file
-from typing_extensions import Union
+import numpy as np
+import pandas as pd
+from typing_extensions import (
+    IO,
+    Any,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+# Optional dependency for Zstandard compressed files
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Constants
+COMPRESSION_MAGIC = {  # Leading bytes: compression
+    b"\x1f\x8b": "gzip",
+    b"BZh": "bz2",
+    b"\xfd7zXZ\x00": "xz",
+    b"\x28\xb5\x2f\xfd": "zstd",
+    b"PK\x03\x04": "zip",
+}
+
+
+# Classes
+class PrefixedStream(object):
+    """Read-only file-like object returning 'prefix' followed by the rest of
+    'stream', e.g., to hand lines or bytes already read from a stream that cannot
+    seek on to another reader"""
+
+    def __init__(self, prefix: Union[str, bytes], stream: IO):
+        self.prefix = prefix
+        self.stream = stream
+
+    def read(self, size: Optional[int] = -1) -> Union[str, bytes]:
+        if size is None or size < 0:
+            data = self.prefix + self.stream.read()
+            self.prefix = self.prefix[:0]
+            return data
+        data, self.prefix = self.prefix[:size], self.prefix[size:]
+        if len(data) < size:
+            data += self.stream.read(size - len(data))
+        return data
+
+    def readline(self, size: Optional[int] = -1) -> Union[str, bytes]:
+        """Read up to the next newline, at most 'size' characters or bytes"""
+        if size is None or size < 0:
+            size = -1
+        if len(self.prefix) == 0:
+            return self.stream.readline(size)
+        newline = "\n" if isinstance(self.prefix, str) else b"\n"
+        end = self.prefix.find(newline)
+        if end >= 0:
+            return self.read(end + 1 if size < 0 else min(end + 1, size))
+        if size < 0:
+            return self.read(len(self.prefix)) + self.stream.readline()
+        data = self.read(min(len(self.prefix), size))
+        if len(data) < size:
+            data += self.stream.readline(size - len(data))
+        return data
+
+    def __iter__(self) -> Iterator[Union[str, bytes]]:
+        return iter(self.readline, self.prefix[:0])
+
+    def readable(self) -> bool:
+        return True
 
 
 # Definitions of the functions
-def get_column_names_mims_client1(file_path: Union[str, Path], header_num: int):
-    columns = read_specific_line_from_file(file_path, header_num).split("\t")
-    first_row_with_data = read_specific_line_from_file(file_path, header_num + 2)
+def get_column_names_mims_client1(
+    file_path: Union[str, Path], header_num: int, lines: Optional[List[str]] = None
+):
+    """Column names of a MIMS Client 1 export, padded or cut to the number of data
+    columns. 'lines' are the first lines of the file, read from 'file_path' if
+    None."""
+    if lines is None:
+        lines = read_first_lines(file_path, header_num + 3)
+    columns = lines[header_num].rstrip("\r\n").split("\t")
+    first_row_with_data = lines[header_num + 2]
     number_of_data_columns = len(first_row_with_data.split("\t"))
     cntr = 0
     while number_of_data_columns > len(columns):
@@ -30,4 +115,140 @@ def get_column_names_mims_client1(file_path: Union[str, Path], header_num: int):
     return columns
 
 
+def read_first_lines(
+    file_path: Union[str, Path], num_lines: int, encoding: Optional[str] = None
+) -> List[str]:
+    """Read the first lines of a text file without reading the rest of it"""
+    with open(file_path, encoding=encoding, errors="replace") as file:
+        return list(islice(file, num_lines))
+
+
+@contextmanager
+def open_text_stream(
+    source: Union[str, Path, IO], encoding: Optional[str] = None
+) -> Iterator[IO]:
+    """Open a file path or file-like object as text stream. Compressed content (gzip,
+    bz2, xz, Zstandard or the first file of a zip archive) is detected from its
+    leading bytes and decompressed as a stream, without writing it to disk. File-like
+    objects are read from their start, if they can seek, and are not closed.
+
+    Parameters
+    ----------
+    source : str or Path or file-like
+        Path, binary or text stream
+    encoding : str
+        Encoding of the text
+    """
+    with ExitStack() as stack:
+        if isinstance(source, (str, Path)):
+            binary = stack.enter_context(open(source, "rb"))
+        else:
+            if getattr(source, "seekable", lambda: False)():
+                source.seek(0)
+            if isinstance(source, io.TextIOBase):
+                yield source
+                return
+            binary = source
+        binary = _decompress(binary, stack)
+        text = io.TextIOWrapper(binary, encoding=encoding)
+        # Do not close the underlying stream, it might be owned by the caller
+        stack.callback(text.detach)
+        yield text
+
+
+def _decompress(binary: IO, stack: ExitStack) -> IO:
+    """Binary stream of the decompressed content of 'binary'"""
+    seekable = getattr(binary, "seekable", lambda: False)()
+    if seekable:
+        position = binary.tell()
+        magic = binary.read(8)
+        binary.seek(position)
+    else:
+        magic = binary.read(8)
+        binary = PrefixedStream(magic, binary)
+    compression = next(
+        (comp for key, comp in COMPRESSION_MAGIC.items() if magic.startswith(key)),
+        None,
+    )
+    if compression is None:
+        return binary
+    if compression == "gzip":
+        return stack.enter_context(gzip.GzipFile(fileobj=binary, mode="rb"))
+    if compression == "bz2":
+        return stack.enter_context(bz2.BZ2File(binary, mode="rb"))
+    if compression == "xz":
+        return stack.enter_context(lzma.LZMAFile(binary, mode="rb"))
+    if compression == "zstd":
+        if zstandard is None:
+            raise ImportError(
+                "Reading Zstandard compressed files requires the package "
+                "'zstandard'. Install it with 'pip install maccor-utility[zstd]'."
+            )
+        return stack.enter_context(
+            zstandard.ZstdDecompressor().stream_reader(binary, closefd=False)
+        )
+    if not seekable:
+        raise ValueError("Zip archives can only be read from seekable streams!")
+    archive = stack.enter_context(zipfile.ZipFile(binary))
+    members = [info for info in archive.infolist() if not info.is_dir()]
+    if len(members) == 0:
+        raise ValueError("Zip archive is empty!")
+    return stack.enter_context(archive.open(members[0]))
+
+
+def get_segment_bounds(keys: Sequence[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """Find the runs of consecutive records sharing the same values in all key arrays,
+    e.g., the steps of a test from 'CycleNumProc' and 'StepNum'.
+
+    Parameters
+    ----------
+    keys:
+        Arrays of equal length, e.g., columns of the time series
+
+    Returns
+    -------
+    starts, ends:
+        Index of the first record of each run and the index after its last record
+    """
+    num_records = len(keys[0])
+    change = np.zeros(num_records, dtype=bool)
+    if num_records > 0:
+        change[0] = True
+    for key in keys:
+        key = np.asarray(key)
+        change[1:] |= key[1:] != key[:-1]
+    starts = np.flatnonzero(change)
+    ends = np.append(starts[1:], num_records)
+    return starts, ends
+
+
+def concatenate_ranges(starts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """Concatenate the index ranges [start, start + length) without a Python loop"""
+    offsets = np.cumsum(lengths) - lengths
+    return np.repeat(starts - offsets, lengths) + np.arange(np.sum(lengths))
+
+
+def column_to_numeric(series: pd.Series) -> np.ndarray:
+    """Numeric representation of a column as float64. Date time strings, e.g., the
+    'DPtTime' of the text exports, are converted to days since the Delphi epoch, the
+    unit of 'DPtTime' in raw files. Values that can't be converted become NaN."""
+    if pd.api.types.is_numeric_dtype(series):
+        return series.to_numpy(dtype=np.float64, na_value=np.nan)
+    with warnings.catch_warnings():  # Format inference
+        warnings.simplefilter("ignore")
+        timestamps = pd.to_datetime(series, errors="coerce")
+    days = (timestamps - pd.Timestamp(1899, 12, 30)) / pd.Timedelta(days=1)
+    return days.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def to_plain(value: Any) -> Any:
+    """Replace the ctypes string buffers of the meta data of raw files by their value,
+    e.g., to pickle it"""
+    if isinstance(value, dict):
+        return {key: to_plain(item) for key, item in value.items()}
+    if isinstance(value, ctypes.Array):
+        return value.value
+    return value
+
+
 # Line before the last line of the file
@@ -0,0 +1,282 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+__docformat__ = "NumPy"
+__author__ = "Lukas Gold, Simon Stier"
+
+# Python version dependent import statement:
+try:
+    from enum import StrEnum
+except ImportError:
+    from strenum import StrEnum
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel, ConfigDict
+from typing_extensions import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from maccor_utility.helper_functions import concatenate_ranges, get_segment_bounds
+from maccor_utility.read import (
+    MaccorDataFormat,
+    get_raw_dataframe,
+    read_maccor_data_file,
+)
+
+# Constants
+MODE_DIRECTIONS = {"C": 1, "D": -1}  # Mode column of the text exports
+
+
+# Classes
+class GridVariable(StrEnum):
+    voltage = "voltage"  # Q(V) and dQ/dV
+    capacity = "capacity"  # V(Q) and dV/dQ
+
+
+class IncrementalCapacityResult(BaseModel):
+    """Curves and derivatives of all half-cycles of a test on a common grid. Row i of
+    'curves' and 'derivative' belongs to row i of 'half_cycles'."""
+
+    grid_variable: GridVariable
+    grid: np.ndarray
+    half_cycles: pd.DataFrame
+    curves: np.ndarray  # Q(V) in Ah or V(Q) in V, shape (half-cycles, grid)
+    derivative: np.ndarray  # dQ/dV in Ah/V or dV/dQ in V/Ah
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+
+# Functions
+def get_half_cycles(
+    data, min_points: int = 10, current_threshold: float = 0.0
+) -> pd.DataFrame:
+    """Segment a parsed Maccor time series into charge and discharge half-cycles, i.e.,
+    runs of records with the same 'CycleNumProc', 'HalfCycleNumCalc' and direction.
+    The direction is taken from the 'Mode' column of the text exports ('C' or 'D'),
+    else from the sign of 'Current'.
+
+    Parameters
+    ----------
+    data : pandas.DataFrame or MaccorTabularData or MaccorDataRawFile or
+        MaccorDataTxtFile
+        The parsed time series
+    min_points : int
+        Half-cycles with fewer records are dropped
+    current_threshold : float
+        Absolute current in A below which records count as rest, if the direction is
+        derived from the current
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per half-cycle with the columns 'CycleNumProc', 'HalfCycleNumCalc',
+        'Direction' (1: charge, -1: discharge), 'Start' and 'End' (row positions of
+        the first record and after the last record)
+    """
+    df = get_raw_dataframe(data)
+    direction = _get_direction(df, current_threshold=current_threshold)
+    key_cols = [col for col in ["CycleNumProc", "HalfCycleNumCalc"] if col in df]
+    starts, ends = get_segment_bounds(
+        [df[col].to_numpy() for col in key_cols] + [direction]
+    )
+    keep = (direction[starts] != 0) & (ends - starts >= min_points)
+    starts, ends = starts[keep], ends[keep]
+    half_cycles = {
+        col: df[col].to_numpy()[starts]
+        for col in ["CycleNumProc", "HalfCycleNumCalc"]
+        if col in df
+    }
+    half_cycles.update({"Direction": direction[starts], "Start": starts, "End": ends})
+    return pd.DataFrame(half_cycles)
+
+
+def incremental_capacity(
+    data,
+    grid_variable: GridVariable = GridVariable.voltage,
+    num_points: int = 1000,
+    grid_range: Optional[Tuple[float, float]] = None,
+    smoothing: int = 0,
+    min_points: int = 10,
+    current_threshold: float = 0.0,
+) -> IncrementalCapacityResult:
+    """Incremental capacity (dQ/dV) or differential voltage (dV/dQ) of all
+    half-cycles at once
+
+    Parameters
+    ----------
+    data : pandas.DataFrame or MaccorTabularData or MaccorDataRawFile or
+        MaccorDataTxtFile
+        The parsed time series
+    grid_variable : GridVariable
+        'voltage' to interpolate the capacity onto a voltage grid (dQ/dV), 'capacity'
+        to interpolate the voltage onto a capacity grid (dV/dQ)
+    num_points : int
+        Number of grid points
+    grid_range : tuple of float
+        Lower and upper end of the grid. Defaults to the range of voltage or capacity
+        of all half-cycles.
+    smoothing : int
+        Width in grid points of the Gaussian window applied to the derivative, 0 for
+        no smoothing
+    min_points, current_threshold :
+        See get_half_cycles()
+
+    Returns
+    -------
+    IncrementalCapacityResult
+    """
+    grid_variable = GridVariable(grid_variable)
+    df = get_raw_dataframe(data)
+    half_cycles = get_half_cycles(
+        df, min_points=min_points, current_threshold=current_threshold
+    )
+    starts = half_cycles["Start"].to_numpy()
+    ends = half_cycles["End"].to_numpy()
+    lengths = ends - starts
+    rows = concatenate_ranges(starts, lengths)
+    segment = np.repeat(np.arange(len(starts)), lengths)
+    voltage = df["Voltage"].to_numpy(dtype=np.float64)[rows]
+    capacity = df["Capacity"].to_numpy(dtype=np.float64)
+    # Capacity since the start of the half-cycle
+    capacity = np.abs(capacity[rows] - capacity[starts][segment])
+    half_cycles["Capacity"] = (
+        np.fmax.reduceat(capacity, np.cumsum(lengths) - lengths)
+        if len(starts) > 0
+        else np.empty(0)
+    )
+    if grid_variable == GridVariable.voltage:
+        # The voltage increases during charge and decreases during discharge
+        direction = half_cycles["Direction"].to_numpy()
+        x, y = voltage * direction[segment], capacity
+    else:
+        direction = np.ones(len(starts), dtype=np.int64)
+        x, y = capacity, voltage
+    if grid_range is None:
+        source = voltage if grid_variable == GridVariable.voltage else capacity
+        grid_range = (
+            (float(np.nanmin(source)), float(np.nanmax(source)))
+            if len(source) > 0
+            else (0.0, 0.0)
+        )
+    grid = np.linspace(grid_range[0], grid_range[1], num_points)
+    curves = _interpolate_segments(x, y, segment, len(starts), grid, direction)
+    derivative = np.gradient(curves, grid, axis=1) if len(starts) > 0 else curves
+    if smoothing > 1:
+        derivative = _smooth(derivative, smoothing)
+    return IncrementalCapacityResult(
+        grid_variable=grid_variable,
+        grid=grid,
+        half_cycles=half_cycles,
+        curves=curves,
+        derivative=derivative,
+    )
+
+
+def incremental_capacity_many(
+    sources: Sequence[Union[pd.DataFrame, Tuple[Union[str, Path], MaccorDataFormat]]],
+    max_workers: Optional[int] = None,
+    **kwargs: Any,
+) -> List[IncrementalCapacityResult]:
+    """Apply incremental_capacity() to several tests in a process pool
+
+    Parameters
+    ----------
+    sources :
+        Parsed time series or tuples (file_path, format) to be read in the worker
+        processes. Reading in the workers avoids sending the time series to them.
+    max_workers : int
+        Number of processes, defaults to the number of CPUs
+    kwargs :
+        Passed on to incremental_capacity(). Use the same 'grid_range' for all tests
+        to get comparable grids.
+    """
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(_incremental_capacity_worker, source, kwargs)
+            for source in sources
+        ]
+        return [future.result() for future in futures]
+
+
+def _incremental_capacity_worker(
+    source: Union[pd.DataFrame, Tuple[Union[str, Path], MaccorDataFormat]],
+    kwargs: Dict[str, Any],
+) -> IncrementalCapacityResult:
+    if isinstance(source, tuple):
+        source = read_maccor_data_file(file_path=source[0], frmt=source[1])
+    return incremental_capacity(source, **kwargs)
+
+
+def _get_direction(df: pd.DataFrame, current_threshold: float) -> np.ndarray:
+    """1 for charge, -1 for discharge and 0 else, for each record"""
+    if "Mode" in df and not pd.api.types.is_numeric_dtype(df["Mode"]):
+        mode = df["Mode"].astype(str).str.strip().str.upper()
+        return mode.map(MODE_DIRECTIONS).fillna(0).to_numpy(dtype=np.int8)
+    current = df["Current"].to_numpy(dtype=np.float64)
+    direction = np.sign(current).astype(np.int8)
+    direction[np.abs(current) <= current_threshold] = 0
+    return direction
+
+
+def _interpolate_segments(
+    x: np.ndarray,
+    y: np.ndarray,
+    segment: np.ndarray,
+    num_segments: int,
+    grid: np.ndarray,
+    direction: np.ndarray,
+) -> np.ndarray:
+    """Linear interpolation of y(x) onto 'grid' * direction for all segments at
+    once. x is made monotonic within each segment (running maximum). Grid points
+    outside of the x range of a segment are NaN."""
+    if num_segments == 0:
+        return np.empty((0, len(grid)))
+    x = pd.Series(x).groupby(segment).cummax().to_numpy()
+    # Offset each segment, so that one sorted array holds all segments
+    x_min = min(np.nanmin(x), np.min(grid * direction[:, None]))
+    span = max(np.nanmax(x), np.max(grid * direction[:, None])) - x_min + 1.0
+    offset = np.arange(num_segments) * span - x_min
+    key = x + offset[segment]
+    queries = grid[None, :] * direction[:, None] + offset[:, None]
+    lengths = np.bincount(segment, minlength=num_segments)
+    seg_start = (np.cumsum(lengths) - lengths)[:, None]
+    seg_last = seg_start + lengths[:, None] - 1
+    lower = np.clip(np.searchsorted(key, queries, side="right") - 1, seg_start, None)
+    lower = np.minimum(lower, seg_last)
+    upper = np.minimum(lower + 1, seg_last)
+    span_x = key[upper] - key[lower]
+    weight = np.divide(
+        queries - key[lower],
+        span_x,
+        out=np.zeros_like(queries),
+        where=span_x > 0,
+    )
+    curves = y[lower] + weight * (y[upper] - y[lower])
+    outside = (queries < key[seg_start]) | (queries > key[seg_last])
+    curves[outside] = np.nan
+    return curves
+
+
+def _smooth(values: np.ndarray, width: int) -> np.ndarray:
+    """Gaussian smoothing along the last axis, ignoring NaN values"""
+    half = width // 2
+    kernel = np.exp(-0.5 * (np.arange(-half, half + 1) / (width / 4)) ** 2)
+    valid = ~np.isnan(values)
+    padding = [(0, 0)] * (values.ndim - 1) + [(half, half)]
+    windows = np.lib.stride_tricks.sliding_window_view(
+        np.pad(np.where(valid, values, 0.0), padding), 2 * half + 1, axis=-1
+    )
+    weights = np.lib.stride_tricks.sliding_window_view(
+        np.pad(valid.astype(np.float64), padding), 2 * half + 1, axis=-1
+    )
+    return np.divide(
+        windows @ kernel,
+        weights @ kernel,
+        out=np.full(values.shape, np.nan),
+        where=valid,
+    )
+
+
+# Line before the last line of the file
@@ -9,25 +9,13 @@ import os  # Required
 import time  # Required!
 
 # modules as in readmacfile.py
-from warnings import warn
-
-# Platform dependent import statement
-try:
-    import pythoncom  # Require COM
-except ImportError:
-    warn(
-        "COM not available. Most like you are running on a non-Windows operating "
-        "system. Else make sure to hav pywin32 installed. If you read this "
-        "message, you will most likely not be able to use the DLL and read Maccor "
-        "raw files directly."
-    )
+from functools import lru_cache
+
+import numpy as np
+from typing_extensions import Dict, List
 
 # Do something to make packages required by the DLL used (to avoid linting error)
 _ = type(os)
-try:
-    _ = type(pythoncom)
-except NameError:
-    warn("Pythoncom not available.")
 _ = type(time)
 
 
@@ -100,171 +88,15 @@ MACCOR_COLUMN_UNITS = {  # As in the raw file
     "FRAExpNum": "",
 }
 
-TO_EXPORT1 = {
-    # Column names - raw: [export1]
-    "RecNum": ["Rec#"],
-    "CycleNumProc": ["Cyc#"],
-    "HalfCycleNumCalc": [],
-    "StepNum": ["Step"],
-    "DPtTime": ["DPt Time"],
-    "TestTime": ["TestTime"],
-    "StepTime": ["StepTime"],
-    "Capacity": ["Amp-hr"],
-    "Energy": ["Watt-hr"],
-    "Current": ["Amps"],
-    "Voltage": ["Volts"],
-    "ACZ": ["ACR"],
-    "DCIR": ["DCIR"],
-    "MainMode": [],
-    "Mode": [],
-    "EndCode": [],
-    "Range": [],
-    "GlobFlags": [],
-    "HasVarData": [],
-    "HasGlobFlags": [],
-    "HasFRAData": [],
-    "DigIO": [],
-    "FRAStartTime": [],
-    "FRAExpNum": [],
-    # missing: State, ES, EV Temp, EV Hum
-}
-for ii in range(0, 65):
-    TO_EXPORT1[f"VAR{ii}"] = [f"VARx{ii}"]
-    TO_EXPORT1[f"GlobFlag{ii}"] = [f"FLGx{ii}"]
-
-TO_RAW = {key: key for key in TO_EXPORT1.keys()}
-
-TO_EXPORT2 = {
-    # Column names - raw: [export2]
-    "RecNum": ["Rec"],
-    "CycleNumProc": ["Cycle P"],
-    "HalfCycleNumCalc": ["Cycle C"],
-    "StepNum": ["Step"],
-    "DPtTime": ["DPT Time"],
-    "TestTime": ["Test Time (s)"],
-    "StepTime": ["Step Time (s)"],
-    "Capacity": ["Capacity (Ah)"],
-    "Energy": ["Energy (Wh)"],
-    "Current": ["Current (A)"],
-    "Voltage": ["Voltage (V)"],
-    "ACZ": [],
-    "DCIR": ["DCIR (Ohms)"],
-    "MainMode": [],
-    "Mode": ["MD"],  # todo: check
-    "EndCode": ["ES"],
-    "Range": ["I Range"],
-    "GlobFlags": [],
-    "HasVarData": [],
-    "HasGlobFlags": [],
-    "HasFRAData": [],
-    "DigIO": [],
-    "FRAStartTime": [],
-    "FRAExpNum": [],
-    # missing: DIG, I/O, EVTemp (C), EVHum (%), SubR, S.Capacity (Ah/g), Power (W),
-    # WF Chg Cap, WF Dis Cap, WF Chg E, WF Dis E, Loop1, Loop2, Loop3, Loop4,
-    # Resistance,
-}
-for ii in range(0, 65):
-    TO_EXPORT2[f"VAR{ii}"] = [f"VAR{ii}"]
-    TO_EXPORT2[f"GlobFlag{ii}"] = [f"GlobFlag{ii}"]
-
-TO_MIMS_CLIENT1 = {
-    # Column names - raw: [mims_client1]
-    "RecNum": ["Rec"],
-    "CycleNumProc": ["Cycle P"],
-    "HalfCycleNumCalc": ["Cycle C"],
-    "StepNum": ["Step"],
-    "DPtTime": ["DPT Time"],
-    "TestTime": ["TestTime"],
-    "StepTime": ["StepTime"],
-    "Capacity": ["Cap. [Ah]"],
-    "Energy": ["Ener. [Wh]"],
-    "Current": ["Current [A]"],
-    "Voltage": ["Voltage [V]"],
-    "ACZ": [],
-    "DCIR": [],
-    "MainMode": [],
-    "Mode": ["Md"],  # todo: check
-    "EndCode": ["ES"],
-    "Range": [],
-    "GlobFlags": [],
-    "HasVarData": [],
-    "HasGlobFlags": [],
-    "HasFRAData": [],
-    "DigIO": [],
-    "FRAStartTime": [],
-    "FRAExpNum": [],
-    # missing:
-}
-for ii in range(0, 65):
-    TO_MIMS_CLIENT1[f"VAR{ii}"] = [f"VAR{ii}"]
-    TO_MIMS_CLIENT1[f"GlobFlag{ii}"] = [f"GlobFlag{ii}"]
-
-TO_MIMS_CLIENT2 = {
-    # Column names - raw: [mims_client2]
-    "RecNum": ["Rec"],
-    "CycleNumProc": ["Cycle P"],
-    "HalfCycleNumCalc": ["Cycle C"],
-    "StepNum": ["Step"],
-    "DPtTime": ["DPT Time"],
-    "TestTime": ["Test Time"],
-    "StepTime": ["Step Time"],
-    "Capacity": ["Capacity"],
-    "Energy": ["Energy"],
-    "Current": ["Current"],
-    "Voltage": ["Voltage"],
-    "ACZ": [],
-    "DCIR": [],
-    "MainMode": [],
-    "Mode": ["MD"],  # todo: check
-    "EndCode": ["ES"],
-    "Range": [],
-    "GlobFlags": [],
-    "HasVarData": [],
-    "HasGlobFlags": [],
-    "HasFRAData": [],
-    "DigIO": [],
-    "FRAStartTime": [],
-    "FRAExpNum": [],
-    # missing:
-}
-for ii in range(0, 65):
-    TO_MIMS_CLIENT2[f"VAR{ii}"] = [f"VAR{ii}"]
-    TO_MIMS_CLIENT2[f"GlobFlag{ii}"] = [f"GlobFlag{ii}"]
-
-TO_MIMS_SERVER2 = {
-    # Column names - raw: [mims_server2]
-    "RecNum": ["Rec#"],
-    "CycleNumProc": ["Cycle P"],
-    "HalfCycleNumCalc": ["Cycle C"],
-    "StepNum": ["Step"],
-    "DPtTime": ["DPT Time"],
-    "TestTime": ["Test Time (s)"],
-    "StepTime": ["Step Time (s)"],
-    "Capacity": ["Capacity (Ah)"],
-    "Energy": ["Energy (Wh)"],
-    "Current": ["Current (A)"],
-    "Voltage": ["Voltage (V)"],
-    "ACZ": ["ACImp (Ohms)"],
-    "DCIR": ["DCIR (Ohms)"],
-    "MainMode": [],
-    "Mode": ["MD"],  # todo: check
-    "EndCode": ["ES"],
-    "Range": ["I Range"],
-    "GlobFlags": [],
-    "HasVarData": [],
-    "HasGlobFlags": [],
-    "HasFRAData": [],
-    "DigIO": [],
-    "FRAStartTime": [],
-    "FRAExpNum": [],
-    # missing: EVTemp (C), EVHum (%), Loop1, Loop2, Loop3, Loop4
-    # WF Chg Cap, WF Dis Cap, WF Chg E, WF Dis E, Full Step #, S. Capacity (Ah/g)
-    # VAR1 - VAR50, GlobFlag1 - GlobFlag64
-}
-for ii in range(0, 65):
-    TO_MIMS_SERVER2[f"VAR{ii}"] = [f"VAR{ii}"]
-    TO_MIMS_SERVER2[f"GlobFlag{ii}"] = [f"GlobFlag{ii}"]
+# Tables of column names, built on first access via get_translation()
+TRANSLATION_TABLES = (
+    "TO_RAW",
+    "TO_EXPORT1",
+    "TO_EXPORT2",
+    "TO_MIMS_CLIENT1",
+    "TO_MIMS_CLIENT2",
+    "TO_MIMS_SERVER2",
+)
 
 
 # Classes
@@ -387,3 +219,212 @@ class TDLLFRARecord(ctypes.Structure):
         ("TestVoltage", ctypes.c_float),
     ]
     field_strings_ = [field_tpl[0] for field_tpl in _fields_]
+
+
+# NumPy dtypes mirroring the packed records above. Raw bytes copied from the ctypes
+# structures can be decoded in bulk with np.frombuffer, without per-field getattr.
+READING_DTYPE = np.dtype(TDLLReading)
+SCOPE_TRACE_VI_DTYPE = np.dtype(TScopeTraceVI)
+SCOPE_TRACE_DTYPE = np.dtype(TDLLScopeTrace)
+FRA_RECORD_DTYPE = np.dtype(TDLLFRARecord)
+
+
+# Functions
+@lru_cache(maxsize=None)
+def get_translation(name: str) -> Dict[str, List[str]]:
+    """The table 'name' of TRANSLATION_TABLES, e.g., 'TO_EXPORT1', as
+    '{raw: [target, ...]}'. Built once on first use, do not modify it!"""
+    if name not in TRANSLATION_TABLES:
+        raise KeyError(f"No translation table '{name}'!")
+    if name == "TO_RAW":
+        return {key: key for key in get_translation("TO_EXPORT1").keys()}
+    return globals()[f"_{name.lower()}"]()
+
+
+def __getattr__(name: str):
+    """Build the tables on first access, e.g., 'from lookup import TO_EXPORT1'"""
+    if name in TRANSLATION_TABLES:
+        return get_translation(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _to_export1() -> Dict[str, List[str]]:
+    table = {
+        # Column names - raw: [export1]
+        "RecNum": ["Rec#"],
+        "CycleNumProc": ["Cyc#"],
+        "HalfCycleNumCalc": [],
+        "StepNum": ["Step"],
+        "DPtTime": ["DPt Time"],
+        "TestTime": ["TestTime"],
+        "StepTime": ["StepTime"],
+        "Capacity": ["Amp-hr"],
+        "Energy": ["Watt-hr"],
+        "Current": ["Amps"],
+        "Voltage": ["Volts"],
+        "ACZ": ["ACR"],
+        "DCIR": ["DCIR"],
+        "MainMode": [],
+        "Mode": [],
+        "EndCode": [],
+        "Range": [],
+        "GlobFlags": [],
+        "HasVarData": [],
+        "HasGlobFlags": [],
+        "HasFRAData": [],
+        "DigIO": [],
+        "FRAStartTime": [],
+        "FRAExpNum": [],
+        # missing: State, ES, EV Temp, EV Hum
+    }
+    for ii in range(0, 65):
+        table[f"VAR{ii}"] = [f"VARx{ii}"]
+        table[f"GlobFlag{ii}"] = [f"FLGx{ii}"]
+    return table
+
+
+def _to_export2() -> Dict[str, List[str]]:
+    table = {
+        # Column names - raw: [export2]
+        "RecNum": ["Rec"],
+        "CycleNumProc": ["Cycle P"],
+        "HalfCycleNumCalc": ["Cycle C"],
+        "StepNum": ["Step"],
+        "DPtTime": ["DPT Time"],
+        "TestTime": ["Test Time (s)"],
+        "StepTime": ["Step Time (s)"],
+        "Capacity": ["Capacity (Ah)"],
+        "Energy": ["Energy (Wh)"],
+        "Current": ["Current (A)"],
+        "Voltage": ["Voltage (V)"],
+        "ACZ": [],
+        "DCIR": ["DCIR (Ohms)"],
+        "MainMode": [],
+        "Mode": ["MD"],  # todo: check
+        "EndCode": ["ES"],
+        "Range": ["I Range"],
+        "GlobFlags": [],
+        "HasVarData": [],
+        "HasGlobFlags": [],
+        "HasFRAData": [],
+        "DigIO": [],
+        "FRAStartTime": [],
+        "FRAExpNum": [],
+        # missing: DIG, I/O, EVTemp (C), EVHum (%), SubR, S.Capacity (Ah/g), Power (W),
+        # WF Chg Cap, WF Dis Cap, WF Chg E, WF Dis E, Loop1, Loop2, Loop3, Loop4,
+        # Resistance,
+    }
+    for ii in range(0, 65):
+        table[f"VAR{ii}"] = [f"VAR{ii}"]
+        table[f"GlobFlag{ii}"] = [f"GlobFlag{ii}"]
+    return table
+
+
+def _to_mims_client1() -> Dict[str, List[str]]:
+    table = {
+        # Column names - raw: [mims_client1]
+        "RecNum": ["Rec"],
+        "CycleNumProc": ["Cycle P"],
+        "HalfCycleNumCalc": ["Cycle C"],
+        "StepNum": ["Step"],
+        "DPtTime": ["DPT Time"],
+        "TestTime": ["TestTime"],
+        "StepTime": ["StepTime"],
+        "Capacity": ["Cap. [Ah]"],
+        "Energy": ["Ener. [Wh]"],
+        "Current": ["Current [A]"],
+        "Voltage": ["Voltage [V]"],
+        "ACZ": [],
+        "DCIR": [],
+        "MainMode": [],
+        "Mode": ["Md"],  # todo: check
+        "EndCode": ["ES"],
+        "Range": [],
+        "GlobFlags": [],
+        "HasVarData": [],
+        "HasGlobFlags": [],
+        "HasFRAData": [],
+        "DigIO": [],
+        "FRAStartTime": [],
+        "FRAExpNum": [],
+        # missing:
+    }
+    for ii in range(0, 65):
+        table[f"VAR{ii}"] = [f"VAR{ii}"]
+        table[f"GlobFlag{ii}"] = [f"GlobFlag{ii}"]
+    return table
+
+
+def _to_mims_client2() -> Dict[str, List[str]]:
+    table = {
+        # Column names - raw: [mims_client2]
+        "RecNum": ["Rec"],
+        "CycleNumProc": ["Cycle P"],
+        "HalfCycleNumCalc": ["Cycle C"],
+        "StepNum": ["Step"],
+        "DPtTime": ["DPT Time"],
+        "TestTime": ["Test Time"],
+        "StepTime": ["Step Time"],
+        "Capacity": ["Capacity"],
+        "Energy": ["Energy"],
+        "Current": ["Current"],
+        "Voltage": ["Voltage"],
+        "ACZ": [],
+        "DCIR": [],
+        "MainMode": [],
+        "Mode": ["MD"],  # todo: check
+        "EndCode": ["ES"],
+        "Range": [],
+        "GlobFlags": [],
+        "HasVarData": [],
+        "HasGlobFlags": [],
+        "HasFRAData": [],
+        "DigIO": [],
+        "FRAStartTime": [],
+        "FRAExpNum": [],
+        # missing:
+    }
+    for ii in range(0, 65):
+        table[f"VAR{ii}"] = [f"VAR{ii}"]
+        table[f"GlobFlag{ii}"] = [f"GlobFlag{ii}"]
+    return table
+
+
+def _to_mims_server2() -> Dict[str, List[str]]:
+    table = {
+        # Column names - raw: [mims_server2]
+        "RecNum": ["Rec#"],
+        "CycleNumProc": ["Cycle P"],
+        "HalfCycleNumCalc": ["Cycle C"],
+        "StepNum": ["Step"],
+        "DPtTime": ["DPT Time"],
+        "TestTime": ["Test Time (s)"],
+        "StepTime": ["Step Time (s)"],
+        "Capacity": ["Capacity (Ah)"],
+        "Energy": ["Energy (Wh)"],
+        "Current": ["Current (A)"],
+        "Voltage": ["Voltage (V)"],
+        "ACZ": ["ACImp (Ohms)"],
+        "DCIR": ["DCIR (Ohms)"],
+        "MainMode": [],
+        "Mode": ["MD"],  # todo: check
+        "EndCode": ["ES"],
+        "Range": ["I Range"],
+        "GlobFlags": [],
+        "HasVarData": [],
+        "HasGlobFlags": [],
+        "HasFRAData": [],
+        "DigIO": [],
+        "FRAStartTime": [],
+        "FRAExpNum": [],
+        # missing: EVTemp (C), EVHum (%), Loop1, Loop2, Loop3, Loop4
+        # WF Chg Cap, WF Dis Cap, WF Chg E, WF Dis E, Full Step #, S. Capacity (Ah/g)
+        # VAR1 - VAR50, GlobFlag1 - GlobFlag64
+    }
+    for ii in range(0, 65):
+        table[f"VAR{ii}"] = [f"VAR{ii}"]
+        table[f"GlobFlag{ii}"] = [f"GlobFlag{ii}"]
+    return table
+
+
+# Line before the last line of the file
@@ -0,0 +1,210 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+__docformat__ = "NumPy"
+__author__ = "Lukas Gold, Simon Stier"
+
+# Python version dependent import statement:
+try:
+    from enum import StrEnum
+except ImportError:
+    from strenum import StrEnum
+
+import numpy as np
+import pandas as pd
+from typing_extensions import Dict, Iterable, Iterator, Optional, Sequence
+
+from maccor_utility.helper_functions import column_to_numeric
+from maccor_utility.read import get_raw_dataframe
+
+# Constants
+SECONDS_PER_DAY = 86400.0
+# 'DPtTime' is stored in days, its float64 resolution is a few microseconds
+TIME_RESOLUTION = 1e-5  # in s
+
+
+# Classes
+class AlignMethod(StrEnum):
+    asof = "asof"  # Last record at or before the time stamp
+    linear = "linear"  # Linear interpolation between the neighbouring records
+
+
+class _ChannelBuffer(object):
+    """Records of one channel pulled from its chunk iterator as far as needed"""
+
+    def __init__(self, chunks: Iterable[pd.DataFrame], columns: Sequence[str]):
+        self._chunks = iter(chunks)
+        self.columns = list(columns)
+        self.time = np.empty(0)  # Wall-clock time in s since the Delphi epoch
+        self.values = np.empty((0, len(self.columns)))
+        self.exhausted = False
+
+    def fill(self, until: float):
+        """Pull chunks until the buffer covers 'until' or the channel is exhausted"""
+        while not self.exhausted and (len(self.time) == 0 or self.time[-1] < until):
+            try:
+                chunk = next(self._chunks)
+            except StopIteration:
+                self.exhausted = True
+                break
+            time = column_to_numeric(chunk["DPtTime"]) * SECONDS_PER_DAY
+            values = np.column_stack(
+                [
+                    (
+                        column_to_numeric(chunk[col])
+                        if col in chunk
+                        else np.full(len(chunk), np.nan)
+                    )
+                    for col in self.columns
+                ]
+            ).reshape(len(chunk), len(self.columns))
+            valid = ~np.isnan(time)
+            self.time = np.concatenate([self.time, time[valid]])
+            self.values = np.concatenate([self.values, values[valid]])
+
+    def drop_before(self, time: float):
+        """Drop all records but the last one at or before 'time'"""
+        first = max(np.searchsorted(self.time, time, side="right") - 1, 0)
+        self.time = self.time[first:]
+        self.values = self.values[first:]
+
+
+# Functions
+def merge_channels(
+    channels: Dict[str, object],
+    dt: float,
+    columns: Sequence[str] = ("Current", "Voltage"),
+    tolerance: float = 1.0,
+    method: AlignMethod = AlignMethod.asof,
+) -> pd.DataFrame:
+    """Align several parsed Maccor results, e.g., the channels of a pack test, on a
+    common wall-clock timeline based on 'DPtTime'. See iter_merge_channels for the
+    parameters.
+
+    Parameters
+    ----------
+    channels : dict
+        Channel name: pandas.DataFrame or MaccorTabularData or MaccorDataRawFile or
+        MaccorDataTxtFile
+    """
+    frames = list(
+        iter_merge_channels(
+            {name: [get_raw_dataframe(data)] for name, data in channels.items()},
+            dt=dt,
+            columns=columns,
+            tolerance=tolerance,
+            method=method,
+            window=None,
+        )
+    )
+    if len(frames) == 0:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+
+def iter_merge_channels(
+    channels: Dict[str, Iterable[pd.DataFrame]],
+    dt: float,
+    columns: Sequence[str] = ("Current", "Voltage"),
+    tolerance: float = 1.0,
+    method: AlignMethod = AlignMethod.asof,
+    window: Optional[float] = 3600.0,
+) -> Iterator[pd.DataFrame]:
+    """Align several channels on a common wall-clock timeline with spacing 'dt',
+    window by window. Only the chunks needed for the current window are held in
+    memory, so memory is proportional to the window and not to the channels.
+
+    Parameters
+    ----------
+    channels : dict
+        Channel name: iterable of chunks with raw column names in wall-clock order,
+        e.g., from iter_maccor_data_file
+    dt : float
+        Spacing of the timeline in s
+    columns : sequence of str
+        Columns taken from each channel
+    tolerance : float
+        Maximum distance in s between a time stamp of the timeline and the records
+        used for it. Values are NaN if there are no records close enough.
+    method : AlignMethod
+        As-of (last record) or linear interpolation
+    window : float
+        Length of the yielded windows in s. None to yield everything at once.
+
+    Yields
+    ------
+    pandas.DataFrame
+        'DPtTime' (days since the Delphi epoch) and the column '<channel>/<column>'
+        for each channel and column
+    """
+    if dt <= 0:
+        raise ValueError(f"Time step 'dt' must be positive, got {dt}!")
+    method = AlignMethod(method)
+    buffers = {
+        name: _ChannelBuffer(chunks, columns) for name, chunks in channels.items()
+    }
+    for buffer in buffers.values():
+        buffer.fill(until=-np.inf)  # First chunk
+    first_times = [buf.time[0] for buf in buffers.values() if len(buf.time) > 0]
+    if len(first_times) == 0:
+        return
+    start = np.floor(min(first_times) / dt) * dt
+    while True:
+        end = np.inf if window is None else start + window
+        for buffer in buffers.values():
+            buffer.fill(until=end + tolerance)
+        last_time = max(
+            (buf.time[-1] for buf in buffers.values() if len(buf.time) > 0),
+            default=-np.inf,
+        )
+        if start > last_time:
+            return
+        stop = min(end, last_time + dt)
+        timeline = start + dt * np.arange(np.ceil((stop - start) / dt - 1e-9))
+        result = {"DPtTime": timeline / SECONDS_PER_DAY}
+        for name, buffer in buffers.items():
+            aligned = _align(buffer.time, buffer.values, timeline, tolerance, method)
+            for idx, col in enumerate(buffer.columns):
+                result[f"{name}/{col}"] = aligned[:, idx]
+            buffer.drop_before(end)
+        yield pd.DataFrame(result)
+        if window is None:
+            return
+        start = start + len(timeline) * dt
+
+
+def _align(
+    time: np.ndarray,
+    values: np.ndarray,
+    timeline: np.ndarray,
+    tolerance: float,
+    method: AlignMethod,
+) -> np.ndarray:
+    aligned = np.full((len(timeline), values.shape[1]), np.nan)
+    if len(time) == 0:
+        return aligned
+    lower = np.searchsorted(time, timeline + TIME_RESOLUTION, side="right") - 1
+    has_lower = lower >= 0
+    lower = np.clip(lower, 0, len(time) - 1)
+    if method == AlignMethod.asof:
+        valid = has_lower & (timeline - time[lower] <= tolerance)
+        aligned[valid] = values[lower[valid]]
+        return aligned
+    upper = np.minimum(lower + 1, len(time) - 1)
+    exact = has_lower & (np.abs(time[lower] - timeline) <= TIME_RESOLUTION)
+    valid = (
+        has_lower
+        & (upper > lower)
+        & (timeline - time[lower] <= tolerance)
+        & (time[upper] - timeline <= tolerance)
+    ) | exact
+    span = time[upper] - time[lower]
+    weight = np.divide(
+        timeline - time[lower], span, out=np.zeros(len(timeline)), where=span > 0
+    ).clip(0.0, 1.0)
+    interpolated = values[lower] + weight[:, None] * (values[upper] - values[lower])
+    aligned[valid] = interpolated[valid]
+    return aligned
+
+
+# Line before the last line of the file
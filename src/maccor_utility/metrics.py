@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+__docformat__ = "NumPy"
+__author__ = "Lukas Gold, Simon Stier"
+
+import time
+from contextlib import contextmanager, nullcontext
+
+from typing_extensions import (
+    Any,
+    Callable,
+    ContextManager,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+)
+
+# Constants
+MAX_ERROR_MESSAGES = 20  # Distinct error messages counted, further ones as 'Other'
+OTHER_ERRORS = "Other"
+PHASES = ("dll_load", "header", "records", "dataframe", "rename", "validation")
+
+
+# Classes
+class ReadMetrics(object):
+    """Timings and counters of reading a file, passed to the readers via 'metrics'.
+    Without it, the readers only count errors. Phases:
+
+    * 'dll_load': loading the DLL (raw files)
+    * 'header': header data and test parameters
+    * 'records': the record loop of raw files, without the time the consumer spends
+      between the records
+    * 'dataframe': parsing text exports and building the DataFrames of chunks
+    * 'rename': renaming the columns
+    * 'validation': building and validating MaccorTabularData
+
+    Parameters
+    ----------
+    count_calls : bool
+        Count the calls of each DLL function. Adds a Python function call to each
+        foreign call.
+    hooks : list of callable
+        Called with (phase, seconds) each time a phase ends, e.g., to forward the
+        timings to a monitoring system
+    max_error_messages : int
+        Number of distinct error messages counted separately
+    """
+
+    def __init__(
+        self,
+        count_calls: bool = True,
+        hooks: Optional[List[Callable[[str, float], Any]]] = None,
+        max_error_messages: int = MAX_ERROR_MESSAGES,
+    ):
+        self.count_calls = count_calls
+        self.hooks = list(hooks or [])
+        self.max_error_messages = max_error_messages
+        self.timings: Dict[str, float] = {}  # Phase: seconds
+        self.calls: Dict[str, int] = {}  # DLL function: number of calls
+        self.errors: Dict[str, int] = {}  # Error message: number of occurrences
+        self.num_errors = 0
+        self.num_records = 0
+        self.num_bytes = 0  # Size of the file, if known
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Add the time spent in the context to the phase"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def add_time(self, name: str, seconds: float):
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+        for hook in self.hooks:
+            hook(name, seconds)
+
+    def add_error(self, error: Any):
+        """Count an error by its message. Once 'max_error_messages' distinct messages
+        were counted, further messages are counted as 'Other'."""
+        self.num_errors += 1
+        message = str(error)
+        if message not in self.errors and len(self.errors) >= self.max_error_messages:
+            message = OTHER_ERRORS
+        self.errors[message] = self.errors.get(message, 0) + 1
+
+    def wrap_dll(self, dll):
+        """The DLL itself, or a proxy counting its calls if 'count_calls'"""
+        if not self.count_calls:
+            return dll
+        return CountingLibrary(dll, self.calls)
+
+    @property
+    def seconds(self) -> float:
+        return sum(self.timings.values())
+
+    @property
+    def records_per_second(self) -> float:
+        return self.num_records / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.num_bytes / self.seconds if self.seconds > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """All metrics as plain dict, e.g., for json.dumps"""
+        return {
+            "timings": dict(self.timings),
+            "seconds": self.seconds,
+            "num_records": self.num_records,
+            "num_bytes": self.num_bytes,
+            "records_per_second": self.records_per_second,
+            "bytes_per_second": self.bytes_per_second,
+            "calls": dict(self.calls),
+            "num_errors": self.num_errors,
+            "errors": dict(self.errors),
+        }
+
+    def summary(self) -> List[str]:
+        """Error counts as lines for the console"""
+        lines = [f"Number of exceptions with a unique string: {len(self.errors)}"]
+        for message, count in self.errors.items():
+            lines.append(f"Exception occurred {count}x times: {message}")
+        return lines
+
+
+class CountingLibrary(object):
+    """Proxy of a loaded DLL, counting the calls of each function in 'calls'.
+    Functions the DLL does not export raise AttributeError, like the DLL itself."""
+
+    def __init__(self, dll, calls: Dict[str, int]):
+        self._dll = dll
+        self._calls = calls
+
+    def __getattr__(self, name: str) -> Callable:
+        func = getattr(self._dll, name)
+        calls = self._calls
+
+        def counted(*args):
+            calls[name] = calls.get(name, 0) + 1
+            return func(*args)
+
+        # Cached, so that __getattr__ is only called once per function
+        setattr(self, name, counted)
+        return counted
+
+
+# Functions
+def timed(metrics: Optional[ReadMetrics], name: str) -> ContextManager:
+    """Time the phase 'name' if metrics are given, else do nothing"""
+    if metrics is None:
+        return nullcontext()
+    return metrics.phase(name)
+
+
+# Line before the last line of the file
@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+__docformat__ = "NumPy"
+__author__ = "Lukas Gold, Simon Stier"
+
+import threading
+
+from pydantic import BaseModel
+from typing_extensions import IO, Any, Callable, Iterator, Optional
+
+# Constants
+PROGRESS_INTERVAL = 10_000  # Records between progress reports and cancellation checks
+
+
+# Classes
+class ReadCancelled(Exception):
+    """Raised by the readers when the read was cancelled via a CancellationToken"""
+
+
+class CancellationToken(object):
+    """Cancels a read cooperatively, e.g., from another thread or a job scheduler.
+    The readers check it every 'progress_interval' records, close the file and raise
+    ReadCancelled.
+
+    Parameters
+    ----------
+    event : threading.Event or multiprocessing.Event
+        The event set by cancel(), e.g., an event shared with other processes.
+        Defaults to a new threading.Event.
+    """
+
+    def __init__(self, event: Optional[Any] = None):
+        self._event = threading.Event() if event is None else event
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        if self.cancelled:
+            raise ReadCancelled("The read was cancelled!")
+
+
+class ReadProgress(BaseModel):
+    """Progress of a read, passed to the progress callback. 'done' and 'total' are
+    records for raw files (total: 'LastRecNum' of the header) and bytes of the file
+    for text exports. 'total' is None if unknown, e.g., for file-like objects."""
+
+    file_path: str
+    num_records: int = 0
+    done: int = 0
+    total: Optional[int] = None
+    unit: str = "records"
+    finished: bool = False
+
+    @property
+    def fraction(self) -> Optional[float]:
+        if self.total is None or self.total <= 0:
+            return None
+        return min(self.done / self.total, 1.0)
+
+
+class ProgressReporter(object):
+    """Reports the progress of a read to the callback and checks the cancellation
+    token. The readers call update() every 'interval' records.
+
+    Parameters
+    ----------
+    file_path : str
+        The file read
+    callback : callable
+        Called with a ReadProgress
+    cancel : CancellationToken
+        Checked on each update
+    interval : int
+        Number of records between the updates
+    """
+
+    def __init__(
+        self,
+        file_path: Any,
+        callback: Optional[Callable[[ReadProgress], Any]] = None,
+        cancel: Optional[CancellationToken] = None,
+        interval: int = PROGRESS_INTERVAL,
+    ):
+        self.callback = callback
+        self.cancel = cancel
+        self.interval = max(int(interval), 1)
+        self.progress = ReadProgress(file_path=str(file_path))
+        # Returns the bytes read so far, if reading a file
+        self.position: Optional[Callable[[], int]] = None
+
+    def start(self, total: Optional[int], unit: str):
+        self.progress.total = None if total is None else int(total)
+        self.progress.unit = unit
+        self.update(0)
+
+    def update(self, num_records: Optional[int] = None):
+        """Raise ReadCancelled if cancelled, else report the progress. The number of
+        records is kept if None."""
+        if self.cancel is not None:
+            self.cancel.raise_if_cancelled()
+        if num_records is not None:
+            self.progress.num_records = num_records
+        if self.position is not None:
+            self.progress.done = self.position()
+        else:
+            self.progress.done = self.progress.num_records
+        if self.callback is not None:
+            self.callback(self.progress.model_copy())
+
+    def finish(self, num_records: Optional[int] = None):
+        if num_records is not None:
+            self.progress.num_records = num_records
+        self.progress.finished = True
+        if self.progress.total is not None:
+            self.progress.done = self.progress.total
+        if self.callback is not None:
+            self.callback(self.progress.model_copy())
+
+
+class ReportingStream(object):
+    """Read-only stream updating the reporter on each read, i.e., for each block the
+    pandas parser reads"""
+
+    def __init__(self, stream: IO, reporter: ProgressReporter):
+        self.stream = stream
+        self.reporter = reporter
+
+    def read(self, size: Optional[int] = -1):
+        self.reporter.update()
+        return self.stream.read(size)
+
+    def readline(self, size: Optional[int] = -1):
+        return self.stream.readline(size)
+
+    def __iter__(self) -> Iterator:
+        return iter(self.stream)
+
+    def readable(self) -> bool:
+        return True
+
+
+# Functions
+def get_reporter(
+    file_path: Any,
+    callback: Optional[Callable[[ReadProgress], Any]],
+    cancel: Optional[CancellationToken],
+    interval: int,
+) -> Optional[ProgressReporter]:
+    """A reporter, if a callback or a cancellation token is given, else None"""
+    if callback is None and cancel is None:
+        return None
+    return ProgressReporter(
+        file_path, callback=callback, cancel=cancel, interval=interval
+    )
+
+
+# Line before the last line of the file
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+__docformat__ = "NumPy"
+__author__ = "Lukas Gold, Simon Stier"
+
+import numpy as np
+import pandas as pd
+from typing_extensions import Optional, Sequence, Tuple
+
+from maccor_utility.helper_functions import get_segment_bounds
+from maccor_utility.read import get_raw_dataframe
+
+# Constants
+DEFAULT_OFFSETS = (0.1, 1.0, 10.0)  # in s after the start of a pulse
+
+
+# Functions
+def find_pulses(
+    data,
+    offsets: Sequence[float] = DEFAULT_OFFSETS,
+    current_threshold: float = 0.01,
+    require_step_change: bool = True,
+    duration_range: Optional[Tuple[float, float]] = None,
+) -> pd.DataFrame:
+    """Find current pulses in a parsed Maccor time series and extract the resistance
+    from the voltage response at given times after the start of each pulse. A pulse
+    starts with a change of the current by at least 'current_threshold' between two
+    records and lasts until the end of the step.
+
+    Parameters
+    ----------
+    data : pandas.DataFrame or MaccorTabularData or MaccorDataRawFile or
+        MaccorDataTxtFile
+        The parsed time series
+    offsets : sequence of float
+        Times in s after the start of the pulse at which the voltage and current are
+        evaluated (linear interpolation). Offsets beyond the end of a pulse give NaN.
+    current_threshold : float
+        Minimum change of the current in A
+    require_step_change : bool
+        Only consider current changes at step transitions ('CycleNumProc', 'StepNum'),
+        e.g., to ignore noise and ramps within constant voltage steps
+    duration_range : tuple of float
+        Minimum and maximum duration of a pulse in s, e.g., (0, 30) for the
+        discharge and charge pulses of an HPPC test
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per pulse with the record before the pulse ('Voltage before / V',
+        'Current before / A'), the start of the pulse ('RecNum', 'CycleNumProc',
+        'StepNum', 'TestTime / s', 'Duration / s') and for each offset the voltage,
+        current and resistance (R = dV / dI in Ohm)
+    """
+    df = get_raw_dataframe(data)
+    test_time = df["TestTime"].to_numpy(dtype=np.float64)
+    current = df["Current"].to_numpy(dtype=np.float64)
+    voltage = df["Voltage"].to_numpy(dtype=np.float64)
+    step_keys = [df[col].to_numpy() for col in ["CycleNumProc", "StepNum"] if col in df]
+    if len(step_keys) > 0:
+        step_starts, step_ends = get_segment_bounds(step_keys)
+    else:
+        step_starts, step_ends = np.array([0]), np.array([len(df)])
+    # Each record belongs to a step, pulses end with their step
+    step_end_of = np.repeat(step_ends, step_ends - step_starts)
+    if require_step_change:
+        candidates = step_starts[step_starts > 0]
+    else:
+        candidates = np.arange(1, len(df))
+    jump = np.abs(current[candidates] - current[candidates - 1])
+    starts = candidates[jump >= current_threshold]
+    lasts = step_end_of[starts] - 1
+    duration = test_time[lasts] - test_time[starts]
+    if duration_range is not None:
+        keep = (duration >= duration_range[0]) & (duration <= duration_range[1])
+        starts, lasts, duration = starts[keep], lasts[keep], duration[keep]
+    before = starts - 1
+    pulses = {
+        col: df[col].to_numpy()[starts]
+        for col in ["RecNum", "CycleNumProc", "StepNum"]
+        if col in df
+    }
+    pulses.update(
+        {
+            "TestTime / s": test_time[starts],
+            "Duration / s": duration,
+            "Voltage before / V": voltage[before],
+            "Current before / A": current[before],
+        }
+    )
+    for offset in offsets:
+        times = test_time[starts] + offset
+        volt = _interpolate_at(test_time, voltage, times, starts, lasts)
+        curr = _interpolate_at(test_time, current, times, starts, lasts)
+        delta_current = curr - current[before]
+        pulses[f"Voltage at {offset} s / V"] = volt
+        pulses[f"Current at {offset} s / A"] = curr
+        pulses[f"Resistance at {offset} s / Ohm"] = np.divide(
+            volt - voltage[before],
+            delta_current,
+            out=np.full(len(starts), np.nan),
+            where=delta_current != 0,
+        )
+    if "DCIR" in df:  # As logged by the tester, at the end of the pulse
+        pulses["DCIR / Ohm"] = df["DCIR"].to_numpy()[lasts]
+    return pd.DataFrame(pulses)
+
+
+def _interpolate_at(
+    x: np.ndarray,
+    y: np.ndarray,
+    queries: np.ndarray,
+    firsts: np.ndarray,
+    lasts: np.ndarray,
+) -> np.ndarray:
+    """Linear interpolation of y(x) at 'queries', each bound to the records
+    firsts[i] to lasts[i]. Queries outside of their range give NaN."""
+    lower = np.searchsorted(x, queries, side="right") - 1
+    lower = np.clip(lower, firsts, lasts)
+    upper = np.minimum(lower + 1, lasts)
+    span = x[upper] - x[lower]
+    weight = np.divide(
+        queries - x[lower], span, out=np.zeros(len(queries)), where=span > 0
+    )
+    result = y[lower] + weight * (y[upper] - y[lower])
+    result[(queries < x[firsts]) | (queries > x[lasts])] = np.nan
+    return result
+
+
+# Line before the last line of the file
@@ -13,17 +13,22 @@ Last modified: see git version control
 """
 
 # import modules
+import array
 import copy
 import ctypes
 import datetime
 import gc
+import mmap
 
 # modules as in readmacfile.py
 import os  # Required
-import subprocess
+import re
 import sys
 import time  # Required!
+from contextlib import ExitStack, contextmanager
 from enum import Enum
+from functools import lru_cache
+from itertools import islice
 
 # Python version dependent import statement:
 try:
@@ -33,23 +38,11 @@ except ImportError:
 
 # from ctypes import *
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 from warnings import warn
 
+import numpy as np
 import pandas as pd
-from pydantic import field_validator
-from typing_extensions import Callable, Dict, List, Literal, Optional, Self, Union
-
-# Platform dependent import statement
-try:
-    import pythoncom  # Require COM
-except ImportError:
-    warn(
-        "COM not available. Most like you are running on a non-Windows operating "
-        "system. Else make sure to hav pywin32 installed. If you read this "
-        "message, you will most likely not be able to use the DLL and read Maccor "
-        "raw files directly."
-    )
 
 # Own modules
 from batt_utility.data_models import (
@@ -65,38 +58,76 @@ from batt_utility.helper_functions import (
     flatten_dict_one_to_x,
     inverse_dict_one_to_x,
     print_,
-    read_first_x_lines,
+)
+from pydantic import BaseModel, ConfigDict, field_validator
+from typing_extensions import (
+    IO,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Self,
+    Tuple,
+    Union,
 )
 
-from maccor_utility.helper_functions import get_column_names_mims_client1
+from maccor_utility.helper_functions import (
+    PrefixedStream,
+    get_column_names_mims_client1,
+    open_text_stream,
+)
 from maccor_utility.lookup import (
+    FRA_RECORD_DTYPE,
     MACCOR_COLUMN_UNITS,
     MACCOR_HEADER_UNITS,
-    TO_EXPORT1,
-    TO_EXPORT2,
-    TO_MIMS_CLIENT1,
-    TO_MIMS_CLIENT2,
-    TO_MIMS_SERVER2,
-    TO_RAW,
+    SCOPE_TRACE_DTYPE,
     TDLLFRARecord,
     TDLLHeaderData,
     TDLLReading,
     TDLLScopeTrace,
     TDLLTimeData,
     TScopeTraceVI,
+    get_translation,
+)
+from maccor_utility.metrics import ReadMetrics, timed
+from maccor_utility.progress import (
+    PROGRESS_INTERVAL,
+    CancellationToken,
+    ProgressReporter,
+    ReadProgress,
+    ReportingStream,
+    get_reporter,
 )
 
+if TYPE_CHECKING:
+    from xml.etree import ElementTree
+
 # Do something to make packages required by the DLL used (to avoid linting error)
 _ = type(os)
-try:
-    _ = type(pythoncom)
-except NameError:
-    warn("Pythoncom not available.")
 _ = type(time)
-_ = type(TDLLFRARecord)
 _ = type(TScopeTraceVI)
 _ = type(TDLLReading)
 
+# Constants
+HEADER_LINES = 10  # Lines of the text exports parsed for meta data
+PROCEDURE_START_TAG = "<MaccorTestProcedure>"
+PROCEDURE_END_TAG = "</MaccorTestProcedure>"
+PROCEDURE_ENCODINGS = ("latin-1", "utf-16-le")  # Tried one after the other
+PROCEDURE_NAME_WINDOW = 1024  # Bytes in front of a procedure searched for its name
+# File name of a procedure, without directories
+PROCEDURE_NAME_REGEX = re.compile(rb'[^\x00-\x1f\\/:*?"<>|]{1,255}\.000')
+# Columns of the records by type, as in the raw file, see get_column_dtypes
+INTEGER_COLUMNS = frozenset(
+    ["Index"]
+    + [name for name, ctype in TDLLTimeData._fields_ if ctype._type_ in "bBhHiIlLqQ"]
+)
+TEXT_COLUMNS = frozenset(
+    ["CanStr", "CAN0", "CAN1"]
+    + [name for name, ctype in TDLLTimeData._fields_ if ctype._type_ == "u"]
+)
+
 
 class MaccorDataFormat(StrEnum):
     raw = "raw"
@@ -108,7 +139,24 @@ class MaccorDataFormat(StrEnum):
 
 
 # Classes
-class MaccorTabularData(TabularData):
+class ArrowExportMixin(object):
+    """Export to Apache Arrow of the parsed results and the readers"""
+
+    def to_arrow(self, meta: Optional[dict] = None):
+        """The time series as pyarrow.Table, numeric columns without copying. The
+        meta data of readers is stored in the schema metadata, if 'meta' is None.
+        See maccor_utility.arrow.to_arrow_table."""
+        # Imported here, as arrow depends on this module
+        from maccor_utility.arrow import to_arrow_table
+
+        return to_arrow_table(self, meta=meta)
+
+    def __arrow_c_stream__(self, requested_schema: Any = None):
+        """Arrow PyCapsule interface, e.g., for polars.from_arrow() or DuckDB"""
+        return self.to_arrow().__arrow_c_stream__(requested_schema)
+
+
+class MaccorTabularData(ArrowExportMixin, TabularData):
     data_format: MaccorDataFormat
 
     def change_column_names(self, target_format: MaccorDataFormat):
@@ -183,12 +231,87 @@ class Configurations(Enum):
     )
 
 
-class MaccorDataRawFile(object):
+class RecordBuffer(object):
+    """Collects fixed-size records as raw bytes, each keyed by the RecNum of the time
+    data record it belongs to, and decodes them in one go into a NumPy array.
+
+    Parameters
+    ----------
+    dtype : numpy.dtype
+        The dtype of a single record, e.g., one of the dtypes in maccor_utility.lookup
+        mirroring the packed ctypes structures.
+    """
+
+    def __init__(self, dtype: np.dtype):
+        self.dtype = np.dtype(dtype)
+        self.rec_nums = array.array("q")
+        self._buffer = bytearray()
+
+    def __len__(self) -> int:
+        return len(self.rec_nums)
+
+    def append(self, rec_num: int, record: Union[ctypes.Structure, ctypes.Array]):
+        """Copy the memory of a ctypes record into the buffer"""
+        self.rec_nums.append(rec_num)
+        self._buffer += bytes(record)
+
+    def to_array(self) -> np.ndarray:
+        """Decode the collected records, shape (N,) + dtype.shape"""
+        if self.dtype.itemsize == 0:  # e.g., no SMB channels
+            return np.empty((len(self),) + self.dtype.shape, dtype=self.dtype.base)
+        return np.frombuffer(self._buffer, dtype=self.dtype)
+
+    def to_records(self, name: str = "Values") -> np.ndarray:
+        """Decode the collected records into a structured array with a leading
+        'RecNum' field. Fields of structured dtypes are kept as they are, other dtypes
+        are stored in a single field called 'name'."""
+        values = self.to_array()
+        if self.dtype.names is None:
+            fields = [(name, self.dtype.base, self.dtype.shape)]
+        else:
+            fields = [
+                (field, self.dtype.fields[field][0]) for field in self.dtype.names
+            ]
+        records = np.empty(len(self), dtype=[("RecNum", np.int64)] + fields)
+        records["RecNum"] = np.frombuffer(self.rec_nums, dtype=np.int64)
+        if self.dtype.names is None:
+            records[name] = values
+        else:
+            for field in self.dtype.names:
+                records[field] = values[field]
+        return records
+
+
+class MaccorProcedure(BaseModel):
+    """Test procedure or subroutine as stored in a raw file"""
+
+    name: Optional[str] = None  # File name of the procedure, e.g., 'Test.000'
+    offset: int  # Position of the XML block in the raw file in bytes
+    xml: str
+
+    def to_element(self) -> "ElementTree.Element":
+        """The procedure as parsed XML tree"""
+        from xml.etree import ElementTree
+
+        return ElementTree.fromstring(self.xml)
+
+    def save(self, file_path: Union[str, Path]):
+        """Save the procedure as procedure file"""
+        Path(file_path).write_text(self.xml, encoding="utf-8")
+
+
+class MaccorDataRawFile(ArrowExportMixin):
     """Adapted from class definition in readmacfile.py"""
 
     # todo: read procedure and save to meta
     def __init__(
-        self, file_path: Union[str, Path], dll_path: Optional[Union[str, Path]] = None
+        self,
+        file_path: Union[str, Path],
+        dll_path: Optional[Union[str, Path]] = None,
+        metrics: Optional[ReadMetrics] = None,
+        progress: Optional[Callable[[ReadProgress], Any]] = None,
+        cancel: Optional[CancellationToken] = None,
+        progress_interval: int = PROGRESS_INTERVAL,
     ):
         super(MaccorDataRawFile, self).__init__()
         if dll_path is None:
@@ -212,95 +335,244 @@ class MaccorDataRawFile(object):
         self.file_name = str(file_path)
         self.meta: Optional[dict] = None
         self.data: Optional[MaccorTabularData] = None
+        # Scope traces, FRA, EV and SMB records as NumPy structured arrays, each with a
+        # 'RecNum' field linking the entries to the rows in self.data
+        self.arrays: Optional[Dict[str, np.ndarray]] = None
+        # Timings and counters of the reads, see ReadMetrics
+        self.metrics = metrics
+        # Called with a ReadProgress every 'progress_interval' records, when also
+        # 'cancel' is checked
+        self.progress = progress
+        self.cancel = cancel
+        self.progress_interval = progress_interval
         print(f"Reading target file: {self.file_name}")
 
-    def read(self, debug: bool = False) -> Self:
+    def read(self, debug: bool = False, max_memory: Optional[float] = None) -> Self:
+        """Read all records into self.data
+
+        Parameters
+        ----------
+        debug : bool
+            Whether to print debug messages
+        max_memory : float
+            Memory budget in MB. Once the records exceed it, they are spilled to
+            temporary files and self.data is memory-mapped (SpilledTabularData).
+        """
+        if max_memory is not None:
+            # Imported here, as spill depends on this module
+            from maccor_utility.spill import collect_chunks, get_spill_chunksize
+
+            chunks = self.iter_chunks(get_spill_chunksize(max_memory), debug=debug)
+            self.data = collect_chunks(chunks, MaccorDataFormat.raw, max_memory)
+            return self
+        data = list(self.iter_rows(debug=debug))
+        with timed(self.metrics, "validation"):
+            self.data = MaccorTabularData(
+                as_list=data, data_format=MaccorDataFormat.raw
+            )
+        return self
+
+    def iter_chunks(
+        self, chunksize: int = 100_000, debug: bool = False
+    ) -> Iterator[pd.DataFrame]:
+        """Read the file chunk by chunk. self.meta is available once the first chunk
+        was returned, self.arrays after the last one.
+
+        Parameters
+        ----------
+        chunksize : int
+            Number of records per chunk
+        debug : bool
+            Whether to print debug messages
+
+        Yields
+        ------
+        pandas.DataFrame
+            The next 'chunksize' records with raw column names
+        """
+        rows = []
+        for row in self.iter_rows(debug=debug):
+            rows.append(row)
+            if len(rows) >= chunksize:
+                with timed(self.metrics, "dataframe"):
+                    df = pd.DataFrame(rows)
+                yield df
+                rows = []
+        if len(rows) > 0:
+            with timed(self.metrics, "dataframe"):
+                df = pd.DataFrame(rows)
+            yield df
+
+    def read_meta(self, debug: bool = False) -> dict:
+        """Read only the header data and the test parameters (test name, procedure
+        etc.) of the file and close it again, without reading any records. Takes the
+        same time regardless of the file size.
+
+        Returns
+        -------
+        dict
+            self.meta, as set by iter_rows()
+        """
+        dll = self._load_dll()
+        self.meta = {
+            "Units": {**MACCOR_HEADER_UNITS, **MACCOR_COLUMN_UNITS},
+        }
+        file = dll.OpenDataFile(self.file_name)
+        if file < 0:
+            raise OSError(f"Error getting file handle for '{self.file_name}'!")
+        try:
+            with timed(self.metrics, "header"):
+                self._read_header(dll, file, debug=debug)
+        finally:
+            dll.CloseDataFile(file)
+            del dll
+        return self.meta
+
+    def _load_dll(self):
+        """Load the DLL, wrapped to count its calls if requested by the metrics"""
+        with timed(self.metrics, "dll_load"):
+            require_com()
+            dll = ctypes.windll.LoadLibrary(self.dll_path)
+        if self.metrics is not None:
+            dll = self.metrics.wrap_dll(dll)
+        return dll
+
+    def _read_header(self, dll, file: int, debug: bool = False) -> TDLLHeaderData:
+        """Read the header data and the test parameters of an opened file into
+        self.meta"""
+        s_array = (ctypes.c_wchar * 256)()
+        print_("Header data", dg=debug)
+        # Use the handle to get the header data (Not required)
+        dll_header_data = TDLLHeaderData()
+        dll.GetDataFileHeader(file, ctypes.pointer(dll_header_data))
+        self.meta["Header data"] = {
+            field_str: getattr(dll_header_data, field_str)
+            for field_str in dll_header_data.field_strings_
+        }
+        # todo: StartDateTime is useless in the float format
+        self.meta["Parameter"] = {
+            "Start date time": datetime_fromdelphi(
+                getattr(dll_header_data, "StartDateTime")
+            ),
+            "File type": getattr(dll_header_data, "FileType"),
+            "Test channel": getattr(dll_header_data, "TestChan"),
+            "Mass / g": getattr(dll_header_data, "Mass"),
+            "Volume": getattr(dll_header_data, "Volume"),
+            "C-Rate / A": getattr(dll_header_data, "C_Rate"),
+            "Aux units": {},
+            "SMB units": {},
+            "Number of Aux": getattr(dll_header_data, "AUXtot"),
+            "Number of SMB": getattr(dll_header_data, "SMBtot"),
+        }
+        # "Key": (func, arg)
+        test_params_mapping = {
+            "System ID": (dll.GetSystemID, dll_header_data.SystemIDLen),
+            "Test procedure": (dll.GetProcName, dll_header_data.ProcNameLen),
+            "Test name": (dll.GetTestName, dll_header_data.TestNameLen),
+            "Test info": (dll.GetTestInfo, dll_header_data.TestInfoLen),
+            "Procedure description": (
+                dll.GetProcDesc,
+                dll_header_data.ProcDescLen,
+            ),
+        }
+        for key, (func, arg) in test_params_mapping.items():
+            func(file, ctypes.pointer(s_array), arg)
+            self.meta[key] = copy.deepcopy(s_array)
+            print_(f"{key} is: {s_array.value}", dg=debug)
+        # Key: (func, arg)
+        aux_smb_units_mapping = {
+            "Aux units": (dll.GetAuxUnits, self.meta["Parameter"]["Number of Aux"]),
+            "SMB units": (dll.GetSMBUnits, self.meta["Parameter"]["Number of SMB"]),
+        }
+        for key, (func, arg) in aux_smb_units_mapping.items():
+            units = {}
+            for num in range(0, arg):
+                func(file, num, ctypes.pointer(s_array))
+                print_(f"{key} {num + 1} unit is: {s_array.value}", dg=debug)
+                units[f"{key} {num + 1}"] = copy.deepcopy(s_array.value)
+            self.meta["Parameter"][key] = units
+
+        return dll_header_data
+
+    def get_columns(self) -> List[str]:
+        """Columns of the records as declared by the header data in self.meta, in
+        the order of iter_rows(), e.g., to give all chunks the same columns. The
+        'Var' columns only appear in chunks with a record with variable data."""
+        if self.meta is None or "Parameter" not in self.meta:
+            raise ValueError("The header was not read yet, call read_meta() first!")
+        parameter = self.meta["Parameter"]
+        columns = ["Index", "CanStr", "CAN0", "CAN1", *TDLLTimeData.field_strings_]
+        columns += [f"Aux{num + 1}" for num in range(parameter["Number of Aux"])]
+        if parameter["Number of SMB"] > 0:
+            var_cnt = get_var_count(parameter["File type"])
+            columns += [f"Var{num}" for num in range(1, var_cnt + 1)]
+        return columns
+
+    def iter_rows(self, debug: bool = False) -> Iterator[Dict[str, Any]]:
+        """Generator reading the file record by record via the DLL. Sets self.meta
+        when the header was read and self.arrays once all records were read."""
         # stdcall
-        dll = ctypes.windll.LoadLibrary(self.dll_path)
+        dll = self._load_dll()
+        # Errors are counted, even without metrics, to print a summary at the end
+        metrics = self.metrics or ReadMetrics(count_calls=False)
+        num_errors = metrics.num_errors
+        timed_records = self.metrics is not None
+        reporter = get_reporter(
+            self.file_name, self.progress, self.cancel, self.progress_interval
+        )
+        completed = False
         meta = {
             "Units": {**MACCOR_HEADER_UNITS, **MACCOR_COLUMN_UNITS},
         }
-        data = []
+        self.meta = meta
         try:
             pfile_name = ctypes.c_wchar_p(self.file_name)  # OpenDataFile
             pfile_name_ascii = ctypes.c_char_p(self.file_name.encode("utf-8"))
             _ = pfile_name
             _ = pfile_name_ascii
             # OpenDataFileASCII
-            s_array = (ctypes.c_wchar * 256)()
 
             file = dll.OpenDataFile(self.file_name)
 
             if file >= 0:
                 print_(f"File access successful! handle = {file}", dg=debug)
-                print_("Header data", dg=debug)
-                # Use the handle to get the header data (Not required)
-                dll_header_data = TDLLHeaderData()
-                dll.GetDataFileHeader(file, ctypes.pointer(dll_header_data))
-                meta["Header data"] = {
-                    field_str: getattr(dll_header_data, field_str)
-                    for field_str in dll_header_data.field_strings_
-                }
-                # todo: StartDateTime is useless in the float format
-                meta["Parameter"] = {
-                    "Start date time": datetime_fromdelphi(
-                        getattr(dll_header_data, "StartDateTime")
-                    ),
-                    "File type": getattr(dll_header_data, "FileType"),
-                    "Test channel": getattr(dll_header_data, "TestChan"),
-                    "Mass / g": getattr(dll_header_data, "Mass"),
-                    "Volume": getattr(dll_header_data, "Volume"),
-                    "C-Rate / A": getattr(dll_header_data, "C_Rate"),
-                    "Aux units": {},
-                    "SMB units": {},
-                    "Number of Aux": getattr(dll_header_data, "AUXtot"),
-                    "Number of SMB": getattr(dll_header_data, "SMBtot"),
-                }
-                # "Key": (func, arg)
-                test_params_mapping = {
-                    "System ID": (dll.GetSystemID, dll_header_data.SystemIDLen),
-                    "Test procedure": (dll.GetProcName, dll_header_data.ProcNameLen),
-                    "Test name": (dll.GetTestName, dll_header_data.TestNameLen),
-                    "Test info": (dll.GetTestInfo, dll_header_data.TestInfoLen),
-                    "Procedure description": (
-                        dll.GetProcDesc,
-                        dll_header_data.ProcDescLen,
-                    ),
-                }
-                for key, (func, arg) in test_params_mapping.items():
-                    func(file, ctypes.pointer(s_array), arg)
-                    meta[key] = copy.deepcopy(s_array)
-                    print_(f"{key} is: {s_array.value}", dg=debug)
-                # Key: (func, arg)
-                aux_smb_units_mapping = {
-                    "Aux units": (dll.GetAuxUnits, meta["Parameter"]["Number of Aux"]),
-                    "SMB units": (dll.GetSMBUnits, meta["Parameter"]["Number of SMB"]),
-                }
-                for key, (func, arg) in aux_smb_units_mapping.items():
-                    units = {}
-                    for num in range(0, arg):
-                        func(file, num, ctypes.pointer(s_array))
-                        print_(f"{key} {num + 1} unit is: {s_array.value}", dg=debug)
-                        units[f"{key} {num + 1}"] = copy.deepcopy(s_array.value)
-                    meta["Parameter"][key] = units
+                with timed(self.metrics, "header"):
+                    dll_header_data = self._read_header(dll, file, debug=debug)
+                if reporter is not None:
+                    reporter.start(getattr(dll_header_data, "LastRecNum"), "records")
+                    next_report = reporter.interval
 
                 # Read time series data
-                # The number of variables depends on the file type
-                if meta["Parameter"]["File type"] == 4:
-                    var_cnt = 50
-                elif meta["Parameter"]["File type"] == (1 or 2):
-                    var_cnt = 15
-                else:
-                    var_cnt = 0
+                var_cnt = get_var_count(meta["Parameter"]["File type"])
                 count = 0
                 dll_time_data = TDLLTimeData()
                 dll_scope_trace = TDLLScopeTrace()
-                _ = dll_scope_trace
+                dll_fra_record = TDLLFRARecord()
+                ev_values = (ctypes.c_float * 2)()  # temperature, humidity
+                smb_values = (ctypes.c_float * meta["Parameter"]["Number of SMB"])()
+                smb_obj = ctypes.c_float()
+                # Records beyond the time data are collected as raw bytes and decoded
+                # in bulk after the loop
+                buffers = {
+                    "Scope traces": RecordBuffer(SCOPE_TRACE_DTYPE),
+                    "FRA": RecordBuffer(FRA_RECORD_DTYPE),
+                    "EV": RecordBuffer(np.dtype((np.float32, (2,)))),
+                    "SMB": RecordBuffer(np.dtype((np.float32, (len(smb_values),)))),
+                }
+                get_scope_trace = get_dll_function(dll, "GetScopeTrace")
+                get_fra_data = get_dll_function(dll, "GetFRAData")
+                get_ev_data = get_dll_function(dll, "GetEVData")
+                get_smb_data = get_dll_function(dll, "GetSMBData")
+                has_ev = getattr(dll_header_data, "EVChamberNum") > 0
                 # Read the file by calling LoadAndGetNextTimeData until <> 0
-                exceptions = []
+                start = time.perf_counter()
                 while (
                     dll.LoadAndGetNextTimeData(file, ctypes.pointer(dll_time_data)) == 0
                 ):
+                    # Outside of the try, as ReadCancelled must not be caught
+                    if reporter is not None and count >= next_report:
+                        reporter.update(count)
+                        next_report += reporter.interval
                     try:
                         row = {"Index": count}
                         try:  # Try separately for CAN Data, to avoid complete fail
@@ -328,7 +600,7 @@ class MaccorDataRawFile(object):
                             # Data
                             row.update({"CanStr": can_str, "CAN0": can0, "CAN1": can1})
                         except Exception as e:
-                            exceptions.append(e)
+                            metrics.add_error(e)
                             # todo: trace back why: "function 'GetCANData' not found"
                         # Continue to read the other than CAN data
                         for field_str in dll_time_data.field_strings_:
@@ -348,38 +620,62 @@ class MaccorDataRawFile(object):
                                 var_obj = ctypes.c_float(1.0)
                                 dll.GetVARData(file, var_num, ctypes.byref(var_obj))
                                 row[f"Var{var_num}"] = copy.deepcopy(var_obj.value)
+                        rec_num = dll_time_data.RecNum
+                        # Scope trace
+                        if (
+                            get_scope_trace is not None
+                            and get_scope_trace(file, ctypes.pointer(dll_scope_trace))
+                            == 0
+                            and dll_scope_trace.Samples > 0
+                        ):
+                            buffers["Scope traces"].append(rec_num, dll_scope_trace)
+                        # FRA data - one record per frequency of the sweep
+                        if get_fra_data is not None and dll_time_data.HasFRAData:
+                            fra_num = 0
+                            while (
+                                get_fra_data(
+                                    file, fra_num, ctypes.pointer(dll_fra_record)
+                                )
+                                == 0
+                            ):
+                                buffers["FRA"].append(rec_num, dll_fra_record)
+                                fra_num += 1
+                        # EV data
+                        if get_ev_data is not None and has_ev:
+                            get_ev_data(file, ctypes.pointer(ev_values))
+                            buffers["EV"].append(rec_num, ev_values)
+                        # SMB data
+                        if get_smb_data is not None and len(smb_values) > 0:
+                            for smb_num in range(0, len(smb_values)):
+                                get_smb_data(file, smb_num, ctypes.byref(smb_obj))
+                                smb_values[smb_num] = smb_obj.value
+                            buffers["SMB"].append(rec_num, smb_values)
                         # todo:
                         #  * global flags
-                        #  * SMB data
-                        #  * FRA data
-                        #  * EV data
-                        #  * scope data
-                        data.append(row)
                         print_(f"Row {count}: {row}", dg=debug)
                         count += 1
+                        if timed_records:
+                            # Exclude the time spent by the consumer
+                            metrics.add_time("records", time.perf_counter() - start)
+                            yield row
+                            start = time.perf_counter()
+                        else:
+                            yield row
 
                     # While try-except
                     except Exception as e:
-                        exceptions.append(e)
-
-                if len(exceptions) > 0:
-                    exceptions = [str(exception) for exception in exceptions]
-                    unique_exceptions = set(exceptions)
-                    print(
-                        f"Number of exceptions with a unique string:"
-                        f" {len(unique_exceptions)}"
-                    )
-                    for exception in unique_exceptions:
-                        print(
-                            f"Exception occurred {exceptions.count(exception)}x times: "
-                            f"{exception}"
-                        )
-                # Finally close file
-                dll.CloseDataFile(file)
-                # Unload dll
-                del dll
-                # Collect garbage!
-                gc.collect()
+                        metrics.add_error(e)
+
+                if timed_records:
+                    metrics.add_time("records", time.perf_counter() - start)
+                metrics.num_records += count
+                metrics.num_bytes += os.path.getsize(self.file_name)
+                if metrics.num_errors > num_errors:
+                    for line in metrics.summary():
+                        print(line)
+                if reporter is not None:
+                    reporter.finish()
+                completed = True
             else:
                 print("Error getting file handle")
         # func try-except
@@ -387,6 +683,13 @@ class MaccorDataRawFile(object):
             # print(f"Exception: {e}")
             raise e
         finally:
+            # Close the file also if the read was cancelled or the generator closed
+            if "file" in locals() and file >= 0:
+                dll.CloseDataFile(file)
+            # Release the buffers of an incomplete read right away, not only once
+            # the exception (and its reference to this frame) is gone
+            if not completed and "buffers" in locals():
+                del buffers
             # Unload dll
             if "dll" in locals():
                 del dll
@@ -397,18 +700,119 @@ class MaccorDataRawFile(object):
         #  all records, then the global flags columns should not be present)
         #  same for Var, SMB, FRA, EV, Scope
 
-        self.data = MaccorTabularData(as_list=data, data_format=MaccorDataFormat.raw)
-        self.meta = meta
-        return self
+        if "buffers" in locals():
+            self.arrays = {
+                key: buffer.to_records(name="Values") for key, buffer in buffers.items()
+            }
+
 
+class MaccorDataTxtFile(ArrowExportMixin, ReadTableResult):
+    """Text export of a Maccor data file. 'file_path' may also be a binary or text
+    file-like object. Compressed content (gzip, bz2, xz, Zstandard, zip) is
+    decompressed as a stream, header and body are read in a single pass."""
 
-class MaccorDataTxtFile(ReadTableResult):
-    file_path: Union[str, Path]
+    file_path: Any  # str, Path or file-like object
     export_format: MaccorDataFormat
     meta: Optional[dict] = None
     data: Optional[MaccorTabularData] = None
+    metrics: Optional[ReadMetrics] = None  # Timings and counters, see ReadMetrics
+    # Called with a ReadProgress for each block of the file parsed, when also
+    # 'cancel' is checked
+    progress: Optional[Callable[[ReadProgress], Any]] = None
+    cancel: Optional[CancellationToken] = None
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    def read(
+        self, remove_nan_cols: bool = True, max_memory: Optional[float] = None
+    ) -> Self:
+        """Read all records into self.data
+
+        Parameters
+        ----------
+        remove_nan_cols : bool
+            Drop columns without any value
+        max_memory : float
+            Memory budget in MB. Once the records exceed it, they are spilled to
+            temporary files and self.data is memory-mapped (SpilledTabularData).
+        """
+        if max_memory is not None:
+            # Imported here, as spill depends on this module
+            from maccor_utility.spill import collect_chunks, get_spill_chunksize
+
+            self.data = collect_chunks(
+                self.iter_chunks(get_spill_chunksize(max_memory)),
+                self.export_format,
+                max_memory,
+                remove_nan_cols=remove_nan_cols,
+            )
+            return self
+        reporter = get_reporter(self.file_path, self.progress, self.cancel, 1)
+        with self._open(reporter) as (lines, stream):
+            with timed(self.metrics, "dataframe"):
+                df = pd.read_table(filepath_or_buffer=stream, **self.read_params(lines))
+                if remove_nan_cols:
+                    df.dropna(axis="columns", how="all", inplace=True)
+                df.dropna(axis="index", how="all", inplace=True)
+        with timed(self.metrics, "rename"):
+            df = rename_columns(
+                df, input_format=self.export_format, target_format=MaccorDataFormat.raw
+            )
+        with timed(self.metrics, "validation"):
+            self.data = MaccorTabularData(
+                as_list=df.to_dict(orient="records"), data_format=self.export_format
+            )
+        self._count(len(df))
+        if reporter is not None:
+            reporter.finish(len(df))
+        return self
 
-    def read(self, remove_nan_cols: bool = True) -> Self:
+    def iter_chunks(self, chunksize: int = 100_000) -> Iterator[pd.DataFrame]:
+        """Read the file chunk by chunk. Other than read(), empty columns are kept,
+        so that all chunks share the same columns.
+
+        Parameters
+        ----------
+        chunksize : int
+            Number of lines per chunk
+
+        Yields
+        ------
+        pandas.DataFrame
+            The next 'chunksize' records with raw column names
+        """
+        reporter = get_reporter(self.file_path, self.progress, self.cancel, 1)
+        num_records = 0
+        with self._open(reporter) as (lines, stream):
+            with pd.read_table(
+                filepath_or_buffer=stream,
+                chunksize=chunksize,
+                **self.read_params(lines),
+            ) as reader:
+                while True:
+                    with timed(self.metrics, "dataframe"):
+                        df = next(reader, None)
+                        if df is None:
+                            break
+                        df.dropna(axis="index", how="all", inplace=True)
+                    with timed(self.metrics, "rename"):
+                        df = rename_columns(
+                            df,
+                            input_format=self.export_format,
+                            target_format=MaccorDataFormat.raw,
+                        )
+                    self._count(len(df), with_size=False)
+                    num_records += len(df)
+                    if reporter is not None:
+                        reporter.update(num_records)
+                    yield df
+        self._count(0)
+        if reporter is not None:
+            reporter.finish(num_records)
+
+    def read_params(self, lines: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Keyword arguments for pandas.read_table according to the export format.
+        'lines' are the first lines of the file, read from 'file_path' if None."""
         config = Configurations[self.export_format.name].value
         params = {
             key: (getattr(value, "value", value))
@@ -417,24 +821,64 @@ class MaccorDataTxtFile(ReadTableResult):
         }
         # In case of MIMS Client 1 export:
         if callable(config.column_names):
-            params["names"] = config.column_names(self.file_path, config.header)
+            if lines is None:
+                with self._open() as (lines, _):
+                    pass
+            params["names"] = config.column_names(
+                self.file_path, config.header, lines=lines
+            )
         else:
             params["names"] = config.column_names
         for key in config.exclude_from_params:
             if key in params:
                 del params[key]
-        df = pd.read_table(filepath_or_buffer=self.file_path, **params)
-        if remove_nan_cols:
-            df.dropna(axis="columns", how="all", inplace=True)
-        df.dropna(axis="index", how="all", inplace=True)
-        self.data = MaccorTabularData(
-            as_list=rename_columns(
-                df, input_format=self.export_format, target_format=MaccorDataFormat.raw
-            ).to_dict(orient="records"),
-            data_format=self.export_format,
-        )
-        first_ten_lines = read_first_x_lines(self.file_path, 10)
-        ftl_str = "\n".join(first_ten_lines)
+        return params
+
+    def read_meta(self) -> dict:
+        """Parse the header lines of the file, without reading the rest of it"""
+        with self._open():
+            pass
+        return self.meta
+
+    def _count(self, num_records: int, with_size: bool = True):
+        """Add the records and the file size, if known, to the metrics"""
+        if self.metrics is None:
+            return
+        self.metrics.num_records += num_records
+        if with_size and not hasattr(self.file_path, "read"):
+            self.metrics.num_bytes += os.path.getsize(self.file_path)
+
+    @contextmanager
+    def _open(
+        self, reporter: Optional[ProgressReporter] = None
+    ) -> Iterator[Tuple[List[str], IO]]:
+        """Open the file as text stream, read the header lines into self.meta and
+        yield them together with a stream starting at the first line again. The
+        stream updates the reporter, if given, with the bytes read of the file."""
+        config = Configurations[self.export_format.name].value
+        num_lines = max(HEADER_LINES, config.header + 3)
+        with ExitStack() as stack:
+            source = self.file_path
+            if reporter is not None:
+                if not hasattr(source, "read"):
+                    source = stack.enter_context(open(source, "rb"))
+                    reporter.position = source.tell
+                    reporter.start(os.path.getsize(self.file_path), "bytes")
+                else:
+                    reporter.start(None, "records")
+            text = stack.enter_context(
+                open_text_stream(source, encoding=config.encoding.value)
+            )
+            with timed(self.metrics, "header"):
+                lines = list(islice(text, num_lines))
+                self._parse_meta(lines[:HEADER_LINES])
+            stream = PrefixedStream("".join(lines), text)
+            if reporter is not None:
+                stream = ReportingStream(stream, reporter)
+            yield lines, stream
+
+    def _parse_meta(self, first_lines: List[str]):
+        ftl_str = "\n".join(first_lines)
         self.meta = {}
         new_meta = apply_regex_return_match_groups(
             HeaderRegExs[self.export_format.name].value,
@@ -453,7 +897,14 @@ class MaccorDataTxtFile(ReadTableResult):
                 self.meta[key] = value
         self.meta.update(new_meta)
         # todo: read units from header where possible
-        return self
+
+    @field_validator("file_path")
+    def check_file_path(cls, v):
+        if hasattr(v, "read"):  # File-like object
+            return v
+        if not Path(v).exists():
+            raise ValueError(f"File '{v}' does not exist!")
+        return v
 
     @field_validator("export_format")
     def check_export_format(cls, v):
@@ -472,6 +923,11 @@ def read_maccor_data_file(
     file_path: Union[str, Path],
     frmt: MaccorDataFormat,
     dll_path: Optional[Union[str, Path]] = None,
+    meta_only: bool = False,
+    metrics: Optional[ReadMetrics] = None,
+    progress: Optional[Callable[[ReadProgress], Any]] = None,
+    cancel: Optional[CancellationToken] = None,
+    max_memory: Optional[float] = None,
 ):
     # todo: check if current and capacity (sign, accumulative counting etc. can be
     #  read and harmonized)
@@ -485,23 +941,179 @@ def read_maccor_data_file(
         provided the DLL will be looked for in the default location
         (src/maccor_utility/maccor_dll). The proprietary DLL is not part of this package
         and needs to be provided by the user.
+    meta_only : Only read the header of the file into 'meta', 'data' stays None.
+        Takes a few milliseconds regardless of the file size.
+    metrics : Records timings and counters of the read, if given. See ReadMetrics.
+    progress : Called with a ReadProgress while reading, relative to 'LastRecNum' of
+        raw files or the size of text files
+    cancel : Checked while reading. Once cancelled, the file is closed and
+        ReadCancelled is raised.
+    max_memory : Memory budget in MB. Once the records exceed it, they are spilled to
+        temporary files and 'data' is memory-mapped (SpilledTabularData).
     """
+    maccor_data_file = _get_reader(
+        file_path, frmt, dll_path, metrics, progress=progress, cancel=cancel
+    )
+    if meta_only:
+        maccor_data_file.read_meta()
+    else:
+        maccor_data_file.read(max_memory=max_memory)
+    return maccor_data_file
+
+
+def iter_maccor_data_file(
+    file_path: Union[str, Path],
+    frmt: MaccorDataFormat,
+    chunksize: int = 100_000,
+    dll_path: Optional[Union[str, Path]] = None,
+    metrics: Optional[ReadMetrics] = None,
+    progress: Optional[Callable[[ReadProgress], Any]] = None,
+    cancel: Optional[CancellationToken] = None,
+) -> Iterator[pd.DataFrame]:
+    """Read a Maccor data file in the specified format chunk by chunk
+
+    Parameters
+    ----------
+    file_path : The path to the file
+    frmt : The format of the file
+    chunksize : The number of records per chunk
+    dll_path : The path to the DLL file - only required to read raw files. See
+        read_maccor_data_file.
+    metrics : Records timings and counters of the read, if given. See ReadMetrics.
+    progress : Called with a ReadProgress while reading. See read_maccor_data_file.
+    cancel : Checked while reading. See read_maccor_data_file.
+
+    Yields
+    ------
+    pandas.DataFrame
+        The next 'chunksize' records with raw column names
+    """
+    maccor_data_file = _get_reader(
+        file_path, frmt, dll_path, metrics, progress=progress, cancel=cancel
+    )
+    yield from maccor_data_file.iter_chunks(chunksize=chunksize)
+
+
+def get_var_count(file_type: int) -> int:
+    """Number of variables of the records of raw files, depends on the file type"""
+    if file_type == 4:
+        return 50
+    elif file_type == (1 or 2):
+        return 15
+    return 0
+
+
+def get_chunk_columns(
+    reader: Union[MaccorDataRawFile, MaccorDataTxtFile], first_chunk: pd.DataFrame
+) -> List[str]:
+    """Columns of the first chunk followed by the further columns declared by the
+    header of raw files. Text exports have the same columns in all chunks."""
+    columns = [str(col) for col in first_chunk.columns]
+    if isinstance(reader, MaccorDataRawFile):
+        columns += [col for col in reader.get_columns() if col not in columns]
+    return columns
+
+
+def reindex_chunk(chunk: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+    """The chunk with exactly 'columns', missing ones as NaN"""
+    known = set(columns)
+    unexpected = [col for col in chunk.columns if col not in known]
+    if len(unexpected) > 0:
+        raise ValueError(
+            f"Columns {unexpected} are neither in the first chunk nor declared by "
+            "the header of the file!"
+        )
+    if list(chunk.columns) == columns:
+        return chunk
+    return chunk.reindex(columns=columns)
+
+
+def get_column_dtypes(chunk: pd.DataFrame) -> Dict[str, str]:
+    """Data types of the columns for all chunks of a file, following the column
+    schema of the raw file instead of the values of 'chunk': integer fields are
+    nullable Int64, further numeric columns float64, e.g., if 'DCIR' is 0 in the
+    first chunk only. Columns are object, if they hold text in the raw file or in
+    'chunk', e.g., the dates of text exports."""
+    dtypes = {}
+    for name in chunk.columns:
+        values = chunk[name]
+        if name in TEXT_COLUMNS or (
+            not pd.api.types.is_numeric_dtype(values) and values.notna().any()
+        ):
+            dtypes[name] = "object"
+        elif name in INTEGER_COLUMNS:
+            dtypes[name] = "Int64"
+        else:
+            dtypes[name] = "float64"
+    return dtypes
+
+
+def cast_chunk(chunk: pd.DataFrame, dtypes: Dict[str, str]) -> pd.DataFrame:
+    """The chunk with the data types of get_column_dtypes. Values that can not be
+    cast, e.g., decimals in an integer field, raise a ValueError."""
+    changed = {
+        name: dtype for name, dtype in dtypes.items() if chunk[name].dtype != dtype
+    }
+    if len(changed) == 0:
+        return chunk
+    columns = {}
+    for name, dtype in changed.items():
+        try:
+            columns[name] = chunk[name].astype(dtype)
+        except (TypeError, ValueError) as err:
+            raise ValueError(
+                f"Values of column '{name}' can not be cast to {dtype}: {err}"
+            ) from err
+    return chunk.assign(**columns)
+
+
+def _get_reader(
+    file_path: Union[str, Path],
+    frmt: MaccorDataFormat,
+    dll_path: Optional[Union[str, Path]],
+    metrics: Optional[ReadMetrics],
+    **kwargs: Any,
+) -> Union[MaccorDataRawFile, MaccorDataTxtFile]:
     if frmt == MaccorDataFormat.raw:
-        maccor_data_raw_file = MaccorDataRawFile(file_path=file_path, dll_path=dll_path)
-        maccor_data_raw_file.read()
-        return maccor_data_raw_file
-    maccor_data_txt_file = MaccorDataTxtFile(file_path=file_path, export_format=frmt)
-    maccor_data_txt_file.read()
-    return maccor_data_txt_file
+        return MaccorDataRawFile(
+            file_path=file_path, dll_path=dll_path, metrics=metrics, **kwargs
+        )
+    return MaccorDataTxtFile(
+        file_path=file_path, export_format=frmt, metrics=metrics, **kwargs
+    )
+
+
+def get_raw_dataframe(
+    data: Union[pd.DataFrame, MaccorTabularData, MaccorDataRawFile, MaccorDataTxtFile],
+) -> pd.DataFrame:
+    """Return the time series of a parsed Maccor result as DataFrame with raw column
+    names. DataFrames are expected to have raw column names already and are returned
+    as they are. No data is copied."""
+    if isinstance(data, (MaccorDataRawFile, MaccorDataTxtFile)):
+        data = data.data
+    if isinstance(data, MaccorTabularData):
+        return rename_columns(
+            data.as_dataframe.copy(deep=False),
+            input_format=data.data_format,
+            target_format=MaccorDataFormat.raw,
+        )
+    return data
 
 
 class Translations(Enum):
-    raw = TO_RAW
-    maccor_export1 = TO_EXPORT1
-    maccor_export2 = TO_EXPORT2
-    mims_client1 = TO_MIMS_CLIENT1
-    mims_client2 = TO_MIMS_CLIENT2
-    mims_server2 = TO_MIMS_SERVER2
+    """Column names of the formats as '{raw: [target, ...]}', built on first access
+    of 'table'. The values are the names of the tables in maccor_utility.lookup."""
+
+    raw = "TO_RAW"
+    maccor_export1 = "TO_EXPORT1"
+    maccor_export2 = "TO_EXPORT2"
+    mims_client1 = "TO_MIMS_CLIENT1"
+    mims_client2 = "TO_MIMS_CLIENT2"
+    mims_server2 = "TO_MIMS_SERVER2"
+
+    @property
+    def table(self) -> Dict[str, Any]:
+        return get_translation(self.value)
 
 
 def rename_columns(
@@ -511,10 +1123,10 @@ def rename_columns(
 ) -> pd.DataFrame:
     if input_format == target_format:
         return df
-    input_to_raw = inverse_dict_one_to_x(Translations[input_format.name].value)
+    input_to_raw = inverse_dict_one_to_x(Translations[input_format.name].table)
     replacements = input_to_raw
     if not target_format == MaccorDataFormat.raw:
-        raw_to_target = flatten_dict_one_to_x(Translations[target_format.name].value)
+        raw_to_target = flatten_dict_one_to_x(Translations[target_format.name].table)
         replacements = {
             k: raw_to_target.get(v, None)
             for k, v in input_to_raw.items()
@@ -524,6 +1136,23 @@ def rename_columns(
     return df
 
 
+@lru_cache(maxsize=None)
+def require_com() -> bool:
+    """Import pythoncom, required by the DLL, on first use instead of on import.
+    Warns once if COM is not available, e.g., on non-Windows operating systems."""
+    try:
+        import pythoncom  # noqa: F401 Require COM
+    except ImportError:
+        warn(
+            "COM not available. Most like you are running on a non-Windows operating "
+            "system. Else make sure to hav pywin32 installed. If you read this "
+            "message, you will most likely not be able to use the DLL and read "
+            "Maccor raw files directly."
+        )
+        return False
+    return True
+
+
 def datetime_fromdelphi(dvalue: float):
     """
 
@@ -547,6 +1176,39 @@ def datetime_fromdelphi(dvalue: float):
     return delphi_epoch + datetime.timedelta(days=dvalue)
 
 
+def get_dll_function(dll, name: str) -> Optional[Callable]:
+    """Return the function 'name' exported by the loaded DLL or None, if the DLL
+    version at hand does not provide it"""
+    try:
+        return getattr(dll, name)
+    except AttributeError:
+        warn(f"Function '{name}' not found in DLL. Skipping the respective data.")
+        return None
+
+
+def scope_trace_cube(scope_traces: np.ndarray) -> np.ndarray:
+    """Convert scope trace records into a dense array
+
+    Parameters
+    ----------
+    scope_traces : numpy.ndarray
+        Structured array with SCOPE_TRACE_DTYPE fields, e.g.,
+        MaccorDataRawFile.arrays["Scope traces"]
+
+    Returns
+    -------
+    numpy.ndarray
+        float32 array of shape (N, 50, 2), with voltage at [..., 0] and current at
+        [..., 1]. Readings beyond 'Samples' of a trace are set to NaN.
+    """
+    from numpy.lib.recfunctions import structured_to_unstructured
+
+    cube = structured_to_unstructured(scope_traces["Reading"], dtype=np.float32)
+    sample_idx = np.arange(cube.shape[1])
+    cube[sample_idx[None, :] >= scope_traces["Samples"][:, None]] = np.nan
+    return cube
+
+
 def get_bool_array_from_bit_field(
     ctype_bitfield, opts: Dict[str, bool] = None
 ) -> List[bool]:
@@ -623,6 +1285,7 @@ def get_top_lvl_procedure(
             )
     # the Maccor dll
     if loaded_dll is None:
+        require_com()
         md = ctypes.WinDLL(str(Path(path_to_dll).resolve()))
     else:
         md = loaded_dll
@@ -651,46 +1314,121 @@ def get_top_lvl_procedure(
         del md
 
 
-def get_procedure_and_subroutine(path_to_file, save_procedure_to):
-    # not implemented yet. Will work as follows:
-    # * read raw file as text file
-    # * identify sections containing procedure by opening statement
-    #   <MaccorTestProcedure> and by closing statement
-    #   </MaccorTestProcedure>
-    # * read the procedure name from the block of partially encoded text by looking
-    #   for '*.000'
-    # * the procedure description might be readable as well and can be found in front
-    #   of the procedure name
-    # * RecNum and StartDateTime of the subroutine call might not be identifiable since
-    #   they are encoded / stored in bits
-    # * save the XML data as a procedure file
-    pass
-
-
-def import_maccor_cycling_data(file):
-    data = pd.read_table(
-        filepath_or_buffer=file, header=1, decimal=".", thousands=",", index_col=False
-    )
-    return data
+def read_procedures(
+    path_to_file: Union[str, Path], max_bytes: Optional[int] = None
+) -> List[MaccorProcedure]:
+    """Extract the test procedure and its subroutines from a Maccor raw file without
+    the DLL. The file is memory-mapped and scanned for '<MaccorTestProcedure>'
+    blocks, the data records are not read.
 
+    Parameters
+    ----------
+    path_to_file : str or pathlib.Path
+        Path to the raw file
+    max_bytes : int
+        Only scan the first 'max_bytes' bytes, e.g., to skip the data records of
+        large files. Scans the whole file if None.
 
-def import_maccor_cycling_stats(file):
-    # Attention: the header line is actually in line 7 (indexed from 0), but an empty
-    # line with a new line statement is ignored
-    data = pd.read_table(
-        filepath_or_buffer=file,
-        header=6,
-        decimal=",",
-        index_col=False,
-        encoding="windows-1252",
-    )
-    return data
+    Returns
+    -------
+    list of MaccorProcedure
+        In the order of the file, the top level procedure first
+    """
+    procedures = []
+    with open(path_to_file, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return procedures
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            end = len(mm) if max_bytes is None else min(max_bytes, len(mm))
+            for encoding in PROCEDURE_ENCODINGS:
+                start_tag = PROCEDURE_START_TAG.encode(encoding)
+                end_tag = PROCEDURE_END_TAG.encode(encoding)
+                pos = mm.find(start_tag, 0, end)
+                block_end = 0
+                while pos >= 0:
+                    # Only look for the name behind the previous procedure
+                    name_start = max(pos - PROCEDURE_NAME_WINDOW, block_end)
+                    block_end = mm.find(end_tag, pos, end)
+                    if block_end < 0:
+                        break
+                    block_end += len(end_tag)
+                    procedures.append(
+                        MaccorProcedure(
+                            name=_find_procedure_name(mm[name_start:pos]),
+                            offset=pos,
+                            xml=mm[pos:block_end].decode(encoding, errors="replace"),
+                        )
+                    )
+                    pos = mm.find(start_tag, block_end, end)
+                if len(procedures) > 0:
+                    break
+    return procedures
+
+
+def get_procedure_and_subroutine(
+    path_to_file: Union[str, Path],
+    save_procedure_to: Optional[Union[str, Path]] = None,
+) -> List[MaccorProcedure]:
+    """Read the test procedure and its subroutines from a Maccor raw file without the
+    DLL, see read_procedures(), and optionally save them as procedure files
+
+    Parameters
+    ----------
+    path_to_file : str or pathlib.Path
+        Path to the raw file
+    save_procedure_to : str or pathlib.Path
+        Path to save the top level procedure to. Subroutines are saved to the same
+        directory, under their own name if it was found, else as
+        '<stem>_subroutine_<i><suffix>'. Nothing is saved if None.
+    """
+    procedures = read_procedures(path_to_file)
+    if save_procedure_to is None or len(procedures) == 0:
+        return procedures
+    save_procedure_to = Path(save_procedure_to)
+    procedures[0].save(save_procedure_to)
+    for idx, subroutine in enumerate(procedures[1:], start=1):
+        file_name = (
+            Path(subroutine.name).name
+            if subroutine.name is not None
+            else f"{save_procedure_to.stem}_subroutine_{idx}{save_procedure_to.suffix}"
+        )
+        subroutine.save(save_procedure_to.parent / file_name)
+    return procedures
+
+
+def _find_procedure_name(preceding: bytes) -> Optional[str]:
+    """The last procedure file name, e.g., 'Test.000', in front of a procedure"""
+    matches = PROCEDURE_NAME_REGEX.findall(preceding)
+    if len(matches) == 0:
+        return None
+    return matches[-1].decode("latin-1").strip()
+
+
+def import_maccor_cycling_data(file: Union[str, Path]) -> pd.DataFrame:
+    """Read a cycling data export with cycle_stats.MaccorCyclingDataFile, see there
+    for chunked reading and the meta data"""
+    # Imported here, as cycle_stats depends on this module
+    from maccor_utility.cycle_stats import MaccorCyclingDataFile
+
+    return MaccorCyclingDataFile(file_path=file).read().data
+
+
+def import_maccor_cycling_stats(file: Union[str, Path]) -> pd.DataFrame:
+    """Read a cycle statistics export with cycle_stats.MaccorCycleStatsFile, see
+    there for chunked reading, the meta data and cycle_stats.CycleIndex to link the
+    cycles to the time series"""
+    # Imported here, as cycle_stats depends on this module
+    from maccor_utility.cycle_stats import MaccorCycleStatsFile
+
+    return MaccorCycleStatsFile(file_path=file).read().data
 
 
 # function definition as in readmacfile.py
 def process_exists(process_name):
     call = "TASKLIST", "/FI", "imagename eq %s" % process_name
     # use buildin check_output right away
+    import subprocess
+
     output = subprocess.check_output(call).decode()
     # check in last line for process name
     last_line = output.strip().split("\r\n")[-1]
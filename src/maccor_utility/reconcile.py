@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+__docformat__ = "NumPy"
+__author__ = "Lukas Gold, Simon Stier"
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel, Field
+from typing_extensions import Dict, List, Optional, Tuple, Union
+
+from maccor_utility.helper_functions import column_to_numeric
+from maccor_utility.read import get_raw_dataframe
+from maccor_utility.validate import MAX_RANGES, Violation
+
+
+# Classes
+class RecNumRanges(Violation):
+    """Number of records and the ranges of their 'RecNum' values (first and last
+    value, inclusive). Only the first 'max_ranges' ranges are kept."""
+
+    def add(self, rec_nums: np.ndarray, max_ranges: int = MAX_RANGES):
+        """Add sorted, integer RecNum values, merging them into ranges"""
+        super().add(rec_nums, max_ranges)
+
+
+class ColumnDeviation(BaseModel):
+    num_compared: int = 0  # Matched records with a value in both results
+    num_missing_values: int = 0  # Matched records with a value in one result only
+    max_abs_deviation: float = 0.0
+    rec_num_of_max: Optional[int] = None
+    num_exceeding: int = 0  # Records deviating by more than the tolerance
+
+
+class ReconciliationReport(BaseModel):
+    """Result of comparing two parsed results of the same test. 'missing' and 'extra'
+    hold the RecNum values found only in the left or only in the right result.
+    Records without a valid 'RecNum' can not be matched and are only counted."""
+
+    num_left: int
+    num_right: int
+    num_matched: int
+    num_duplicates_left: int = 0
+    num_duplicates_right: int = 0
+    num_invalid_rec_num_left: int = 0
+    num_invalid_rec_num_right: int = 0
+    missing: RecNumRanges = Field(default_factory=RecNumRanges)
+    extra: RecNumRanges = Field(default_factory=RecNumRanges)
+    only_left_columns: List[str] = []
+    only_right_columns: List[str] = []
+    not_comparable_columns: List[str] = []
+    columns: Dict[str, ColumnDeviation] = {}
+
+    @property
+    def agrees(self) -> bool:
+        """True, if all records match and no column exceeds its tolerance"""
+        return (
+            self.missing.count == 0
+            and self.extra.count == 0
+            and all(col.num_exceeding == 0 for col in self.columns.values())
+        )
+
+
+# Functions
+def reconcile(
+    left,
+    right,
+    columns: Optional[List[str]] = None,
+    tolerance: Union[float, Dict[str, float]] = 0.0,
+    max_ranges: int = MAX_RANGES,
+) -> ReconciliationReport:
+    """Compare two parsed results of the same test, e.g., a raw file and one of its
+    exports. Both are mapped to raw column names via the translation tables and
+    aligned on 'RecNum'. Text values, like the 'DPtTime' of the exports, are
+    converted with column_to_numeric before the comparison.
+
+    Parameters
+    ----------
+    left, right : pandas.DataFrame or MaccorTabularData or MaccorDataRawFile or
+        MaccorDataTxtFile
+        The parsed results
+    columns : list of str
+        Raw column names to compare. Defaults to all columns present in both.
+    tolerance : float or dict
+        Absolute deviation tolerated, for all columns or per column. Exports are
+        rounded to a few decimals, so a tolerance of 0 will rarely agree.
+    max_ranges : int
+        Number of RecNum ranges stored for missing and extra records
+
+    Returns
+    -------
+    ReconciliationReport
+    """
+    left_df = get_raw_dataframe(left)
+    right_df = get_raw_dataframe(right)
+    left_rec, left_dup = _get_rec_nums(left_df)
+    right_rec, right_dup = _get_rec_nums(right_df)
+    left_valid = ~np.isnan(left_rec)
+    right_valid = ~np.isnan(right_rec)
+    # Join on RecNum, first occurrence of duplicates
+    _, left_idx, right_idx = np.intersect1d(
+        left_rec[~left_dup], right_rec[~right_dup], return_indices=True
+    )
+    left_idx = np.flatnonzero(~left_dup)[left_idx]
+    right_idx = np.flatnonzero(~right_dup)[right_idx]
+    report = ReconciliationReport(
+        num_left=len(left_df),
+        num_right=len(right_df),
+        num_matched=len(left_idx),
+        num_duplicates_left=int(left_dup.sum()),
+        num_duplicates_right=int(right_dup.sum()),
+        num_invalid_rec_num_left=int((~left_valid).sum()),
+        num_invalid_rec_num_right=int((~right_valid).sum()),
+        only_left_columns=[col for col in left_df if col not in right_df],
+        only_right_columns=[col for col in right_df if col not in left_df],
+    )
+    # NaN is dropped before the cast, it would become an arbitrary integer
+    report.missing.add(
+        np.setdiff1d(left_rec[~left_dup & left_valid], right_rec).astype(np.int64),
+        max_ranges,
+    )
+    report.extra.add(
+        np.setdiff1d(right_rec[~right_dup & right_valid], left_rec).astype(np.int64),
+        max_ranges,
+    )
+    if columns is None:
+        columns = [col for col in left_df if col in right_df and col != "RecNum"]
+    matched_rec = left_rec[left_idx]
+    for col in columns:
+        left_values = column_to_numeric(left_df[col])[left_idx]
+        right_values = column_to_numeric(right_df[col])[right_idx]
+        if (np.isnan(left_values).all() or np.isnan(right_values).all()) and not (
+            left_df[col].isna().all() and right_df[col].isna().all()
+        ):
+            report.not_comparable_columns.append(col)
+            continue
+        col_tolerance = (
+            tolerance.get(col, 0.0) if isinstance(tolerance, dict) else tolerance
+        )
+        report.columns[col] = _compare(
+            left_values, right_values, matched_rec, col_tolerance
+        )
+    return report
+
+
+def _get_rec_nums(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """RecNum values and a mask of the duplicates (all but the first occurrence)"""
+    if "RecNum" not in df:
+        raise KeyError("Results can only be reconciled if they contain 'RecNum'!")
+    rec_num = column_to_numeric(df["RecNum"])
+    order = np.argsort(rec_num, kind="stable")
+    duplicate = np.zeros(len(rec_num), dtype=bool)
+    duplicate[order[1:]] = rec_num[order][1:] == rec_num[order][:-1]
+    return rec_num, duplicate
+
+
+def _compare(
+    left: np.ndarray, right: np.ndarray, rec_num: np.ndarray, tolerance: float
+) -> ColumnDeviation:
+    both = ~np.isnan(left) & ~np.isnan(right)
+    deviation = np.abs(left[both] - right[both])
+    deviation_result = ColumnDeviation(
+        num_compared=int(both.sum()),
+        num_missing_values=int((np.isnan(left) != np.isnan(right)).sum()),
+        num_exceeding=int((deviation > tolerance).sum()),
+    )
+    if len(deviation) > 0:
+        pos = int(np.argmax(deviation))
+        deviation_result.max_abs_deviation = float(deviation[pos])
+        deviation_result.rec_num_of_max = int(rec_num[both][pos])
+    return deviation_result
+
+
+# Line before the last line of the file
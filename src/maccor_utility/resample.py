@@ -0,0 +1,226 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+__docformat__ = "NumPy"
+__author__ = "Lukas Gold, Simon Stier"
+
+# Python version dependent import statement:
+try:
+    from enum import StrEnum
+except ImportError:
+    from strenum import StrEnum
+
+import numpy as np
+import pandas as pd
+from typing_extensions import Dict, Iterable, Iterator, List, Sequence
+
+from maccor_utility.helper_functions import get_segment_bounds
+from maccor_utility.read import get_raw_dataframe
+
+# Constants
+DEFAULT_COLUMNS = ("Current", "Voltage")
+
+
+# Classes
+class InterpolationMethod(StrEnum):
+    linear = "linear"
+    zero_order_hold = "zero_order_hold"
+
+
+class SegmentBy(StrEnum):
+    step = "step"
+    cycle = "cycle"
+
+
+SEGMENT_KEYS = {
+    SegmentBy.step: ["CycleNumProc", "StepNum"],
+    SegmentBy.cycle: ["CycleNumProc"],
+}
+
+
+class Resampler(object):
+    """Resamples Maccor time series onto a uniform 'TestTime' grid, segment by
+    segment. Values are never interpolated across segment boundaries, i.e., steps or
+    cycles. Chunks, e.g., from iter_maccor_data_file, are processed one after the
+    other: the records of the last, possibly unfinished segment of a chunk are kept
+    and resampled together with the next chunk or on flush().
+
+    Parameters
+    ----------
+    dt : float
+        Spacing of the grid in seconds
+    columns : sequence of str
+        Columns to resample, e.g., 'Current', 'Voltage' or temperature columns like
+        'Aux1' (raw column names)
+    method : InterpolationMethod
+        Linear interpolation or zero-order hold (last value)
+    segment_by : SegmentBy
+        Start a new grid with each step or with each cycle
+    align : bool
+        If True, the grid consists of multiples of 'dt' (in 'TestTime'). Else, the
+        grid of each segment starts with the first record of the segment.
+    """
+
+    def __init__(
+        self,
+        dt: float,
+        columns: Sequence[str] = DEFAULT_COLUMNS,
+        method: InterpolationMethod = InterpolationMethod.linear,
+        segment_by: SegmentBy = SegmentBy.step,
+        align: bool = False,
+    ):
+        if dt <= 0:
+            raise ValueError(f"Grid spacing 'dt' must be positive, got {dt}!")
+        self.dt = dt
+        self.columns = list(columns)
+        self.method = InterpolationMethod(method)
+        self.segment_by = SegmentBy(segment_by)
+        self.keys = SEGMENT_KEYS[self.segment_by]
+        self.align = align
+        # Pieces of the last, open segment. Concatenated once, when it is closed.
+        self._carry: List[Dict[str, np.ndarray]] = []
+
+    def process(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """Resample all segments of 'chunk' that are complete. 'chunk' must have raw
+        column names."""
+        arrays = {col: chunk[col].to_numpy() for col in ["TestTime"] + self.keys}
+        arrays["values"] = chunk[self.columns].to_numpy(dtype=np.float64)
+        if self._carry:
+            last = self._carry[-1]
+            if all(np.all(arrays[key] == last[key][-1]) for key in self.keys):
+                # The open segment spans the whole chunk
+                self._carry.append(arrays)
+                return self._empty()
+            arrays = self._join(self._carry + [arrays])
+        starts, ends = get_segment_bounds([arrays[key] for key in self.keys])
+        if len(starts) == 0:
+            self._carry = []
+            return self._empty()
+        # The last segment might continue in the next chunk
+        last_start = starts[-1]
+        self._carry = [{key: arr[last_start:] for key, arr in arrays.items()}]
+        return self._resample(arrays, starts[:-1], ends[:-1])
+
+    def flush(self) -> pd.DataFrame:
+        """Resample the records kept from the last chunk"""
+        if not self._carry:
+            return self._empty()
+        arrays = self._join(self._carry)
+        self._carry = []
+        starts, ends = get_segment_bounds([arrays[key] for key in self.keys])
+        return self._resample(arrays, starts, ends)
+
+    @staticmethod
+    def _join(pieces: List[Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+        if len(pieces) == 1:
+            return pieces[0]
+        return {
+            key: np.concatenate([piece[key] for piece in pieces]) for key in pieces[0]
+        }
+
+    def _resample(
+        self, arrays: Dict[str, np.ndarray], starts: np.ndarray, ends: np.ndarray
+    ) -> pd.DataFrame:
+        test_time = arrays["TestTime"].astype(np.float64, copy=False)
+        values = arrays["values"]
+        # Grid: for each segment all points between first and last record
+        origin = test_time[starts]
+        if self.align:
+            origin = np.ceil(origin / self.dt) * self.dt
+        counts = np.floor((test_time[ends - 1] - origin) / self.dt + 1e-9)
+        counts = np.clip(counts, -1, None).astype(np.int64) + 1
+        segment = np.repeat(np.arange(len(starts)), counts)
+        point_in_segment = np.arange(counts.sum()) - np.repeat(
+            np.cumsum(counts) - counts, counts
+        )
+        grid = origin[segment] + point_in_segment * self.dt
+        # Index of the last record at or before each grid point, bound to the segment
+        seg_start = starts[segment]
+        seg_last = ends[segment] - 1
+        lower = np.searchsorted(test_time, grid, side="right") - 1
+        lower = np.clip(lower, seg_start, seg_last)
+        if self.method == InterpolationMethod.zero_order_hold:
+            resampled = values[lower]
+        else:
+            upper = np.minimum(lower + 1, seg_last)
+            span = test_time[upper] - test_time[lower]
+            weight = np.divide(
+                grid - test_time[lower],
+                span,
+                out=np.zeros_like(grid),
+                where=span > 0,
+            )
+            resampled = values[lower] + weight[:, None] * (
+                values[upper] - values[lower]
+            )
+        result = {"TestTime": grid}
+        for key in self.keys:
+            result[key] = arrays[key][seg_start]
+        result["StepTime"] = grid - test_time[seg_start]
+        for idx, col in enumerate(self.columns):
+            result[col] = resampled[:, idx]
+        return pd.DataFrame(result)
+
+    def _empty(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            columns=["TestTime"] + self.keys + ["StepTime"] + self.columns
+        )
+
+
+# Functions
+def resample(
+    data,
+    dt: float,
+    columns: Sequence[str] = DEFAULT_COLUMNS,
+    method: InterpolationMethod = InterpolationMethod.linear,
+    segment_by: SegmentBy = SegmentBy.step,
+    align: bool = False,
+) -> pd.DataFrame:
+    """Resample a parsed Maccor time series onto a uniform 'TestTime' grid per step or
+    per cycle. See Resampler for the parameters.
+
+    Parameters
+    ----------
+    data : pandas.DataFrame or MaccorTabularData or MaccorDataRawFile or
+        MaccorDataTxtFile
+        The parsed time series
+    """
+    resampler = Resampler(
+        dt=dt, columns=columns, method=method, segment_by=segment_by, align=align
+    )
+    frames = [resampler.process(get_raw_dataframe(data)), resampler.flush()]
+    frames = [frame for frame in frames if len(frame) > 0]
+    if len(frames) == 0:
+        return resampler.flush()
+    return pd.concat(frames, ignore_index=True)
+
+
+def resample_chunks(
+    chunks: Iterable[pd.DataFrame],
+    dt: float,
+    columns: Sequence[str] = DEFAULT_COLUMNS,
+    method: InterpolationMethod = InterpolationMethod.linear,
+    segment_by: SegmentBy = SegmentBy.step,
+    align: bool = False,
+) -> Iterator[pd.DataFrame]:
+    """Resample chunks as returned by iter_maccor_data_file. See Resampler for the
+    parameters.
+
+    Yields
+    ------
+    pandas.DataFrame
+        The resampled segments completed with each chunk
+    """
+    resampler = Resampler(
+        dt=dt, columns=columns, method=method, segment_by=segment_by, align=align
+    )
+    for chunk in chunks:
+        resampled = resampler.process(chunk)
+        if len(resampled) > 0:
+            yield resampled
+    resampled = resampler.flush()
+    if len(resampled) > 0:
+        yield resampled
+
+
+# Line before the last line of the file
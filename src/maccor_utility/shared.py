@@ -0,0 +1,272 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+__docformat__ = "NumPy"
+__author__ = "Lukas Gold, Simon Stier"
+
+__doc__ = """
+Transfer of parsed results from worker processes via shared memory instead of
+pickling the DataFrames. The worker places the columns in a shared memory block and
+returns a small SharedResultDescriptor, the parent maps the columns without copying.
+Example:
+
+    with ProcessPoolExecutor() as pool:
+        for descriptor in pool.map(read_to_shared_memory, file_paths, formats):
+            with SharedResult(descriptor) as result:
+                df = result.data.as_dataframe  # Valid until the block is released
+
+On Windows, a block only exists as long as a process has it open. The worker keeps
+its blocks open until the parent has mapped them: SharedResult sets a flag in the
+header of the block, the worker closes the flagged blocks on its next call of
+to_shared_memory or of release_worker_blocks. Blocks not mapped yet stay open
+until the worker exits, so the parent has to map them before the pool is shut
+down, as above.
+"""
+
+import gc
+import os
+from multiprocessing import resource_tracker, shared_memory
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel
+from typing_extensions import Any, Dict, List, Optional, Union
+
+from maccor_utility.helper_functions import to_plain
+from maccor_utility.read import (
+    MaccorDataFormat,
+    MaccorDataRawFile,
+    MaccorDataTxtFile,
+    MaccorTabularData,
+    read_maccor_data_file,
+)
+from maccor_utility.spill import MappedTabularData, from_column, to_column
+
+# Constants
+ALIGNMENT = 64  # Bytes, offsets of the columns in the block are multiples of it
+HEADER_SIZE = ALIGNMENT  # Bytes in front of the columns, see MAPPED_FLAG
+MAPPED_FLAG = 0  # Position of the byte set to 1 once the receiver mapped the block
+# A block only exists as long as a process has it open
+KEEP_BLOCKS_OPEN = os.name == "nt"
+
+_worker_blocks: Dict[str, shared_memory.SharedMemory] = {}  # Not mapped by now
+
+
+# Classes
+class SharedColumn(BaseModel):
+    name: str
+    dtype: str  # NumPy dtype string, e.g., '<f8' or '<U32'
+    offset: int  # Position in the block in bytes
+    pandas_dtype: str  # Of the series, e.g., 'str' or 'Int64'
+    mask_offset: Optional[int] = None  # Of the missing values, see spill.to_column
+
+
+class SharedResultDescriptor(BaseModel):
+    """Everything needed to map a result placed in shared memory, cheap to pickle"""
+
+    block_name: str  # Name of the shared memory block
+    num_rows: int
+    columns: List[SharedColumn]
+    data_format: MaccorDataFormat
+    meta: Optional[dict] = None  # Plain values, see helper_functions.to_plain
+
+
+class SharedTabularData(MappedTabularData):
+    """MaccorTabularData with the columns of 'as_dataframe' mapped from a shared
+    memory block"""
+
+    columns: Dict[str, Any]  # NumPy or pandas arrays
+
+    def to_dataframe(self) -> pd.DataFrame:
+        return pd.DataFrame(self.columns, copy=False)
+
+
+class SharedResult(object):
+    """Maps a result placed in shared memory by the descriptor. Used as context
+    manager, the block is released on exit: the mapping is closed and the block is
+    removed, if 'unlink'. 'data' must not be used after the release.
+
+    Parameters
+    ----------
+    descriptor : SharedResultDescriptor
+        As returned by to_shared_memory in the worker process
+    unlink : bool
+        Remove the block on release. Each block must be removed exactly once.
+    """
+
+    def __init__(self, descriptor: SharedResultDescriptor, unlink: bool = True):
+        self.descriptor = descriptor
+        self.unlink = unlink
+        self.meta = descriptor.meta
+        self._block = shared_memory.SharedMemory(name=descriptor.block_name)
+        # Tells the worker, that it may close the block
+        self._block.buf[MAPPED_FLAG] = 1
+        columns = {
+            column.name: from_column(
+                self._map(column.dtype, column.offset),
+                (
+                    None
+                    if column.mask_offset is None
+                    else self._map("|b1", column.mask_offset)
+                ),
+                column.pandas_dtype,
+            )
+            for column in descriptor.columns
+        }
+        self.data: Optional[SharedTabularData] = SharedTabularData(
+            columns=columns, data_format=descriptor.data_format
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _map(self, dtype: str, offset: int) -> np.ndarray:
+        return np.ndarray(
+            (self.descriptor.num_rows,),
+            dtype=np.dtype(dtype),
+            buffer=self._block.buf,
+            offset=offset,
+        )
+
+    def close(self):
+        if self._block is None:
+            return
+        self.data = None
+        gc.collect()  # Release the views of the DataFrame on the block
+        if self.unlink:
+            self._block.unlink()
+        try:
+            self._block.close()
+        except BufferError:
+            # Views are still in use, the block is unmapped once they are released
+            pass
+        self._block = None
+
+
+# Functions
+def to_shared_memory(
+    data: Union[pd.DataFrame, MaccorTabularData, MaccorDataRawFile, MaccorDataTxtFile],
+    data_format: Optional[MaccorDataFormat] = None,
+    meta: Optional[dict] = None,
+) -> SharedResultDescriptor:
+    """Copy the columns of a parsed result into a new shared memory block. Numeric
+    columns keep their dtype, strings are stored as fixed-width unicode; the
+    missing values of strings and nullable integers are stored separately, see
+    spill.to_column. The block is kept after this process exits,
+    it is removed by SharedResult in the receiving process.
+
+    Parameters
+    ----------
+    data : pandas.DataFrame or MaccorTabularData or MaccorDataRawFile or
+        MaccorDataTxtFile
+        The parsed time series
+    data_format : MaccorDataFormat
+        Format of the column names of DataFrames. Taken from 'data' otherwise.
+        Defaults to raw.
+    meta : dict
+        Meta data of the file. Taken from reader results, if None.
+    """
+    release_worker_blocks()
+    if isinstance(data, (MaccorDataRawFile, MaccorDataTxtFile)):
+        if data.data is None:
+            raise ValueError("The file was not read yet, call read() first!")
+        meta = data.meta if meta is None else meta
+        data = data.data
+    if isinstance(data, MaccorTabularData):
+        data_format = data.data_format if data_format is None else data_format
+        data = data.as_dataframe
+    if data_format is None:
+        data_format = MaccorDataFormat.raw
+    columns, arrays, size = [], [], HEADER_SIZE
+    for name in data.columns:
+        values, missing = to_column(data[name])
+        column = SharedColumn(
+            name=str(name),
+            dtype=values.dtype.str,
+            offset=size,
+            pandas_dtype=str(data[name].dtype),
+        )
+        size += _aligned(values.nbytes)
+        arrays.append((column.offset, values))
+        if missing is not None:
+            column.mask_offset = size
+            size += _aligned(missing.nbytes)
+            arrays.append((column.mask_offset, missing))
+        columns.append(column)
+    block = _create_block(size)
+    try:
+        block.buf[MAPPED_FLAG] = 0
+        for offset, array in arrays:
+            target = np.ndarray(
+                array.shape, dtype=array.dtype, buffer=block.buf, offset=offset
+            )
+            target[:] = array
+            del target
+        descriptor = SharedResultDescriptor(
+            block_name=block.name,
+            num_rows=len(data),
+            columns=columns,
+            data_format=data_format,
+            meta=None if meta is None else to_plain(meta),
+        )
+    except BaseException:
+        block.close()
+        block.unlink()
+        raise
+    _hand_over(block)
+    return descriptor
+
+
+def read_to_shared_memory(
+    file_path: Union[str, Path],
+    frmt: MaccorDataFormat,
+    dll_path: Optional[Union[str, Path]] = None,
+    **kwargs: Any,
+) -> SharedResultDescriptor:
+    """Read a file with read_maccor_data_file and place the result in shared memory,
+    e.g., as function of a process pool. See to_shared_memory."""
+    result = read_maccor_data_file(file_path, frmt=frmt, dll_path=dll_path, **kwargs)
+    return to_shared_memory(result)
+
+
+def release_worker_blocks() -> int:
+    """Close the blocks kept open by this process (on Windows), which were mapped by
+    the receiving process in the meantime. Returns the number of blocks still open.
+    """
+    for name, block in list(_worker_blocks.items()):
+        if block.buf[MAPPED_FLAG]:
+            block.close()
+            del _worker_blocks[name]
+    return len(_worker_blocks)
+
+
+def _create_block(size: int) -> shared_memory.SharedMemory:
+    try:  # Python >= 3.13: not removed when this process exits
+        return shared_memory.SharedMemory(create=True, size=size, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(create=True, size=size)
+
+
+def _hand_over(block: shared_memory.SharedMemory):
+    """Leave the block to the receiving process, which removes it. Closed in this
+    process, except on Windows, where the block would be gone with the last handle.
+    There, it is closed by release_worker_blocks once the receiver mapped it.
+    """
+    if KEEP_BLOCKS_OPEN:
+        _worker_blocks[block.name] = block
+        return
+    if getattr(block, "_track", True):
+        # Else the resource tracker removes the block when this process exits
+        resource_tracker.unregister(block._name, "shared_memory")
+    block.close()
+
+
+def _aligned(num_bytes: int) -> int:
+    return -(-num_bytes // ALIGNMENT) * ALIGNMENT
+
+
+# Line before the last line of the file
@@ -0,0 +1,309 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+__docformat__ = "NumPy"
+__author__ = "Lukas Gold, Simon Stier"
+
+import os
+import shutil
+import tempfile
+import weakref
+from collections.abc import Sequence
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from typing_extensions import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from maccor_utility.read import MaccorDataFormat, MaccorTabularData, rename_columns
+
+# Constants
+BYTES_PER_MB = 2**20
+SPILL_CHUNKSIZE = 50_000  # Max. records per chunk read with a memory budget
+RECORDS_PER_BATCH = 10_000  # Records converted to dicts at once by LazyRecords
+# NumPy dtype kind of stored values: nullable pandas dtype and its NumPy dtype
+MASKED_DTYPES = {"b": ("boolean", np.bool_), "f": ("Float64", np.float64)}
+
+
+# Classes
+class ColumnStore(object):
+    """Columns appended chunk by chunk to one binary file each, read back as memory
+    maps. Strings are stored as fixed-width unicode and nullable integers as
+    integers, both with a second file marking the missing values, see to_column.
+    If the values of a later chunk need a wider dtype, e.g., NaN in an integer
+    column, the file of the column is converted. Strings are widened at least to
+    twice their width, so that growing strings convert the file a few times only.
+
+    Parameters
+    ----------
+    directory : str or Path
+        Directory of the files. A temporary directory, removed together with the
+        store, if None.
+    """
+
+    def __init__(self, directory: Optional[Union[str, Path]] = None):
+        if directory is None:
+            directory = tempfile.mkdtemp(prefix="maccor_spill_")
+            # Errors are ignored, e.g., files still memory-mapped on Windows
+            self._finalizer = weakref.finalize(
+                self, shutil.rmtree, directory, ignore_errors=True
+            )
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.num_rows = 0
+        self.dtypes: Dict[str, np.dtype] = {}
+        self.pandas_dtypes: Dict[str, str] = {}  # Of the first chunk, see from_column
+        self.masked: Set[str] = set()  # Columns with a file of the missing values
+        self.has_values: Dict[str, bool] = {}  # Whether a column has any non-NaN
+
+    def append(self, chunk: pd.DataFrame):
+        for col in chunk.columns:
+            values, missing = to_column(chunk[col])
+            if col not in self.dtypes:
+                self.dtypes[col] = values.dtype
+                self.pandas_dtypes[col] = str(chunk[col].dtype)
+                self.has_values[col] = False
+                if missing is not None:
+                    self.masked.add(col)
+                if self.num_rows > 0:  # A column missing in the previous chunks
+                    self._write(col, *self._missing(col, self.num_rows))
+            self.has_values[col] |= bool(chunk[col].notna().any())
+            self._write(col, values, missing)
+        for col in self.dtypes:
+            if col not in chunk:
+                self._write(col, *self._missing(col, len(chunk)))
+        self.num_rows += len(chunk)
+
+    def to_dataframe(self, remove_nan_cols: bool = False) -> pd.DataFrame:
+        """The columns as memory maps, without loading them. String columns are
+        loaded once converted to objects by pandas."""
+        columns = {
+            col: self.read_column(col)
+            for col in self.dtypes
+            if self.has_values[col] or not remove_nan_cols
+        }
+        return pd.DataFrame(columns, copy=False)
+
+    def read_column(
+        self, col: str
+    ) -> Union[np.ndarray, pd.api.extensions.ExtensionArray]:
+        """The values of the column, with the missing ones restored"""
+        missing = self._read(self._mask_path(col), bool) if col in self.masked else None
+        return from_column(
+            self._read(self._path(col), self.dtypes[col]),
+            missing,
+            self.pandas_dtypes[col],
+        )
+
+    def _read(self, path: Path, dtype: np.dtype) -> np.ndarray:
+        if self.num_rows == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode="r", shape=(self.num_rows,))
+
+    def _write(self, col: str, values: np.ndarray, missing: Optional[np.ndarray]):
+        dtype = _promote(self.dtypes[col], values.dtype)
+        if dtype.kind == "U" and dtype != self.dtypes[col]:
+            width = max(dtype.itemsize, 2 * self.dtypes[col].itemsize) // 4
+            dtype = np.dtype(f"U{width}")
+        if dtype != self.dtypes[col] and self._path(col).exists():
+            converted = np.fromfile(self._path(col), dtype=self.dtypes[col])
+            converted.astype(dtype).tofile(self._path(col))
+        if dtype.kind == "U" and col not in self.masked:
+            # Numbers converted to strings, none of them missing
+            self.masked.add(col)
+            num_written = 0
+            if self._path(col).exists():
+                num_written = os.path.getsize(self._path(col)) // dtype.itemsize
+            np.zeros(num_written, dtype=bool).tofile(self._mask_path(col))
+        self.dtypes[col] = dtype
+        with open(self._path(col), "ab") as file:
+            values.astype(dtype, copy=False).tofile(file)
+        if col in self.masked:
+            if missing is None:
+                missing = np.zeros(len(values), dtype=bool)
+            with open(self._mask_path(col), "ab") as file:
+                missing.tofile(file)
+
+    def _missing(
+        self, col: str, num_rows: int
+    ) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """Values of a column missing in a chunk: NaN, or masked values"""
+        if col in self.masked:
+            return np.zeros(num_rows, dtype=self.dtypes[col]), np.ones(num_rows, bool)
+        return np.full(num_rows, np.nan), None
+
+    def _path(self, col: str) -> Path:
+        return self.directory / f"{list(self.dtypes).index(col)}.bin"
+
+    def _mask_path(self, col: str) -> Path:
+        return self.directory / f"{list(self.dtypes).index(col)}.missing"
+
+
+class LazyRecords(Sequence):
+    """The rows of a DataFrame as dicts, created on access, i.e., 'as_list' of
+    MappedTabularData"""
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.df.iloc[index].to_dict(orient="records")
+        return self.df.iloc[index].to_dict()
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for start in range(0, len(self.df), RECORDS_PER_BATCH):
+            yield from self.df.iloc[start : start + RECORDS_PER_BATCH].to_dict(
+                orient="records"
+            )
+
+
+class MappedTabularData(MaccorTabularData):
+    """MaccorTabularData with 'as_dataframe' backed by memory maps, e.g., of files
+    or of shared memory, see to_dataframe(). 'as_list' creates the row dicts on
+    access."""
+
+    as_list: Any = None
+
+    def __init__(self, **data):
+        super().__init__(**data)
+        self.as_list = LazyRecords(self.as_dataframe)
+
+    def change_column_names(self, target_format: MaccorDataFormat):
+        self.as_dataframe = rename_columns(
+            self.as_dataframe,
+            input_format=self.data_format,
+            target_format=target_format,
+        )
+        self.as_list = LazyRecords(self.as_dataframe)
+        self.data_format = target_format
+
+
+class SpilledTabularData(MappedTabularData):
+    """MaccorTabularData of a read that exceeded its memory budget. 'as_dataframe'
+    is backed by the memory-mapped files of a ColumnStore."""
+
+    store: ColumnStore
+    remove_nan_cols: bool = False
+
+    def to_dataframe(self) -> pd.DataFrame:
+        return self.store.to_dataframe(remove_nan_cols=self.remove_nan_cols)
+
+
+# Functions
+def collect_chunks(
+    chunks: Iterable[pd.DataFrame],
+    data_format: MaccorDataFormat,
+    max_memory: Optional[float] = None,
+    remove_nan_cols: bool = False,
+) -> MaccorTabularData:
+    """Collect chunks into MaccorTabularData. Once the chunks held in memory exceed
+    'max_memory' (in MB), they and all further chunks are spilled to a ColumnStore
+    and SpilledTabularData is returned.
+
+    Parameters
+    ----------
+    chunks : iterable of pandas.DataFrame
+        E.g., from iter_chunks() of the readers
+    data_format : MaccorDataFormat
+        Format of the result
+    max_memory : float
+        Memory budget of the columns in MB. No limit if None.
+    remove_nan_cols : bool
+        Drop columns without any value
+    """
+    budget = np.inf if max_memory is None else max_memory * BYTES_PER_MB
+    held, held_bytes, store = [], 0, None
+    for chunk in chunks:
+        if store is not None:
+            store.append(chunk)
+            continue
+        held.append(chunk)
+        held_bytes += int(chunk.memory_usage(index=False, deep=True).sum())
+        if held_bytes > budget:
+            store = ColumnStore()
+            for held_chunk in held:
+                store.append(held_chunk)
+            held = []
+    if store is not None:
+        return SpilledTabularData(
+            store=store, data_format=data_format, remove_nan_cols=remove_nan_cols
+        )
+    df = pd.concat(held, ignore_index=True) if len(held) > 0 else pd.DataFrame()
+    if remove_nan_cols:
+        df.dropna(axis="columns", how="all", inplace=True)
+    return MaccorTabularData(
+        as_list=df.to_dict(orient="records"), data_format=data_format
+    )
+
+
+def get_spill_chunksize(max_memory: float, bytes_per_record: int = 2048) -> int:
+    """Records per chunk, so that a few chunks fit into the budget"""
+    return int(
+        np.clip(
+            max_memory * BYTES_PER_MB / bytes_per_record / 4, 1_000, SPILL_CHUNKSIZE
+        )
+    )
+
+
+def to_column(series: pd.Series) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """The values of a column as NumPy array for binary storage, and the mask of the
+    missing values, if the array can not hold them: strings are stored as
+    fixed-width unicode, nullable integers and booleans by their values. NumPy
+    numbers are returned as they are, with NaN as missing value. See from_column.
+    """
+    if isinstance(series.dtype, np.dtype) and series.dtype.kind in "biufcmM":
+        return series.to_numpy(), None
+    missing = series.isna().to_numpy()
+    if pd.api.types.is_bool_dtype(series) or pd.api.types.is_numeric_dtype(series):
+        dtype = series.dtype.numpy_dtype  # E.g., of Int64
+        return series.to_numpy(dtype=dtype, na_value=0), missing
+    strings = series.astype(object).where(~missing, "")
+    return strings.to_numpy().astype(str), missing
+
+
+def from_column(
+    values: np.ndarray, missing: Optional[np.ndarray], pandas_dtype: str
+) -> Union[np.ndarray, pd.api.extensions.ExtensionArray]:
+    """The values stored by to_column with the missing ones restored. Numbers are
+    returned without copying. 'pandas_dtype' is the dtype of the stored series,
+    e.g., 'str' or 'Int64'."""
+    if missing is None:
+        return values
+    if values.dtype.kind == "U":
+        strings = values.astype(object)
+        strings[missing] = np.nan
+        if pd.api.types.is_string_dtype(pandas_dtype) and pandas_dtype != "object":
+            return pd.array(strings, dtype=pandas_dtype)
+        return strings
+    # Nullable numbers, the stored values may have been promoted, e.g., to float
+    dtype, numpy_dtype = MASKED_DTYPES.get(values.dtype.kind, ("Int64", np.int64))
+    array_type = pd.api.types.pandas_dtype(dtype).construct_array_type()
+    return array_type(values.astype(numpy_dtype, copy=False), missing)
+
+
+def _promote(dtype: np.dtype, other: np.dtype) -> np.dtype:
+    """Common dtype of the values already stored and new values"""
+    if dtype.kind == "U" or other.kind == "U":
+        if dtype.kind == other.kind == "U":
+            return np.dtype(f"U{max(dtype.itemsize, other.itemsize) // 4}")
+        # Numbers and strings: numbers as strings, wide enough for their repr
+        width = max(dtype.itemsize // 4 if dtype.kind == "U" else 32, 32)
+        width = max(width, other.itemsize // 4 if other.kind == "U" else 32)
+        return np.dtype(f"U{width}")
+    return np.result_type(dtype, other)
+
+
+# Line before the last line of the file
@@ -0,0 +1,405 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+__docformat__ = "NumPy"
+__author__ = "Lukas Gold, Simon Stier"
+
+__doc__ = """
+Bulk loading of parsed Maccor tests into SQLite or DuckDB database files. The
+records of all tests go to the table 'records', typed after the columns of raw files
+(TDLLTimeData) and keyed by 'test_id', the file and its meta data to the table
+'tests'. Example:
+
+    with MaccorSqlSink("tests.duckdb") as sink:
+        for file_path in file_paths:
+            sink.load_file(file_path, MaccorDataFormat.raw, index=False)
+        sink.create_indexes()
+
+The indexes on 'RecNum' and 'CycleNumProc' are dropped before and built after a
+load, as maintaining them row by row takes longer than building them once.
+"""
+
+import contextlib
+import ctypes
+import json
+import sqlite3
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from typing_extensions import Any, Dict, Iterable, Iterator, Optional, Union
+
+from maccor_utility.helper_functions import column_to_numeric, to_plain
+from maccor_utility.lookup import TDLLTimeData
+from maccor_utility.read import (
+    MaccorDataFormat,
+    MaccorDataRawFile,
+    MaccorDataTxtFile,
+    MaccorTabularData,
+)
+
+# Python version dependent import statement:
+try:
+    from enum import StrEnum
+except ImportError:
+    from strenum import StrEnum
+
+# Optional dependency
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+
+# Constants
+SQL_TYPES = {  # Engine: {kind of column: SQL type}
+    "sqlite": {"integer": "INTEGER", "real": "REAL", "text": "TEXT"},
+    "duckdb": {"integer": "BIGINT", "real": "DOUBLE", "text": "VARCHAR"},
+}
+FLOAT_CTYPES = (ctypes.c_float, ctypes.c_double)
+# Letters in text exports, character codes in raw files, stored as letters
+TEXT_COLUMNS = ("MainMode", "Mode")
+RECORD_COLUMNS = {  # Column: kind, the columns of raw files
+    name: (
+        "text"
+        if name in TEXT_COLUMNS
+        else "real" if ctype in FLOAT_CTYPES else "integer"
+    )
+    for name, ctype in TDLLTimeData._fields_
+}
+TEST_COLUMNS = {
+    "test_id": "integer",
+    "file_path": "text",
+    "data_format": "text",
+    "test_name": "text",
+    "num_records": "integer",
+    "meta": "text",  # Meta data of the file as JSON
+}
+INDEX_COLUMNS = ("RecNum", "CycleNumProc")
+DUCKDB_SUFFIXES = (".duckdb", ".ddb")
+
+
+# Classes
+class SqlEngine(StrEnum):
+    sqlite = "sqlite"
+    duckdb = "duckdb"
+
+
+class MaccorSqlSink(object):
+    """Loads parsed Maccor tests into a SQLite or DuckDB database file, using the
+    bulk path of the engine: a single prepared statement per chunk for SQLite, a
+    scan of the DataFrame for DuckDB. Each load runs in one transaction.
+
+    Parameters
+    ----------
+    db_path : str or Path
+        The database, created if it does not exist
+    engine : SqlEngine
+        Inferred from the suffix of 'db_path' if None: DuckDB for '.duckdb' and
+        '.ddb', else SQLite
+    """
+
+    def __init__(self, db_path: Union[str, Path], engine: Optional[SqlEngine] = None):
+        self.db_path = Path(db_path)
+        if engine is None:
+            engine = (
+                SqlEngine.duckdb
+                if self.db_path.suffix.lower() in DUCKDB_SUFFIXES
+                else SqlEngine.sqlite
+            )
+        self.engine = SqlEngine(engine)
+        if self.engine == SqlEngine.duckdb:
+            _require_duckdb()
+            self.connection = duckdb.connect(str(self.db_path))
+        else:
+            self.connection = sqlite3.connect(str(self.db_path))
+            self.connection.execute("PRAGMA journal_mode = WAL")
+            self.connection.execute("PRAGMA synchronous = NORMAL")
+        self.connection.execute(
+            f"CREATE TABLE IF NOT EXISTS tests ({self._columns_sql(TEST_COLUMNS)})"
+        )
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS records "
+            f"({self._columns_sql({'test_id': 'integer', **RECORD_COLUMNS})})"
+        )
+        self._commit()
+        self.column_kinds = self._get_column_kinds()
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def load(
+        self,
+        data: Union[
+            pd.DataFrame, MaccorTabularData, MaccorDataRawFile, MaccorDataTxtFile
+        ],
+        meta: Optional[dict] = None,
+        file_path: Optional[Union[str, Path]] = None,
+        data_format: Optional[MaccorDataFormat] = None,
+        index: bool = True,
+    ) -> int:
+        """Load a parsed test, e.g., as returned by read_maccor_data_file. Returns
+        the 'test_id' of the test.
+
+        Parameters
+        ----------
+        data : pandas.DataFrame or MaccorTabularData or MaccorDataRawFile or
+            MaccorDataTxtFile
+            The parsed time series with raw column names, as returned by the readers
+        meta : dict
+            Meta data of the file. Taken from reader results, if None.
+        file_path : str or Path
+            The path of the file. Taken from reader results, if None.
+        data_format : MaccorDataFormat
+            The format of the file. Taken from 'data', if None.
+        index : bool
+            Build the indexes after the load. Pass False when loading many tests
+            and call create_indexes() at the end.
+        """
+        if isinstance(data, (MaccorDataRawFile, MaccorDataTxtFile)):
+            if data.data is None:
+                raise ValueError("The file was not read yet, call read() first!")
+            meta = data.meta if meta is None else meta
+            if file_path is None:
+                file_path = getattr(data, "file_path", getattr(data, "file_name", None))
+            if data_format is None and isinstance(data, MaccorDataRawFile):
+                data_format = MaccorDataFormat.raw
+            data = data.data
+        if isinstance(data, MaccorTabularData):
+            data_format = data.data_format if data_format is None else data_format
+            data = data.as_dataframe
+        return self.load_chunks(
+            [data],
+            meta=meta,
+            file_path=file_path,
+            data_format=data_format,
+            index=index,
+        )
+
+    def load_chunks(
+        self,
+        chunks: Iterable[pd.DataFrame],
+        meta: Optional[dict] = None,
+        file_path: Optional[Union[str, Path]] = None,
+        data_format: Optional[MaccorDataFormat] = None,
+        index: bool = True,
+    ) -> int:
+        """Load a test chunk by chunk, e.g., from iter_maccor_data_file, without
+        holding all records in memory. Returns the 'test_id' of the test. See load()
+        for the parameters."""
+        return self._load(iter(chunks), lambda: meta, file_path, data_format, index)
+
+    def load_file(
+        self,
+        file_path: Union[str, Path],
+        frmt: MaccorDataFormat,
+        chunksize: int = 100_000,
+        dll_path: Optional[Union[str, Path]] = None,
+        index: bool = True,
+        **kwargs: Any,
+    ) -> int:
+        """Read a Maccor data file chunk by chunk and load it. Returns the 'test_id'
+        of the test.
+
+        Parameters
+        ----------
+        file_path : str or Path
+            The path to the file
+        frmt : MaccorDataFormat
+            The format of the file
+        chunksize : int
+            The number of records per chunk
+        dll_path : str or Path
+            The path to the DLL file - only required to read raw files
+        index : bool
+            Build the indexes after the load, see load()
+        kwargs : Any
+            Passed to the reader, e.g., 'metrics', 'progress' or 'cancel'
+        """
+        frmt = MaccorDataFormat(frmt)
+        if frmt == MaccorDataFormat.raw:
+            reader = MaccorDataRawFile(file_path, dll_path=dll_path, **kwargs)
+        else:
+            reader = MaccorDataTxtFile(
+                file_path=file_path, export_format=frmt, **kwargs
+            )
+        chunks = reader.iter_chunks(chunksize=chunksize)
+        try:
+            # The meta data is available once the first chunk was read
+            return self._load(chunks, lambda: reader.meta, file_path, frmt, index)
+        finally:
+            chunks.close()
+
+    def create_indexes(self):
+        """Build the indexes on 'test_id' with 'RecNum' and with 'CycleNumProc'"""
+        for column in INDEX_COLUMNS:
+            self.connection.execute(
+                f"CREATE INDEX IF NOT EXISTS records_{column.lower()} "
+                f"ON records (test_id, {_quote(column)})"
+            )
+        self._commit()
+
+    def drop_indexes(self):
+        for column in INDEX_COLUMNS:
+            self.connection.execute(f"DROP INDEX IF EXISTS records_{column.lower()}")
+        self._commit()
+
+    def _load(
+        self,
+        chunks: Iterator[pd.DataFrame],
+        get_meta,
+        file_path: Optional[Union[str, Path]],
+        data_format: Optional[MaccorDataFormat],
+        index: bool,
+    ) -> int:
+        self.drop_indexes()
+        with self._transaction():
+            test_id = self.connection.execute(
+                "SELECT COALESCE(MAX(test_id), 0) + 1 FROM tests"
+            ).fetchone()[0]
+            num_records = 0
+            for chunk in chunks:
+                self._insert(test_id, chunk)
+                num_records += len(chunk)
+            meta = get_meta()
+            meta = None if meta is None else to_plain(meta)
+            test_name = None if meta is None else meta.get("Test name")
+            if test_name is None and file_path is not None:
+                test_name = Path(file_path).stem
+            row = {
+                "test_id": test_id,
+                "file_path": None if file_path is None else str(file_path),
+                "data_format": None if data_format is None else str(data_format),
+                "test_name": None if test_name is None else str(test_name),
+                "num_records": num_records,
+                "meta": None if meta is None else json.dumps(meta, default=str),
+            }
+            self.connection.execute(
+                f"INSERT INTO tests ({', '.join(row)}) "
+                f"VALUES ({', '.join('?' * len(row))})",
+                list(row.values()),
+            )
+        if index:
+            self.create_indexes()
+        return test_id
+
+    def _insert(self, test_id: int, chunk: pd.DataFrame):
+        if len(chunk) == 0:
+            return
+        columns = {"test_id": np.full(len(chunk), test_id, dtype=np.int64)}
+        for name in chunk.columns:
+            name = str(name)
+            if name not in self.column_kinds:
+                self._add_column(name, _get_kind(chunk[name]))
+            columns[name] = _to_values(chunk[name], self.column_kinds[name])
+        names = ", ".join(_quote(name) for name in columns)
+        if self.engine == SqlEngine.duckdb:
+            self.connection.register("chunk", pd.DataFrame(columns, copy=False))
+            try:
+                self.connection.execute(
+                    f"INSERT INTO records ({names}) SELECT {names} FROM chunk"
+                )
+            finally:
+                self.connection.unregister("chunk")
+        else:
+            self.connection.executemany(
+                f"INSERT INTO records ({names}) "
+                f"VALUES ({', '.join('?' * len(columns))})",
+                zip(*(values.tolist() for values in columns.values())),
+            )
+
+    def _add_column(self, name: str, kind: str):
+        self.connection.execute(
+            f"ALTER TABLE records ADD COLUMN {_quote(name)} "
+            f"{SQL_TYPES[self.engine][kind]}"
+        )
+        self.column_kinds[name] = kind
+
+    def _get_column_kinds(self) -> Dict[str, str]:
+        """Kinds of the columns of the table 'records', including columns added by
+        earlier loads"""
+        kinds = {value: kind for kind, value in SQL_TYPES[self.engine].items()}
+        known = {"test_id": "integer", **RECORD_COLUMNS}
+        if self.engine == SqlEngine.sqlite:
+            types = {
+                row[1]: row[2]
+                for row in self.connection.execute("PRAGMA table_info(records)")
+            }
+        else:
+            types = dict(
+                self.connection.execute(
+                    "SELECT column_name, data_type FROM information_schema.columns "
+                    "WHERE table_name = 'records'"
+                ).fetchall()
+            )
+        return {
+            name: known.get(name, kinds.get(str(types.get(name)).upper(), "text"))
+            for name in types
+        }
+
+    def _columns_sql(self, columns: Dict[str, str]) -> str:
+        types = SQL_TYPES[self.engine]
+        return ", ".join(
+            f"{_quote(name)} {types[kind]}" for name, kind in columns.items()
+        )
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        if self.engine == SqlEngine.duckdb:
+            self.connection.begin()
+        try:
+            yield
+        except BaseException:
+            self.connection.rollback()
+            raise
+        self._commit()
+
+    def _commit(self):
+        self.connection.commit()
+
+
+# Functions
+def _get_kind(series: pd.Series) -> str:
+    """Kind of columns not in the raw files, e.g., auxiliary variables"""
+    if pd.api.types.is_bool_dtype(series) or pd.api.types.is_integer_dtype(series):
+        return "integer"
+    if pd.api.types.is_float_dtype(series):
+        return "real"
+    return "text"
+
+
+def _to_values(series: pd.Series, kind: str) -> np.ndarray:
+    """The values of the column for the SQL type of 'kind'. Date time strings are
+    converted to days since the Delphi epoch, the unit of 'DPtTime' in raw files.
+    Missing values become NaN or None, stored as NULL."""
+    if kind != "text":
+        if kind == "integer" and pd.api.types.is_integer_dtype(series):
+            return series.to_numpy(dtype=np.int64)
+        values = column_to_numeric(series)
+        if kind == "integer" and not np.isnan(values).any():
+            return values.astype(np.int64)
+        return values
+    if series.name in TEXT_COLUMNS and pd.api.types.is_integer_dtype(series):
+        return np.array([chr(code) for code in series.tolist()], dtype=object)
+    return series.astype(object).where(series.notna(), None).to_numpy()
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _require_duckdb():
+    if duckdb is None:
+        raise ImportError(
+            "Loading into DuckDB requires the package 'duckdb'. Install it with "
+            "'pip install maccor-utility[duckdb]'."
+        )
+
+
+# Line before the last line of the file
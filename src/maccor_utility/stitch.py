@@ -0,0 +1,213 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+__docformat__ = "NumPy"
+__author__ = "Lukas Gold, Simon Stier"
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from typing_extensions import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from maccor_utility.helper_functions import column_to_numeric
+from maccor_utility.read import (
+    MaccorDataFormat,
+    MaccorDataRawFile,
+    MaccorDataTxtFile,
+)
+
+# Constants
+SECONDS_PER_DAY = 86400.0
+CYCLE_COLUMNS = ("CycleNumProc", "HalfCycleNumCalc")
+
+
+# Classes
+class Stitcher(object):
+    """Makes the records of consecutive files of one test continuous, chunk by chunk.
+    Call start_file() before the first chunk of each file.
+
+    * 'RecNum' continues counting, if it restarts in a file
+    * 'TestTime' continues, if it restarts in a file. The offset includes the pause
+      between the files according to 'DPtTime', if available.
+    * 'CycleNumProc' and 'HalfCycleNumCalc' continue with the cycle interrupted at
+      the end of the previous file, if they restart in a file
+    * Counters that do not restart keep the offsets of the previous file
+    * Records already covered by the previous files are dropped, i.e., records up
+      to the last 'RecNum' if 'RecNum' does not restart, else records up to the last
+      'DPtTime'
+    """
+
+    def __init__(self):
+        self.num_files = 0
+        self.num_dropped = 0  # Overlapping records
+        self._last: Dict[str, float] = {}  # Last values emitted, before offsets
+        self._last_out: Dict[str, float] = {}  # Last values emitted, after offsets
+        self._offsets: Dict[str, float] = {}
+        self._drop_until: Optional[Tuple[str, float]] = None
+        self._first_chunk = True
+
+    def start_file(self):
+        self.num_files += 1
+        self._first_chunk = True
+
+    def process(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """Drop overlapping records and apply the offsets of the current file to a
+        chunk with raw column names"""
+        if self._first_chunk and len(chunk) > 0:
+            self._first_chunk = False
+            self._set_offsets(chunk)
+        if self._drop_until is not None and len(chunk) > 0:
+            col, last = self._drop_until
+            keep = ~(column_to_numeric(chunk[col]) <= last)
+            self.num_dropped += int((~keep).sum())
+            chunk = chunk[keep]
+        if len(chunk) == 0:
+            return chunk
+        chunk = chunk.copy()
+        for col in ["RecNum", "TestTime", "DPtTime", *CYCLE_COLUMNS]:
+            if col in chunk:
+                values = column_to_numeric(chunk[col])
+                self._last[col] = values[-1]
+                if self._offsets.get(col, 0) != 0:
+                    chunk[col] = chunk[col] + self._offsets[col]
+                self._last_out[col] = values[-1] + self._offsets.get(col, 0)
+        return chunk
+
+    def _set_offsets(self, chunk: pd.DataFrame):
+        """Offsets of the current file, from its first and the previous records"""
+        first = {
+            col: column_to_numeric(chunk[col][:1])[0]
+            for col in ["RecNum", "TestTime", "DPtTime", *CYCLE_COLUMNS]
+            if col in chunk
+        }
+        self._drop_until = None
+        if self.num_files <= 1 or len(self._last) == 0:
+            return
+        rec_restarts = self._restarts("RecNum", first)
+        if "RecNum" in first and not rec_restarts:
+            self._drop_until = ("RecNum", self._last["RecNum"])
+        elif "DPtTime" in first and not np.isnan(self._last.get("DPtTime", np.nan)):
+            self._drop_until = ("DPtTime", self._last["DPtTime"])
+        if rec_restarts:
+            self._offsets["RecNum"] = int(
+                self._last_out["RecNum"] - first["RecNum"] + 1
+            )
+        if self._restarts("TestTime", first):
+            pause = first.get("DPtTime", np.nan) - self._last.get("DPtTime", np.nan)
+            pause = pause * SECONDS_PER_DAY
+            pause = pause if np.isfinite(pause) and pause > 0 else 0.0
+            self._offsets["TestTime"] = (
+                self._last_out["TestTime"] + pause - first["TestTime"]
+            )
+        for col in CYCLE_COLUMNS:
+            if self._restarts(col, first):
+                self._offsets[col] = int(self._last_out[col] - first[col])
+
+    def _restarts(self, col: str, first: Dict[str, float]) -> bool:
+        return col in first and col in self._last and first[col] < self._last[col]
+
+
+# Functions
+def order_file_series(
+    file_paths: Sequence[Union[str, Path]],
+    frmt: MaccorDataFormat,
+    dll_path: Optional[Union[str, Path]] = None,
+) -> List[Path]:
+    """Order the files of a test by their start, i.e., 'StartDateTime' of the header
+    of raw files or the 'DPtTime' of the first record of text exports. Files without
+    either keep their position relative to each other, after the others. Only the
+    header (and the first record) of each file is read, one file after the other."""
+    starts = []
+    for position, file_path in enumerate(file_paths):
+        start = get_file_start(file_path, frmt, dll_path=dll_path)
+        starts.append(
+            ((np.isnan(start), 0.0 if np.isnan(start) else start, position), file_path)
+        )
+    starts.sort(key=lambda item: item[0])
+    return [Path(file_path) for _, file_path in starts]
+
+
+def get_file_start(
+    file_path: Union[str, Path],
+    frmt: MaccorDataFormat,
+    dll_path: Optional[Union[str, Path]] = None,
+) -> float:
+    """Start of a file in days since the Delphi epoch, NaN if unknown. Reads the
+    header of raw files and the first record of text exports only."""
+    if frmt == MaccorDataFormat.raw:
+        meta = MaccorDataRawFile(file_path=file_path, dll_path=dll_path).read_meta()
+        return _get_start(meta, None)
+    chunks = MaccorDataTxtFile(file_path=file_path, export_format=frmt).iter_chunks(
+        chunksize=1
+    )
+    try:
+        return _get_start(None, next(chunks, None))
+    finally:
+        chunks.close()
+
+
+def iter_file_series(
+    file_paths: Sequence[Union[str, Path]],
+    frmt: MaccorDataFormat,
+    chunksize: int = 100_000,
+    dll_path: Optional[Union[str, Path]] = None,
+) -> Iterator[pd.DataFrame]:
+    """Read the files of a test that was resumed or continued in new files, e.g.,
+    '.024', '.025', as one continuous test, chunk by chunk. The files are ordered by
+    order_file_series() and made continuous by Stitcher. Each file is opened once
+    the previous one is finished, only the current chunk is held in memory.
+
+    Parameters
+    ----------
+    file_paths : sequence of str or Path
+        The files of the test, in any order
+    frmt : MaccorDataFormat
+        The format of the files
+    chunksize : int
+        Number of records per chunk
+    dll_path : str or Path
+        The path to the DLL file - only required to read raw files
+
+    Yields
+    ------
+    pandas.DataFrame
+        The next records with raw column names
+    """
+    stitcher = Stitcher()
+    for file_path in order_file_series(file_paths, frmt, dll_path=dll_path):
+        if frmt == MaccorDataFormat.raw:
+            reader = MaccorDataRawFile(file_path=file_path, dll_path=dll_path)
+        else:
+            reader = MaccorDataTxtFile(file_path=file_path, export_format=frmt)
+        stitcher.start_file()
+        for chunk in reader.iter_chunks(chunksize=chunksize):
+            chunk = stitcher.process(chunk)
+            if len(chunk) > 0:
+                yield chunk
+
+
+def read_file_series(
+    file_paths: Sequence[Union[str, Path]],
+    frmt: MaccorDataFormat,
+    dll_path: Optional[Union[str, Path]] = None,
+) -> pd.DataFrame:
+    """Read the files of a test into one DataFrame with raw column names. See
+    iter_file_series."""
+    chunks = list(iter_file_series(file_paths, frmt, dll_path=dll_path))
+    if len(chunks) == 0:
+        return pd.DataFrame()
+    return pd.concat(chunks, ignore_index=True)
+
+
+def _get_start(meta: Optional[dict], first_chunk: Optional[pd.DataFrame]) -> float:
+    """Start of a file in days since the Delphi epoch, NaN if unknown"""
+    start = (meta or {}).get("Header data", {}).get("StartDateTime", 0)
+    if start > 0:
+        return float(start)
+    if first_chunk is not None and len(first_chunk) > 0 and "DPtTime" in first_chunk:
+        return float(column_to_numeric(first_chunk["DPtTime"][:1])[0])
+    return np.nan
+
+
+# Line before the last line of the file
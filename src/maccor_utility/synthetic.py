@@ -0,0 +1,328 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+__docformat__ = "NumPy"
+__author__ = "Lukas Gold, Simon Stier"
+
+__doc__ = """
+Deterministic synthetic Maccor tests, e.g., for benchmarks and tests without private
+data files. Text exports are written with the writers of this package, raw files are
+read through SyntheticDll, a stand-in for the Maccor DLL that also runs on Linux.
+"""
+
+import ctypes
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from typing_extensions import Any, Dict, Optional, Union
+
+from maccor_utility.lookup import TDLLHeaderData, TDLLTimeData
+from maccor_utility.read import MaccorDataFormat, MaccorDataRawFile
+from maccor_utility.write import write_maccor_text_file
+
+# Constants
+STEP_RECORDS = 600  # Records per step
+SAMPLE_SECONDS = 10.0  # Time between the records
+NOMINAL_CAPACITY = 3.0  # in Ah
+INTERNAL_RESISTANCE = 0.03  # in Ohm
+VOLTAGE_NOISE = 0.0005  # Standard deviation in V
+START_DAYS = 45200.0  # 'DPtTime' of the first record, days since the Delphi epoch
+# Per step of a cycle: mode, sign of the current
+CYCLE_STEPS = (("R", 0.0), ("C", 1.0), ("R", 0.0), ("D", -1.0))
+END_OF_STEP = 133  # 'EndCode' of the last record of a step
+FILE_META = {"Today's Date": "10/04/2023", "Date of Test": "10/01/2023"}
+SYSTEM_ID = "SYNTHETIC"
+PROCEDURE_NAME = "Synthetic.000"
+RAW_FILE_TYPE = 3  # No variables, see MaccorDataRawFile.iter_rows
+VAR_FILE_TYPE = 1  # With 15 variables, if an SMB is present
+END_OF_FILE = 1  # Returned by LoadAndGetNextTimeData after the last record
+
+
+# Classes
+class SyntheticDll(object):
+    """Stand-in for the Maccor DLL returned by MaccorDataRawFile._load_dll. The
+    functions have the signatures of the DLL and fill the ctypes structures passed
+    by the reader. The records are generated by generate_records() with the
+    parameters stored in the file by write_synthetic_raw_file(), once the first
+    record is loaded, so that reading the header only takes the same time regardless
+    of the size."""
+
+    def __init__(self):
+        self._files: Dict[int, Dict[str, Any]] = {}
+
+    def OpenDataFile(self, file_name: str) -> int:
+        try:
+            params = json.loads(Path(file_name).read_text(encoding="utf-8"))
+            num_records = int(params["num_records"])
+        except (OSError, ValueError, TypeError, KeyError):
+            return -1
+        handle = len(self._files)
+        self._files[handle] = {
+            "params": params,
+            "var_from": params.pop("var_from", None),
+            "num_records": num_records,
+            "records": None,
+            "position": 0,
+        }
+        return handle
+
+    def CloseDataFile(self, handle: int) -> int:
+        self._files.pop(handle, None)
+        return 0
+
+    def GetDataFileHeader(self, handle: int, header) -> int:
+        file = self._files[handle]
+        data: TDLLHeaderData = header.contents
+        data.Size = ctypes.sizeof(TDLLHeaderData)
+        if file["var_from"] is None:
+            data.FileType = RAW_FILE_TYPE
+        else:  # Variables are only read with an SMB
+            data.FileType = VAR_FILE_TYPE
+            data.SMBtot = 1
+        data.SystemIDLen = len(SYSTEM_ID)
+        data.TestNameLen = len(PROCEDURE_NAME)
+        data.ProcNameLen = len(PROCEDURE_NAME)
+        data.TestChan = 1
+        data.C_Rate = NOMINAL_CAPACITY
+        data.LastRecNum = file["num_records"]
+        data.StartDateTime = START_DAYS
+        return 0
+
+    def GetSystemID(self, handle: int, buffer, length: int) -> int:
+        buffer.contents.value = SYSTEM_ID
+        return 0
+
+    def GetProcName(self, handle: int, buffer, length: int) -> int:
+        buffer.contents.value = PROCEDURE_NAME
+        return 0
+
+    def GetTestName(self, handle: int, buffer, length: int) -> int:
+        buffer.contents.value = Path(PROCEDURE_NAME).stem
+        return 0
+
+    def GetTestInfo(self, handle: int, buffer, length: int) -> int:
+        buffer.contents.value = ""
+        return 0
+
+    def GetProcDesc(self, handle: int, buffer, length: int) -> int:
+        buffer.contents.value = "Synthetic cycling test"
+        return 0
+
+    def GetAuxUnits(self, handle: int, num: int, buffer) -> int:
+        return 1
+
+    def GetSMBUnits(self, handle: int, num: int, buffer) -> int:
+        return 1
+
+    def LoadAndGetNextTimeData(self, handle: int, time_data) -> int:
+        file = self._files[handle]
+        position = file["position"]
+        if position >= file["num_records"]:
+            return END_OF_FILE
+        if file["records"] is None:
+            records = generate_records(**file["params"])
+            if file["var_from"] is not None:
+                records["HasVarData"] = (records.index >= file["var_from"]).astype(int)
+            file["records"] = _to_time_data(records)
+        size = ctypes.sizeof(TDLLTimeData)
+        address = ctypes.addressof(file["records"]) + position * size
+        ctypes.memmove(time_data, address, size)
+        file["position"] = position + 1
+        return 0
+
+    def GetCANData(self, handle: int, num: int, value) -> int:
+        value.contents.value = 0.0
+        return 0
+
+    def GetAuxData(self, handle: int, num: int, value) -> int:
+        return 1
+
+    def GetVARData(self, handle: int, num: int, value) -> int:
+        if self._files[handle]["var_from"] is None:
+            return 1
+        value._obj.value = num / 10  # Passed by reference
+        return 0
+
+    def GetScopeTrace(self, handle: int, scope_trace) -> int:
+        return 1  # No scope traces
+
+    def GetFRAData(self, handle: int, num: int, fra_record) -> int:
+        return 1  # No FRA data
+
+    def GetEVData(self, handle: int, values) -> int:
+        return 1
+
+    def GetSMBData(self, handle: int, num: int, value) -> int:
+        return 1
+
+
+class SyntheticRawFile(MaccorDataRawFile):
+    """MaccorDataRawFile reading a file written by write_synthetic_raw_file() via
+    SyntheticDll instead of the Maccor DLL. The file itself is passed as 'dll_path',
+    which only has to exist."""
+
+    def __init__(self, file_path: Union[str, Path], **kwargs):
+        if kwargs.get("dll_path") is None:
+            kwargs["dll_path"] = file_path
+        super().__init__(file_path, **kwargs)
+
+    def _load_dll(self):
+        dll = SyntheticDll()
+        if self.metrics is not None:
+            dll = self.metrics.wrap_dll(dll)
+        return dll
+
+
+# Functions
+def generate_records(
+    num_records: int,
+    seed: int = 0,
+    step_records: int = STEP_RECORDS,
+) -> pd.DataFrame:
+    """Generate the time series of a cycling test with raw column names: each cycle
+    consists of a rest, a constant current charge, a rest and a discharge of
+    'step_records' records each. Same parameters, same data.
+
+    Parameters
+    ----------
+    num_records : int
+        Number of records
+    seed : int
+        Seed of the voltage noise
+    step_records : int
+        Records per step
+
+    Returns
+    -------
+    pandas.DataFrame
+        The columns of TDLLTimeData, as read from raw files
+    """
+    if num_records < 0 or step_records < 1:
+        raise ValueError("'num_records' must be >= 0 and 'step_records' >= 1!")
+    rng = np.random.default_rng(seed)
+    index = np.arange(num_records)
+    step = index // step_records
+    phase = step % len(CYCLE_STEPS)
+    in_step = index % step_records
+    step_time = in_step * SAMPLE_SECONDS
+    test_time = index * SAMPLE_SECONDS
+    # Charge and discharge between 10 % and 90 % state of charge
+    step_hours = step_records * SAMPLE_SECONDS / 3600
+    amps = 0.8 * NOMINAL_CAPACITY / step_hours
+    signs = np.array([sign for _, sign in CYCLE_STEPS])[phase]
+    current = signs * amps
+    fraction = in_step / step_records
+    soc = np.choose(phase, [0.1, 0.1 + 0.8 * fraction, 0.9, 0.9 - 0.8 * fraction])
+    voltage = (
+        3.0
+        + 1.2 * soc
+        - 0.1 * np.exp(-20 * soc)
+        + current * INTERNAL_RESISTANCE
+        + rng.normal(0.0, VOLTAGE_NOISE, num_records)
+    )
+    capacity = np.abs(current) * step_time / 3600
+    modes = np.array([mode for mode, _ in CYCLE_STEPS])[phase]
+    end_code = np.where(in_step == step_records - 1, END_OF_STEP, 0)
+    return pd.DataFrame(
+        {
+            "RecNum": index + 1,
+            "CycleNumProc": step // len(CYCLE_STEPS),
+            "HalfCycleNumCalc": (step + 1) // 2,
+            "StepNum": phase + 1,
+            "DPtTime": START_DAYS + test_time / 86400,
+            "TestTime": test_time,
+            "StepTime": step_time,
+            "Capacity": capacity,
+            "Energy": capacity * voltage,
+            "Current": current,
+            "Voltage": voltage,
+            "ACZ": np.zeros(num_records),
+            "DCIR": np.zeros(num_records),
+            "MainMode": modes,
+            "Mode": modes,
+            "EndCode": end_code,
+            "Range": np.ones(num_records, dtype=np.int64),
+            "GlobFlags": np.zeros(num_records, dtype=np.int64),
+            "HasVarData": np.zeros(num_records, dtype=np.int64),
+            "HasGlobFlags": np.zeros(num_records, dtype=np.int64),
+            "HasFRAData": np.zeros(num_records, dtype=np.int64),
+            "DigIO": np.zeros(num_records, dtype=np.int64),
+            "FRAStartTime": np.zeros(num_records),
+            "FRAExpNum": np.zeros(num_records, dtype=np.int64),
+        }
+    )
+
+
+def write_synthetic_file(
+    file_path: Union[str, Path],
+    frmt: MaccorDataFormat,
+    num_records: int,
+    seed: int = 0,
+    step_records: int = STEP_RECORDS,
+    decimals: Optional[int] = 4,
+) -> Path:
+    """Write a synthetic test as file of the format 'frmt', readable with
+    read_maccor_data_file, or with SyntheticRawFile for raw files. The header of
+    text exports is fixed, so that the files are identical for the same parameters.
+    See generate_records for the parameters, 'decimals' as in
+    write_maccor_text_file."""
+    frmt = MaccorDataFormat(frmt)
+    if frmt == MaccorDataFormat.raw:
+        return write_synthetic_raw_file(file_path, num_records, seed, step_records)
+    file_path = Path(file_path)
+    records = generate_records(num_records, seed=seed, step_records=step_records)
+    meta = {**FILE_META, "Filename": file_path.name}
+    return write_maccor_text_file(
+        records, file_path, frmt=frmt, meta=meta, decimals=decimals
+    )
+
+
+def write_synthetic_raw_file(
+    file_path: Union[str, Path],
+    num_records: int,
+    seed: int = 0,
+    step_records: int = STEP_RECORDS,
+    var_from: Optional[int] = None,
+) -> Path:
+    """Write the parameters of a synthetic test as stand-in for a raw file, read
+    via SyntheticRawFile. The records are generated when the file is opened. With
+    'var_from', the records from this index on have variable data, i.e., the
+    columns 'Var1' to 'Var15'."""
+    file_path = Path(file_path)
+    params = {"num_records": num_records, "seed": seed, "step_records": step_records}
+    if var_from is not None:
+        params["var_from"] = var_from
+    file_path.write_text(json.dumps(params), encoding="utf-8")
+    return file_path
+
+
+def _to_time_data(records: pd.DataFrame) -> ctypes.Array:
+    """The records as consecutive packed TDLLTimeData structures"""
+    dtype = np.dtype(
+        {
+            "names": [name for name, _ in TDLLTimeData._fields_],
+            "formats": [_ctype_to_dtype(ctype) for _, ctype in TDLLTimeData._fields_],
+            "offsets": [
+                getattr(TDLLTimeData, name).offset for name, _ in TDLLTimeData._fields_
+            ],
+            "itemsize": ctypes.sizeof(TDLLTimeData),
+        }
+    )
+    array = np.zeros(len(records), dtype=dtype)
+    for name in dtype.names:
+        values = records[name].to_numpy()
+        if name in ("MainMode", "Mode"):  # Letters as character codes
+            values = np.array([ord(value) for value in values], dtype=np.int64)
+        array[name] = values
+    return ctypes.create_string_buffer(array.tobytes(), max(array.nbytes, 1))
+
+
+def _ctype_to_dtype(ctype) -> np.dtype:
+    if ctype is ctypes.c_wchar:  # Not supported by NumPy, stored as code point
+        return np.dtype(f"u{ctypes.sizeof(ctypes.c_wchar)}")
+    return np.dtype(ctype)
+
+
+# Line before the last line of the file
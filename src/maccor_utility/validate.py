@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+__docformat__ = "NumPy"
+__author__ = "Lukas Gold, Simon Stier"
+
+from bisect import bisect_left
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel
+from typing_extensions import Dict, Iterable, List, Optional, Set, Tuple
+
+from maccor_utility.helper_functions import column_to_numeric
+from maccor_utility.read import get_raw_dataframe
+
+# Constants
+MAX_RANGES = 100  # Number of index ranges stored per check
+
+
+# Classes
+class Violation(BaseModel):
+    """Number of records failing a check and the ranges of their positions (first
+    and last position, inclusive). Only the first 'MAX_RANGES' ranges are kept."""
+
+    count: int = 0
+    ranges: List[Tuple[int, int]] = []
+    truncated: bool = False
+
+    def add(self, positions: np.ndarray, max_ranges: int = MAX_RANGES):
+        """Add sorted record positions, merging them into ranges"""
+        if len(positions) == 0:
+            return
+        self.count += len(positions)
+        breaks = np.flatnonzero(np.diff(positions) > 1)
+        firsts = np.concatenate([positions[:1], positions[breaks + 1]]).tolist()
+        lasts = np.concatenate([positions[breaks], positions[-1:]]).tolist()
+        if len(self.ranges) > 0 and self.ranges[-1][1] + 1 == firsts[0]:
+            # Continues the last range, e.g., of the previous chunk
+            self.ranges[-1] = (self.ranges[-1][0], lasts.pop(0))
+            firsts.pop(0)
+        space = max_ranges - len(self.ranges)
+        self.ranges.extend(zip(firsts[:space], lasts[:space]))
+        self.truncated = self.truncated or len(firsts) > space
+
+
+class ValidationReport(BaseModel):
+    num_records: int = 0
+    violations: Dict[str, Violation] = {}
+
+    @property
+    def ok(self) -> bool:
+        return all(violation.count == 0 for violation in self.violations.values())
+
+    def summary(self) -> Dict[str, int]:
+        return {check: violation.count for check, violation in self.violations.items()}
+
+
+class Validator(object):
+    """Vectorized data-quality checks of a parsed Maccor time series, chunk by chunk.
+
+    Checks (keys of ValidationReport.violations):
+    * 'RecNum gap': 'RecNum' increases by more than 1
+    * 'RecNum not increasing': 'RecNum' does not increase
+    * 'Duplicate RecNum': 'RecNum' was seen before
+    * 'TestTime decreasing', 'DPtTime decreasing'
+    * 'Not finite: <column>': NaN or inf in a numeric column
+    * 'Voltage out of range': 'Voltage' outside of voltage_range
+
+    Parameters
+    ----------
+    voltage_range : tuple of float
+        Minimum and maximum voltage, e.g., 'MinV' and 'MaxV' of the header of a raw
+        file. No range check if None.
+    max_ranges : int
+        Number of index ranges stored per check
+    """
+
+    def __init__(
+        self,
+        voltage_range: Optional[Tuple[float, float]] = None,
+        max_ranges: int = MAX_RANGES,
+    ):
+        self.voltage_range = voltage_range
+        self.max_ranges = max_ranges
+        self.report = ValidationReport()
+        self._last: Dict[str, float] = {}  # Last value of the previous chunk
+        # RecNums seen so far: the ones above all previous ones, i.e., usually all,
+        # as sorted blocks per chunk, the others in a set
+        self._max_rec_num = -1
+        self._rec_num_blocks: List[np.ndarray] = []
+        self._block_maxima: List[int] = []
+        self._late_rec_nums: Set[int] = set()
+
+    def process(self, chunk: pd.DataFrame) -> ValidationReport:
+        """Check the next chunk, which must have raw column names"""
+        offset = self.report.num_records
+        if "RecNum" in chunk:
+            rec_num = column_to_numeric(chunk["RecNum"])
+            step = self._diff("RecNum", rec_num)
+            self._add("RecNum gap", step > 1, offset)
+            self._add("RecNum not increasing", step <= 0, offset)
+            self._add("Duplicate RecNum", self._find_duplicates(rec_num), offset)
+        for col in ["TestTime", "DPtTime"]:
+            if col in chunk:
+                self._add(
+                    f"{col} decreasing",
+                    self._diff(col, column_to_numeric(chunk[col])) < 0,
+                    offset,
+                )
+        for col in chunk.columns:
+            if pd.api.types.is_numeric_dtype(chunk[col]) and not (
+                pd.api.types.is_bool_dtype(chunk[col])
+            ):
+                values = chunk[col].to_numpy(dtype=np.float64, na_value=np.nan)
+                self._add(f"Not finite: {col}", ~np.isfinite(values), offset)
+        if self.voltage_range is not None and "Voltage" in chunk:
+            voltage = chunk["Voltage"].to_numpy(dtype=np.float64, na_value=np.nan)
+            self._add(
+                "Voltage out of range",
+                (voltage < self.voltage_range[0]) | (voltage > self.voltage_range[1]),
+                offset,
+            )
+        self.report.num_records += len(chunk)
+        return self.report
+
+    def _add(self, check: str, mask: np.ndarray, offset: int):
+        violation = self.report.violations.setdefault(check, Violation())
+        violation.add(np.flatnonzero(mask) + offset, max_ranges=self.max_ranges)
+
+    def _diff(self, col: str, values: np.ndarray) -> np.ndarray:
+        """Difference to the previous record, NaN for the very first record"""
+        previous = np.empty(len(values))
+        if len(values) > 0:
+            previous[0] = self._last.get(col, np.nan)
+            previous[1:] = values[:-1]
+            self._last[col] = values[-1]
+        with np.errstate(invalid="ignore"):
+            return values - previous
+
+    def _find_duplicates(self, rec_num: np.ndarray) -> np.ndarray:
+        """Records with a RecNum seen before, within this or in previous chunks"""
+        valid = np.isfinite(rec_num) & (rec_num >= 0)
+        rec_int = np.where(valid, rec_num, 0).astype(np.int64)
+        duplicate = np.zeros(len(rec_int), dtype=bool)
+        # Within the chunk: all but the first occurrence
+        order = np.argsort(rec_int, kind="stable")
+        sorted_rec = rec_int[order]
+        duplicate[order[1:]] = sorted_rec[1:] == sorted_rec[:-1]
+        # Previous chunks: RecNums above the largest one seen so far are new, only
+        # the others are looked up. Memory grows with the number of records, not
+        # with the largest RecNum.
+        late = valid & (rec_int <= self._max_rec_num)
+        for position in np.flatnonzero(late):
+            duplicate[position] |= self._was_seen(int(rec_int[position]))
+        self._late_rec_nums.update(rec_int[late].tolist())
+        # Sorted and unique, from the sorting above
+        new = sorted_rec[(valid & ~late)[order]]
+        if len(new) > 0:
+            new = new[np.concatenate([[True], new[1:] != new[:-1]])]
+            self._rec_num_blocks.append(new)
+            self._block_maxima.append(int(new[-1]))
+            self._max_rec_num = int(new[-1])
+        return duplicate & valid
+
+    def _was_seen(self, rec_num: int) -> bool:
+        """Whether a RecNum not above the largest one was seen in previous chunks"""
+        if rec_num in self._late_rec_nums:
+            return True
+        # The blocks cover increasing, disjoint ranges of RecNums
+        block = self._rec_num_blocks[bisect_left(self._block_maxima, rec_num)]
+        return block[np.searchsorted(block, rec_num)] == rec_num
+
+
+# Functions
+def validate(
+    data,
+    voltage_range: Optional[Tuple[float, float]] = None,
+    max_ranges: int = MAX_RANGES,
+) -> ValidationReport:
+    """Run all checks of Validator on a parsed Maccor time series
+
+    Parameters
+    ----------
+    data : pandas.DataFrame or MaccorTabularData or MaccorDataRawFile or
+        MaccorDataTxtFile
+        The parsed time series. If a raw file is passed and no 'voltage_range' is
+        given, 'MinV' and 'MaxV' of its header are used.
+    voltage_range, max_ranges :
+        See Validator
+    """
+    if voltage_range is None:
+        voltage_range = get_voltage_range(getattr(data, "meta", None))
+    validator = Validator(voltage_range=voltage_range, max_ranges=max_ranges)
+    return validator.process(get_raw_dataframe(data))
+
+
+def validate_chunks(
+    chunks: Iterable[pd.DataFrame],
+    voltage_range: Optional[Tuple[float, float]] = None,
+    max_ranges: int = MAX_RANGES,
+) -> ValidationReport:
+    """Run all checks of Validator on chunks as returned by iter_maccor_data_file"""
+    validator = Validator(voltage_range=voltage_range, max_ranges=max_ranges)
+    for chunk in chunks:
+        validator.process(chunk)
+    return validator.report
+
+
+def get_voltage_range(meta: Optional[dict]) -> Optional[Tuple[float, float]]:
+    """'MinV' and 'MaxV' from the header data of a raw file, if available"""
+    header = (meta or {}).get("Header data", {})
+    if "MinV" in header and "MaxV" in header and header["MaxV"] > header["MinV"]:
+        return header["MinV"], header["MaxV"]
+    return None
+
+
+# Line before the last line of the file
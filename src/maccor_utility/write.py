@@ -0,0 +1,300 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+__docformat__ = "NumPy"
+__author__ = "Lukas Gold, Simon Stier"
+
+import datetime
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from batt_utility.helper_functions import flatten_dict_one_to_x
+from typing_extensions import Dict, Iterable, List, Optional, Tuple, Union
+
+from maccor_utility.helper_functions import column_to_numeric
+from maccor_utility.read import (
+    Configurations,
+    MaccorDataFormat,
+    ReadMaccorTextFileParameter,
+    Translations,
+    get_raw_dataframe,
+)
+
+# Constants
+DATE_TIME_FORMAT = "%m/%d/%Y"  # Date of 'DPtTime', followed by '%H:%M:%S'
+SECONDS_PER_DAY = 86400
+DELPHI_EPOCH = pd.Timestamp(1899, 12, 30)
+ROWS_PER_BLOCK = 65_536  # Rows formatted at once, bounds the temporary arrays
+POWERS_OF_TEN = 10 ** np.arange(19, dtype=np.int64)
+MAX_FIXED = 2**62  # Larger scaled values are formatted as strings
+TAB, NEWLINE, MINUS, DOT = (ord(char) for char in "\t\n-.")
+
+
+# Functions
+def write_maccor_text_file(
+    data,
+    file_path: Union[str, Path],
+    frmt: MaccorDataFormat,
+    meta: Optional[Dict[str, str]] = None,
+    decimals: Optional[int] = None,
+) -> Path:
+    """Write a parsed Maccor time series as text export, e.g., for tools that only
+    accept a certain export format or to create test files
+
+    Parameters
+    ----------
+    data : pandas.DataFrame or MaccorTabularData or MaccorDataRawFile or
+        MaccorDataTxtFile
+        The parsed time series
+    file_path : str or Path
+        The file to write
+    frmt : MaccorDataFormat
+        One of the text export formats
+    meta : dict
+        Header entries 'Key: Value'. Defaults to the date of export, the date of
+        the test and the file name.
+    decimals : int
+        Number of decimals of floating point numbers, e.g., 4. Full precision if
+        None, which is slower to format.
+    """
+    return write_maccor_text_chunks(
+        [get_raw_dataframe(data)],
+        file_path=file_path,
+        frmt=frmt,
+        meta=meta,
+        decimals=decimals,
+    )
+
+
+def write_maccor_text_chunks(
+    chunks: Iterable[pd.DataFrame],
+    file_path: Union[str, Path],
+    frmt: MaccorDataFormat,
+    meta: Optional[Dict[str, str]] = None,
+    decimals: Optional[int] = None,
+) -> Path:
+    """Write chunks with raw column names, e.g., from iter_maccor_data_file, as one
+    text export. The layout follows the reader configuration of the format
+    (Configurations): header lines, column names of the translation tables, decimal
+    separator and encoding. Columns without a name in the format are dropped. The
+    columns are formatted in bulk as arrays of characters, the 'DPtTime' via lookup
+    tables. See write_maccor_text_file for the parameters."""
+    frmt = MaccorDataFormat(frmt)
+    if frmt == MaccorDataFormat.raw:
+        raise ValueError("Writing raw files is not supported!")
+    config = Configurations[frmt.name].value
+    date_column = flatten_dict_one_to_x(Translations[frmt.name].table)["DPtTime"]
+    file_path = Path(file_path)
+    columns = None
+    with open(file_path, "wb") as file:
+        for chunk in chunks:
+            chunk = _to_export_columns(chunk, frmt)
+            if columns is None:
+                columns = list(chunk.columns)
+                if meta is None:
+                    meta = _get_default_meta(chunk, file_path)
+                file.write(_encode(_get_header(meta, columns, frmt), config))
+            chunk = chunk.reindex(columns=columns)
+            for start in range(0, len(chunk), ROWS_PER_BLOCK):
+                block = chunk.iloc[start : start + ROWS_PER_BLOCK]
+                file.write(_format_rows(block, config, decimals, date_column))
+        if columns is None:  # No records
+            file.write(_encode(_get_header(meta or {}, [], frmt), config))
+    return file_path
+
+
+def delphi_to_strings(days: np.ndarray) -> np.ndarray:
+    """Format days since the Delphi epoch as 'DPtTime' strings of the exports in
+    whole seconds, vectorized. NaN gives an empty string."""
+    chars, mask = _delphi_chars(np.asarray(days, dtype=np.float64))
+    strings = np.frombuffer(chars.tobytes(), dtype=f"S{chars.shape[1]}")
+    strings = strings.astype(str).astype(object)
+    strings[~mask[:, 0]] = ""
+    return strings
+
+
+def _delphi_chars(days: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Characters of 'DPtTime' strings from lookup tables of the dates and the
+    times of day"""
+    valid = np.isfinite(days)
+    seconds = np.round(np.where(valid, days, 0.0) * SECONDS_PER_DAY).astype(np.int64)
+    day, second_of_day = np.divmod(seconds, SECONDS_PER_DAY)
+    # Few distinct days, each formatted once
+    codes, unique_days = pd.factorize(day)
+    dates = (DELPHI_EPOCH + pd.to_timedelta(unique_days, unit="D")).strftime(
+        DATE_TIME_FORMAT + " "
+    )
+    chars = np.hstack([_to_chars(list(dates))[codes], _times_of_day()[second_of_day]])
+    return chars, np.broadcast_to(valid[:, None], chars.shape)
+
+
+@lru_cache(maxsize=1)
+def _times_of_day() -> np.ndarray:
+    """Characters of 'HH:MM:SS' for each second of a day"""
+    hours, rest = np.divmod(np.arange(SECONDS_PER_DAY), 3600)
+    minutes, seconds = np.divmod(rest, 60)
+    return _to_chars(
+        [f"{h:02d}:{m:02d}:{s:02d}" for h, m, s in zip(hours, minutes, seconds)]
+    )
+
+
+def _to_chars(strings: List[str], encoding: str = "ascii") -> np.ndarray:
+    """2D array of the characters of encoded strings, padded with zero bytes"""
+    return _to_char_array(
+        np.array([string.encode(encoding, errors="replace") for string in strings])
+    )
+
+
+def _to_char_array(array: np.ndarray) -> np.ndarray:
+    """2D array of the characters of a bytes array"""
+    width = max(array.dtype.itemsize, 1)
+    chars = np.frombuffer(array.astype(f"S{width}").tobytes(), dtype=np.uint8)
+    return chars.reshape(len(array), width)
+
+
+def _to_export_columns(chunk: pd.DataFrame, frmt: MaccorDataFormat) -> pd.DataFrame:
+    """Rename the raw columns to the format, dropping those without a name in it.
+    'DPtTime' is kept as days since the Delphi epoch."""
+    raw_to_target = flatten_dict_one_to_x(Translations[frmt.name].table)
+    known = Translations.raw.table
+    chunk = chunk[[col for col in chunk if col not in known or col in raw_to_target]]
+    if "DPtTime" in chunk and not pd.api.types.is_numeric_dtype(chunk["DPtTime"]):
+        # Strings, e.g., read from another export, are formatted the same way
+        chunk = chunk.assign(DPtTime=column_to_numeric(chunk["DPtTime"]))
+    return chunk.rename(columns=raw_to_target)
+
+
+def _format_rows(
+    block: pd.DataFrame,
+    config: ReadMaccorTextFileParameter,
+    decimals: Optional[int],
+    date_column: str,
+) -> bytes:
+    """Rows of the block as encoded text. Each column is formatted as a 2D array of
+    characters and a mask of the valid characters, the rows are the masked
+    characters of all columns, separated by tabs, in row-major order."""
+    num_rows = len(block)
+    if num_rows == 0:
+        return b""
+    parts = []
+    for position, (col, series) in enumerate(block.items()):
+        if position > 0:
+            parts.append(_constant_chars(num_rows, TAB))
+        if col == date_column:
+            parts.append(_delphi_chars(series.to_numpy(np.float64, na_value=np.nan)))
+        else:
+            parts.append(_format_column(series, config, decimals))
+    parts.append(_constant_chars(num_rows, NEWLINE))
+    chars = np.hstack([part[0] for part in parts])
+    mask = np.hstack([part[1] for part in parts])
+    return chars[mask].tobytes()
+
+
+def _format_column(
+    series: pd.Series, config: ReadMaccorTextFileParameter, decimals: Optional[int]
+) -> Tuple[np.ndarray, np.ndarray]:
+    if pd.api.types.is_bool_dtype(series) or pd.api.types.is_integer_dtype(series):
+        decimals = 0
+    elif not pd.api.types.is_float_dtype(series):
+        return _string_chars(series.astype(object).where(series.notna(), ""), config)
+    values = series.astype("float64").to_numpy(na_value=np.nan)
+    chars = None if decimals is None else _format_fixed(values, decimals)
+    if chars is None:
+        # Shortest representation that reads back to the same number
+        text = _to_char_array(values.astype("S32"))
+        chars = text, (text != 0) & np.isfinite(values)[:, None]
+    if config.decimal.value != ".":
+        text = np.where(chars[0] == DOT, ord(config.decimal.value), chars[0])
+        chars = text.astype(np.uint8), chars[1]
+    return chars
+
+
+def _format_fixed(
+    values: np.ndarray, decimals: int
+) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """Characters of numbers with a fixed number of decimals, NaN as empty field.
+    None if the numbers are too large for 64-bit integers."""
+    valid = np.isfinite(values)
+    scaled = np.abs(np.where(valid, values, 0.0)) * 10.0**decimals
+    if len(scaled) > 0 and scaled.max() >= MAX_FIXED:
+        return None
+    scaled = np.round(scaled).astype(np.int64)
+    int_part, frac_part = np.divmod(scaled, POWERS_OF_TEN[decimals])
+    num_digits = np.maximum(np.searchsorted(POWERS_OF_TEN, int_part, side="right"), 1)
+    num_rows = len(values)
+    # Digits right-aligned, leading zeros masked
+    exponents = np.arange(num_digits.max() - 1, -1, -1)
+    chars = [np.full((num_rows, 1), MINUS, np.uint8), _digits(int_part, exponents)]
+    mask = [
+        ((values < 0) & (scaled > 0))[:, None],
+        exponents[None, :] < num_digits[:, None],
+    ]
+    if decimals > 0:
+        chars += [
+            np.full((num_rows, 1), DOT, np.uint8),
+            _digits(frac_part, np.arange(decimals - 1, -1, -1)),
+        ]
+        mask.append(np.ones((num_rows, decimals + 1), dtype=bool))
+    return np.hstack(chars), np.hstack(mask) & valid[:, None]
+
+
+def _digits(values: np.ndarray, exponents: np.ndarray) -> np.ndarray:
+    return (values[:, None] // POWERS_OF_TEN[exponents] % 10 + ord("0")).astype(
+        np.uint8
+    )
+
+
+def _string_chars(
+    strings: pd.Series, config: ReadMaccorTextFileParameter
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Characters of the strings, each distinct string encoded once"""
+    codes, uniques = pd.factorize(strings.astype(str))
+    chars = _to_chars(list(uniques) or [""], config.encoding.value)[codes]
+    return chars, chars != 0
+
+
+def _constant_chars(num_rows: int, char: int) -> Tuple[np.ndarray, np.ndarray]:
+    return np.full((num_rows, 1), char, np.uint8), np.ones((num_rows, 1), bool)
+
+
+def _encode(text: str, config: ReadMaccorTextFileParameter) -> bytes:
+    return text.encode(config.encoding.value, errors="replace")
+
+
+def _get_default_meta(chunk: pd.DataFrame, file_path: Path) -> Dict[str, str]:
+    meta = {"Today's Date": datetime.date.today().strftime(DATE_TIME_FORMAT)}
+    dpt_time = next((col for col in chunk if col.lower().startswith("dpt")), None)
+    if dpt_time is not None and len(chunk) > 0:
+        start = column_to_numeric(chunk[dpt_time][:1])[0]
+        if np.isfinite(start):
+            meta["Date of Test"] = (
+                DELPHI_EPOCH + pd.Timedelta(days=float(start))
+            ).strftime(DATE_TIME_FORMAT)
+    meta["Filename"] = file_path.name
+    return meta
+
+
+def _get_header(meta: Dict[str, str], columns: list, frmt: MaccorDataFormat) -> str:
+    """Header lines of the format: 'Key:<tab>Value' entries on the lines above the
+    column names. The lines between the column names and the data, which the reader
+    skips, are written as empty fields."""
+    config = Configurations[frmt.name].value
+    num_meta_lines = config.header
+    entries = [f"{key}:\t{value}" for key, value in meta.items()]
+    lines = entries[: max(num_meta_lines - 1, 0)]
+    lines.append("\t".join(entries[len(lines) :]))
+    # Blank lines would not be counted by the reader
+    lines = [line if line != "" else "\t" for line in lines]
+    lines += ["\t"] * (num_meta_lines - len(lines))
+    lines.append("\t".join(columns))
+    if config.skiprows is not None:
+        # The reader takes the column names from the header line and skips
+        # 'skiprows' + 'header' lines in total before the data
+        lines += ["\t" * max(len(columns) - 1, 1)] * (config.skiprows + config.header)
+        lines = lines[: config.skiprows + config.header + 1]
+    return "\n".join(lines) + "\n"
+
+
+# Line before the last line of the file
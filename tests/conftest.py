@@ -7,4 +7,38 @@
     - https://docs.pytest.org/en/stable/writing_plugins.html
 """
 
-# import pytest
+import pytest
+
+MIMS_SERVER2_LINES = [
+    "Today's Date:\t10/04/2023\tDate of Test:\t09/01/2023\tFilename:\ttest.024",
+    "Rec#\tCycle P\tCycle C\tStep\tTest Time (s)\tStep Time (s)\tCapacity (Ah)\t"
+    "Energy (Wh)\tCurrent (A)\tVoltage (V)\tMD\tES\tDPT Time",
+    "1\t0\t0\t1\t0.000\t0.000\t0.000\t0.000\t0.000\t3.500\tR\t0\t10/01/2023 10:00:00",
+    "2\t0\t0\t1\t1.000\t1.000\t0.000\t0.000\t0.000\t3.501\tR\t0\t10/01/2023 10:00:01",
+    "3\t0\t0\t2\t2.000\t0.000\t0.001\t0.002\t1.000\t3.600\tC\t0\t10/01/2023 10:00:02",
+    "4\t0\t0\t2\t3.000\t1.000\t0.001\t0.002\t1.000\t3.700\tC\t0\t10/01/2023 10:00:03",
+]
+
+
+@pytest.fixture
+def mims_server2_file(tmp_path):
+    """A small MIMS Server 2 export with two steps"""
+    file_path = tmp_path / "test_mims_server2.024.txt"
+    file_path.write_text("\n".join(MIMS_SERVER2_LINES) + "\n", encoding="utf-8")
+    return file_path
+
+
+@pytest.fixture
+def mims_server2_dcir_file(tmp_path):
+    """A MIMS Server 2 export with DCIR 0 in the first four records and decimals
+    later, i.e., a column changing its type between chunks of four records"""
+    lines = [MIMS_SERVER2_LINES[0], MIMS_SERVER2_LINES[1] + "\tDCIR (Ohms)"]
+    for num in range(8):
+        dcir = "0" if num < 4 else "0.0123"
+        lines.append(
+            f"{num + 1}\t0\t0\t1\t{num}.000\t{num}.000\t0.000\t0.000\t0.000\t3.500"
+            f"\tR\t0\t10/01/2023 10:00:{num:02d}\t{dcir}"
+        )
+    file_path = tmp_path / "test_dcir.024.txt"
+    file_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return file_path
@@ -0,0 +1,89 @@
+import asyncio
+import os
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+import pytest
+
+from maccor_utility import aio
+from maccor_utility.aio import (
+    AsyncMaccorReader,
+    ExecutorType,
+    read_maccor_data_file_async,
+)
+from maccor_utility.read import MaccorDataFormat
+
+FRMT = MaccorDataFormat.mims_server2
+
+
+def test_read_maccor_data_file_async(mims_server2_file):
+    result = asyncio.run(read_maccor_data_file_async(mims_server2_file, frmt=FRMT))
+    assert len(result.data.as_dataframe) == 4
+    assert result.meta["Filename"] == "test.024"
+
+
+def test_iter_chunks_concurrency_cap(mims_server2_file):
+    active, max_active = [0], [0]
+
+    async def consume(reader, executor):
+        chunks = []
+        async for chunk in reader.iter_chunks(
+            mims_server2_file, frmt=FRMT, chunksize=3, executor=executor
+        ):
+            if len(chunks) == 0:
+                active[0] += 1
+                max_active[0] = max(max_active[0], active[0])
+            chunks.append(chunk)
+            await asyncio.sleep(0.01)
+        active[0] -= 1
+        return pd.concat(chunks)
+
+    async def main():
+        async with AsyncMaccorReader(max_concurrency=1) as reader:
+            return await asyncio.gather(
+                consume(reader, ExecutorType.thread),
+                consume(reader, ExecutorType.thread),
+                consume(reader, ExecutorType.process),
+            )
+
+    results = asyncio.run(main())
+    assert max_active[0] == 1
+    for df in results:
+        assert df["RecNum"].tolist() == [1, 2, 3, 4]
+
+
+def test_iter_chunks_stop_early(mims_server2_file):
+    async def main():
+        async with AsyncMaccorReader() as reader:
+            for executor in ExecutorType:
+                async for chunk in reader.iter_chunks(
+                    mims_server2_file, frmt=FRMT, chunksize=1, executor=executor
+                ):
+                    assert len(chunk) == 1
+                    break
+
+    asyncio.run(main())
+
+
+def exit_worker(*args):
+    os._exit(1)  # Like a crash of the DLL
+
+
+def test_iter_chunks_worker_crash(mims_server2_file, monkeypatch):
+    monkeypatch.setattr(aio, "_put_chunks", exit_worker)
+
+    async def main():
+        async with AsyncMaccorReader(max_concurrency=1) as reader:
+            start = time.perf_counter()
+            with pytest.raises(BrokenProcessPool):
+                async for _ in reader.iter_chunks(
+                    mims_server2_file, frmt=FRMT, executor=ExecutorType.process
+                ):
+                    pass
+            assert time.perf_counter() - start < 10  # Not waiting for the timeout
+            # The slot was released
+            result = await reader.read(mims_server2_file, frmt=FRMT)
+            assert len(result.data.as_dataframe) == 4
+
+    asyncio.run(asyncio.wait_for(main(), timeout=20))
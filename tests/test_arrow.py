@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from maccor_utility import arrow
+from maccor_utility.read import (
+    MaccorDataFormat,
+    MaccorDataTxtFile,
+    get_column_dtypes,
+    read_maccor_data_file,
+)
+from maccor_utility.synthetic import (
+    SyntheticRawFile,
+    write_synthetic_file,
+    write_synthetic_raw_file,
+)
+
+pyarrow = pytest.importorskip("pyarrow")
+
+from maccor_utility.arrow import (  # noqa: E402
+    get_arrow_schema,
+    get_meta,
+    iter_arrow_batches,
+)
+
+
+def test_to_arrow_zero_copy(mims_server2_file):
+    result = read_maccor_data_file(
+        mims_server2_file, frmt=MaccorDataFormat.mims_server2
+    )
+    table = result.to_arrow()
+    df = result.data.as_dataframe
+    assert table.num_rows == 4
+    assert table.column_names == [str(col) for col in df.columns]
+    voltage = table.column("Voltage").chunk(0)
+    assert voltage.buffers()[1].address == df["Voltage"].to_numpy().ctypes.data
+    assert table.schema.field("Voltage").metadata == {b"unit": b"V"}
+    assert table.schema.metadata[b"maccor.data_format"] == b"MIMS Server 2"
+    assert get_meta(table.schema)["Filename"] == "test.024"
+    # Arrow PyCapsule interface
+    assert pyarrow.table(result).equals(table)
+    assert pyarrow.table(result.data).num_rows == 4
+    with pytest.raises(ValueError):
+        MaccorDataTxtFile(
+            file_path=mims_server2_file, export_format=MaccorDataFormat.mims_server2
+        ).to_arrow()
+
+
+def test_to_arrow_raw(tmp_path):
+    file_path = write_synthetic_file(tmp_path / "test.024", MaccorDataFormat.raw, 500)
+    table = SyntheticRawFile(file_path).read().to_arrow()
+    assert table.num_rows == 500
+    assert table.schema.field("Current").metadata == {b"unit": b"A"}
+    assert get_meta(table.schema)["Test procedure"] == "Synthetic.000"
+
+
+def test_iter_arrow_batches(tmp_path):
+    file_path = write_synthetic_file(
+        tmp_path / "test.txt", MaccorDataFormat.maccor_export2, 2_500
+    )
+    reader = iter_arrow_batches(
+        file_path, MaccorDataFormat.maccor_export2, chunksize=1_000
+    )
+    assert get_meta(reader.schema)["Filename"] == "test.txt"
+    batches = list(reader)
+    assert [batch.num_rows for batch in batches] == [1_000, 1_000, 500]
+    table = pyarrow.Table.from_batches(batches)
+    records = read_maccor_data_file(file_path, frmt=MaccorDataFormat.maccor_export2)
+    assert np.allclose(
+        table.column("Voltage").to_numpy(),
+        records.data.as_dataframe["Voltage"].to_numpy(),
+    )
+
+
+def test_iter_arrow_batches_raw_columns_appearing_later(tmp_path, monkeypatch):
+    monkeypatch.setattr(arrow, "MaccorDataRawFile", SyntheticRawFile)
+    file_path = write_synthetic_raw_file(tmp_path / "test.001", 10, var_from=6)
+    reader = iter_arrow_batches(file_path, MaccorDataFormat.raw, chunksize=4)
+    assert "Var15" in reader.schema.names
+    table = reader.read_all()
+    assert table.num_rows == 10
+    assert np.isnan(table.column("Var15").to_numpy()[:6]).all()
+    assert np.allclose(table.column("Var2").to_numpy()[6:], 0.2)
+    assert table.column("RecNum").to_pylist() == list(range(1, 11))
+
+
+def test_iter_arrow_batches_type_changing_between_chunks(mims_server2_dcir_file):
+    reader = iter_arrow_batches(
+        mims_server2_dcir_file, MaccorDataFormat.mims_server2, chunksize=4
+    )
+    assert reader.schema.field("DCIR").type == pyarrow.float64()
+    assert reader.schema.field("RecNum").type == pyarrow.int64()
+    table = reader.read_all()
+    assert np.allclose(table.column("DCIR").to_numpy(), [0] * 4 + [0.0123] * 4)
+
+
+def test_to_record_batch_missing_and_unexpected():
+    first = pd.DataFrame({"RecNum": [1, 2], "Voltage": [3.0, 3.1]})
+    dtypes = get_column_dtypes(first)
+    schema = get_arrow_schema(
+        {name: arrow.get_arrow_type(dtype) for name, dtype in dtypes.items()}
+    )
+    assert schema.field("RecNum").type == pyarrow.int64()
+    batch = arrow._to_record_batch(
+        pd.DataFrame({"RecNum": [3.0, np.nan], "Voltage": [3.2, 3.3]}), schema, dtypes
+    )
+    assert batch.column(0).to_pylist() == [3, None]
+    with pytest.raises(ValueError, match="RecNum"):
+        arrow._to_record_batch(pd.DataFrame({"RecNum": [3.5]}), schema, dtypes)
+    with pytest.raises(ValueError, match="Var1"):
+        arrow._to_record_batch(
+            pd.DataFrame({"RecNum": [3], "Voltage": [3.2], "Var1": [0.1]}),
+            schema,
+            dtypes,
+        )
@@ -0,0 +1,60 @@
+import json
+
+from maccor_utility.benchmark import (
+    BenchmarkResult,
+    compare_to_baseline,
+    load_baseline,
+    main,
+    run_benchmarks,
+)
+
+
+def test_run_benchmarks(tmp_path):
+    results = run_benchmarks(num_records=500, repeat=1, directory=tmp_path)
+    names = [result.name for result in results]
+    assert {"read_raw", "meta_raw", "read_mims_server2", "meta_mims_server2"} <= set(
+        names
+    )
+    assert {"rename_columns", "change_column_names"} <= set(names)
+    assert len([name for name in names if name.startswith("read_")]) == 6
+    for result in results:
+        assert result.num_records == 500
+        assert result.seconds > 0 and result.relative > 0
+        assert result.peak_memory is not None
+
+
+def test_compare_to_baseline():
+    result = BenchmarkResult(
+        name="read_raw",
+        num_records=100,
+        seconds=1.0,
+        relative=2.0,
+        peak_memory=30.0,
+        records_per_second=100.0,
+    )
+    baseline = {"read_raw": result.model_dump()}
+    assert compare_to_baseline([result], baseline) == []
+    slower = result.model_copy(update={"relative": 3.5, "peak_memory": 50.0})
+    regressions = compare_to_baseline([slower], baseline, tolerance=0.5)
+    assert len(regressions) == 2
+    assert regressions[0].startswith("read_raw: time")
+    # Other sizes are not comparable
+    other = slower.model_copy(update={"num_records": 200})
+    assert compare_to_baseline([other], baseline) == []
+
+
+def test_main_baseline(tmp_path, capsys):
+    baseline = tmp_path / "baseline.json"
+    args = ["-n", "200", "-r", "1", "--no-memory", "-b", str(baseline)]
+    assert main(args) == 2
+    assert "not found" in capsys.readouterr().err
+    assert not baseline.exists()
+    assert main(args + ["--update-baseline"]) == 0
+    assert "Stored the baseline" in capsys.readouterr().out
+    assert load_baseline(baseline)["read_raw"]["num_records"] == 200
+    assert main(args + ["--tolerance", "1000"]) == 0
+    stored = load_baseline(baseline)
+    stored["read_raw"]["relative"] = 1e-9
+    baseline.write_text(json.dumps(stored))
+    assert main(args) == 1
+    assert "Regression: read_raw" in capsys.readouterr().out
@@ -0,0 +1,78 @@
+import datetime
+
+from conftest import MIMS_SERVER2_LINES
+
+from maccor_utility import catalog as catalog_module
+from maccor_utility.catalog import Catalog
+from maccor_utility.read import MaccorDataFormat, MaccorDataTxtFile
+from maccor_utility.synthetic import SyntheticRawFile, write_synthetic_raw_file
+
+PATTERNS = {"*.txt": MaccorDataFormat.mims_server2}
+
+
+def test_catalog_rescan(tmp_path):
+    data_dir = tmp_path / "data"
+    (data_dir / "sub").mkdir(parents=True)
+    for name in ["a.txt", "sub/b.txt"]:
+        (data_dir / name).write_text("\n".join(MIMS_SERVER2_LINES) + "\n")
+    (data_dir / "notes.md").write_text("not a Maccor file")
+    with Catalog(tmp_path / "catalog.db") as catalog:
+        summary = catalog.scan([data_dir], patterns=PATTERNS, read_records=True)
+        assert (summary.num_scanned, summary.num_unchanged) == (2, 0)
+        summary = catalog.scan([data_dir], patterns=PATTERNS, max_workers=2)
+        assert (summary.num_scanned, summary.num_unchanged) == (0, 2)
+        (data_dir / "a.txt").write_text("\n".join(MIMS_SERVER2_LINES[:-1]) + "\n")
+        (data_dir / "sub" / "b.txt").unlink()
+        summary = catalog.scan([data_dir], patterns=PATTERNS, read_records=True)
+        assert (summary.num_scanned, summary.num_removed) == (1, 1)
+        files = catalog.to_dataframe()
+        assert files["num_records"].tolist() == [3]
+        assert files["first_cycle"].tolist() == [0]
+
+
+def test_catalog_query(tmp_path):
+    (tmp_path / "a.txt").write_text("\n".join(MIMS_SERVER2_LINES) + "\n")
+    (tmp_path / "broken.txt").write_bytes(b"\x00")
+    with Catalog(tmp_path / "catalog.db") as catalog:
+        summary = catalog.scan([tmp_path], patterns=PATTERNS, max_workers=1)
+        assert summary.num_failed == 1
+        assert catalog.query(since=datetime.datetime(2023, 10, 1, 9)) == [
+            ((tmp_path / "a.txt").resolve(), MaccorDataFormat.mims_server2)
+        ]
+        assert catalog.query(since=datetime.datetime(2023, 10, 2)) == []
+        assert len(catalog.query(include_failed=True)) == 2
+
+
+def test_catalog_skips_procedures(tmp_path):
+    (tmp_path / "export.txt").write_text("\n".join(MIMS_SERVER2_LINES) + "\n")
+    (tmp_path / "procedure.000").write_text("<MaccorTestProcedure/>")
+    patterns = {"*.[0-9][0-9][0-9]": MaccorDataFormat.raw, **PATTERNS}
+    with Catalog(tmp_path / "catalog.db") as catalog:
+        summary = catalog.scan([tmp_path], patterns=patterns, max_workers=1)
+        assert (summary.num_scanned, summary.num_failed) == (1, 0)
+        files = catalog.to_dataframe()
+        assert files["test_name"].tolist() == ["test"]
+        assert files["procedure"].isna().all()
+
+
+def test_catalog_closes_files_and_is_quiet(tmp_path, monkeypatch, capsys):
+    closed = []
+
+    class TrackedTxtFile(MaccorDataTxtFile):
+        def iter_chunks(self, *args, **kwargs):
+            try:
+                yield from super().iter_chunks(*args, **kwargs)
+            finally:
+                closed.append(self.file_path)
+
+    monkeypatch.setattr(catalog_module, "MaccorDataTxtFile", TrackedTxtFile)
+    monkeypatch.setattr(catalog_module, "MaccorDataRawFile", SyntheticRawFile)
+    (tmp_path / "export.txt").write_text("\n".join(MIMS_SERVER2_LINES) + "\n")
+    write_synthetic_raw_file(tmp_path / "test.001", 10)
+    patterns = {"*.[0-9][0-9][0-9]": MaccorDataFormat.raw, **PATTERNS}
+    with Catalog(tmp_path / "catalog.db") as catalog:
+        summary = catalog.scan([tmp_path], patterns=patterns, max_workers=1)
+        assert (summary.num_scanned, summary.num_failed) == (2, 0)
+    # Closed right after the first record was read, not by the garbage collector
+    assert len(closed) == 1
+    assert capsys.readouterr().out == ""
@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from maccor_utility import convert
+from maccor_utility.convert import convert_file, main
+from maccor_utility.read import MaccorDataFormat
+from maccor_utility.synthetic import SyntheticRawFile, write_synthetic_raw_file
+
+
+def test_convert_to_csv(mims_server2_file, tmp_path, capsys):
+    output_dir = tmp_path / "out"
+    exit_code = main(
+        [
+            str(tmp_path / "*.txt"),
+            "--input-format",
+            "mims_server2",
+            "--to",
+            "csv",
+            "--output-dir",
+            str(output_dir),
+            "--naming",
+            "maccor_export2",
+            "--workers",
+            "1",
+        ]
+    )
+    assert exit_code == 0
+    assert "Converted 1 of 1 files: 4 records" in capsys.readouterr().out
+    df = pd.read_csv(output_dir / f"{mims_server2_file.name}.csv")
+    assert len(df) == 4
+    assert "RecNum" not in df.columns
+
+
+def test_convert_reports_failures(tmp_path, capsys):
+    (tmp_path / "broken.txt").write_bytes(b"\x00")
+    exit_code = main(
+        [str(tmp_path / "broken.txt"), "-f", "mims_server2", "-t", "csv"]
+        + ["-o", str(tmp_path), "-w", "1"]
+    )
+    assert exit_code == 1
+    assert "Converted 0 of 1 files" in capsys.readouterr().out
+
+
+def test_convert_same_names_without_overwriting(mims_server2_file, tmp_path, capsys):
+    for channel in ["chan1", "chan2"]:
+        (tmp_path / channel).mkdir()
+        (tmp_path / channel / "test.024").write_bytes(mims_server2_file.read_bytes())
+    args = [str(tmp_path / "chan*" / "test.024"), "-f", "mims_server2", "-t", "csv"]
+    args += ["-o", str(tmp_path / "out"), "-w", "1"]
+    assert main(args) == 0
+    for channel in ["chan1", "chan2"]:
+        assert len(pd.read_csv(tmp_path / "out" / channel / "test.024.csv")) == 4
+    # Existing outputs are only replaced with --overwrite
+    assert main(args) == 1
+    assert "Converted 0 of 2 files" in capsys.readouterr().out
+    assert main(args + ["--overwrite"]) == 0
+
+
+def test_convert_raw_columns_appearing_later(tmp_path, monkeypatch):
+    monkeypatch.setattr(convert, "MaccorDataRawFile", SyntheticRawFile)
+    file_path = write_synthetic_raw_file(tmp_path / "test.001", 10, var_from=6)
+    stats = convert_file(
+        file_path, "raw", tmp_path / "test.csv", output_format="csv", chunksize=4
+    )
+    assert stats.error is None and stats.num_records == 10
+    df = pd.read_csv(tmp_path / "test.csv")
+    assert df["Var15"].isna().tolist() == [True] * 6 + [False] * 4
+    assert np.allclose(df["Var2"].iloc[6:], 0.2)
+    assert df["RecNum"].tolist() == list(range(1, 11))
+
+
+@pytest.mark.parametrize("output_format", ["parquet", "arrow", "csv"])
+def test_convert_type_changing_between_chunks(
+    mims_server2_dcir_file, tmp_path, output_format
+):
+    if output_format != "csv":
+        pytest.importorskip("pyarrow")
+    output_path = tmp_path / f"test.{output_format}"
+    stats = convert_file(
+        mims_server2_dcir_file,
+        MaccorDataFormat.mims_server2,
+        output_path,
+        output_format=output_format,
+        chunksize=4,
+    )
+    assert stats.error is None and stats.num_records == 8
+    if output_format == "parquet":
+        df = pd.read_parquet(output_path)
+    elif output_format == "arrow":
+        import pyarrow.feather
+
+        df = pyarrow.feather.read_table(output_path).to_pandas()
+    else:
+        df = pd.read_csv(output_path)
+    assert np.allclose(df["DCIR"], [0] * 4 + [0.0123] * 4)
+    assert df["RecNum"].tolist() == list(range(1, 9))
+
+
+def test_convert_removes_partial_output(mims_server2_dcir_file, tmp_path):
+    # Decimals in an integer field are an error
+    lines = mims_server2_dcir_file.read_text().splitlines()
+    lines[-1] = lines[-1].replace("8\t0\t0\t1", "8\t0\t0\t1.5", 1)
+    mims_server2_dcir_file.write_text("\n".join(lines) + "\n")
+    output_path = tmp_path / "test.csv"
+    stats = convert_file(
+        mims_server2_dcir_file,
+        MaccorDataFormat.mims_server2,
+        output_path,
+        "csv",
+        chunksize=4,
+    )
+    assert "StepNum" in stats.error
+    assert not output_path.exists()
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+
+from maccor_utility.cycle_stats import (
+    CycleIndex,
+    MaccorCycleStatsFile,
+    MaccorCyclingDataFile,
+    get_cycle_index,
+    join_cycle_stats,
+)
+from maccor_utility.read import import_maccor_cycling_data, import_maccor_cycling_stats
+
+CYCLE_STATS_LINES = [
+    "Test Name:\ttest",
+    "Procedure:\ttest.000",
+    "",
+    "Channel:\t3",
+    "Start Date:\t01.10.2023 10:00:00",
+    "Mass:\t1,5",
+    "Comment:\tnone",
+    "Cycle\tCharge Capacity (Ah)\tDischarge Capacity (Ah)\tEnd Date",
+    "1\t1,05\t1,01\t01.10.2023 12:00:00",
+    "2\t1,04\t1,00\t01.10.2023 14:00:00",
+    "3\t1,03\t0,99\t01.10.2023 16:00:00",
+]
+
+
+def test_cycle_stats_file(tmp_path):
+    file_path = tmp_path / "cycle_stats.txt"
+    file_path.write_text("\n".join(CYCLE_STATS_LINES) + "\n", encoding="cp1252")
+    stats_file = MaccorCycleStatsFile(file_path=file_path)
+    stats = stats_file.read().data
+    assert stats_file.meta["Procedure"] == "test.000"
+    assert stats_file.meta["Start Date"] == "01.10.2023 10:00:00"
+    assert stats_file.cycle_column == "Cycle"
+    assert stats["Cycle"].dtype == "Int64"
+    assert np.allclose(stats["Discharge Capacity (Ah)"], [1.01, 1.00, 0.99])
+    chunks = list(stats_file.iter_chunks(chunksize=2))
+    assert all(chunk.dtypes.equals(stats.dtypes) for chunk in chunks)
+
+
+def test_cycle_index():
+    time_series = pd.DataFrame(
+        {"RecNum": np.arange(1, 11), "CycleNumProc": [0, 0, 1, 1, 1, 2, 2, 2, 2, 3]}
+    )
+    index = get_cycle_index(time_series)
+    assert index.get(1) == slice(2, 5)
+    assert index.get(7) == slice(0, 0)
+    # Chunk by chunk
+    chunked = CycleIndex()
+    for start in range(0, 10, 4):
+        chunked.process(time_series.iloc[start : start + 4])
+    pd.testing.assert_frame_equal(chunked.to_frame(), index.to_frame())
+    assert chunked.to_frame()["First RecNum"].tolist() == [1, 3, 6, 10]
+    stats = join_cycle_stats(pd.DataFrame({"Cycle": [1, 2, 5]}), index)
+    assert stats["Start"].tolist() == [2, 5, 0]
+    assert stats["End"].tolist() == [5, 9, 0]
+
+
+def test_cycling_data_file_dtypes(tmp_path):
+    lines = ["Today's Date:\t10/04/2023", "Cyc#\tStep\tCapacity (Ah)"]
+    lines += [f"{cycle}\t{cycle % 4}\t1,{cycle:03d}.5" for cycle in range(1, 21)]
+    lines += ["21\t2.5\t1,021.5"]  # Decimal in an integer column after the sample
+    file_path = tmp_path / "cycling_data.txt"
+    file_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    data_file = MaccorCyclingDataFile(file_path=file_path)
+    data_file.read_dtypes(num_rows=10)
+    stats = data_file.read().data
+    assert data_file.meta["Today's Date"] == "10/04/2023"
+    assert stats["Cyc#"].dtype == "Int64"
+    assert stats["Step"].tolist()[-1] == 2.5
+    assert stats["Capacity (Ah)"].iloc[0] == 1001.5
+    pd.testing.assert_frame_equal(import_maccor_cycling_data(file_path), stats)
+
+
+def test_import_maccor_cycling_stats(tmp_path):
+    file_path = tmp_path / "cycle_stats.txt"
+    file_path.write_text("\n".join(CYCLE_STATS_LINES) + "\n", encoding="cp1252")
+    stats = import_maccor_cycling_stats(file_path)
+    pd.testing.assert_frame_equal(
+        stats, MaccorCycleStatsFile(file_path=file_path).read().data
+    )
+    assert stats["Charge Capacity (Ah)"].tolist() == [1.05, 1.04, 1.03]
+
+
+def test_cycle_index_sparse_cycles():
+    time_series = pd.DataFrame({"CycleNumProc": [0, 0, 2**40, 2**40, 3]})
+    index = get_cycle_index(time_series)
+    assert len(index.ends) == 3
+    assert index.get(2**40) == slice(2, 4)
+    assert index.get(1) == slice(0, 0)
+    starts, ends = index.get_bounds(np.array([3, 2**40, 7]))
+    assert starts.tolist() == [4, 2, 0] and ends.tolist() == [5, 4, 0]
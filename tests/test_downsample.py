@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+from maccor_utility.downsample import DownsamplePyramid, downsample
+
+
+def get_time_series(num_records: int = 10_000, num_steps: int = 4):
+    test_time = np.arange(num_records, dtype=float)
+    step = np.arange(num_records) * num_steps // num_records
+    return pd.DataFrame(
+        {
+            "TestTime": test_time,
+            "CycleNumProc": step // 2,
+            "StepNum": step % 2 + 1,
+            "Voltage": np.sin(test_time / 500) + step,
+        }
+    )
+
+
+def test_downsample_keeps_step_boundaries():
+    df = get_time_series()
+    for method in ["lttb", "min_max"]:
+        result = downsample(df, n_points=100, method=method)
+        assert len(result) <= 100 + 2 * 4
+        assert result.index.is_monotonic_increasing
+        for idx in [0, 2499, 2500, 4999, 5000, 7499, 7500, 9999]:
+            assert idx in result.index
+        # Extremes of the voltage curve are preserved
+        assert result["Voltage"].max() == df["Voltage"].max()
+
+
+def test_downsample_per_cycle():
+    result = downsample(get_time_series(), n_points=50, group_by="cycle")
+    assert (result.groupby("CycleNumProc").size() <= 50 + 4).all()
+
+
+def test_downsample_pyramid():
+    df = get_time_series(num_records=100_000)
+    pyramid = DownsamplePyramid(df, n_points=500, factor=4)
+    assert len(pyramid.levels[0]) < len(pyramid.levels[1]) < len(df)
+    assert len(pyramid.levels[-1]) == len(df)
+    view = pyramid.get(10_000, 20_000)
+    assert view["TestTime"].between(10_000, 20_000).all()
+    assert 500 <= len(view) <= 4 * 500
+
+
+def test_downsample_without_steps_and_with_nan():
+    df = get_time_series()[["TestTime", "Voltage"]]
+    expected = downsample(df, n_points=100)
+    assert expected.index[0] == 0 and expected.index[-1] == len(df) - 1
+    df.loc[100, "Voltage"] = np.nan
+    result = downsample(df, n_points=100)
+    # The NaN only affects the buckets next to it
+    assert (
+        result.index[result.index > 500] == expected.index[expected.index > 500]
+    ).all()
@@ -0,0 +1,58 @@
+import subprocess
+import sys
+
+import pytest
+
+import maccor_utility
+from maccor_utility import lookup
+from maccor_utility.read import Translations
+
+# Imported on first use only. The import times are measured by the benchmarks, see
+# maccor_utility.benchmark.
+HEAVY_MODULES = ("pandas", "numpy", "pydantic", "batt_utility", "importlib.metadata")
+OPTIONAL_MODULES = ("pythoncom", "xml.etree.ElementTree", "numpy.lib.recfunctions")
+
+
+def import_in_subprocess(module: str) -> set:
+    """Import 'module' in a fresh interpreter, warnings as errors, and return the
+    names of the modules imported by then"""
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-W",
+            "error",
+            "-c",
+            f"import sys, {module}; print('\\n'.join(sys.modules))",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return set(result.stdout.splitlines())
+
+
+def test_import_read_is_lazy():
+    # Warnings are errors, i.e., the import must not warn, e.g., about COM
+    modules = import_in_subprocess("maccor_utility.read")
+    assert modules.isdisjoint(OPTIONAL_MODULES + ("duckdb",))
+
+
+def test_import_package_is_light():
+    modules = import_in_subprocess("maccor_utility")
+    assert modules.isdisjoint(HEAVY_MODULES)
+    assert [module for module in modules if module.startswith("maccor_utility")] == [
+        "maccor_utility"
+    ]
+    assert isinstance(maccor_utility.__version__, str)
+
+
+def test_translations_built_on_access():
+    assert lookup.TO_EXPORT1 is lookup.get_translation("TO_EXPORT1")
+    assert Translations.raw.table == {key: key for key in lookup.TO_EXPORT1}
+    assert Translations.maccor_export1.value == "TO_EXPORT1"
+    assert Translations("TO_EXPORT1") is Translations.maccor_export1
+    assert Translations.mims_server2.table["RecNum"] == ["Rec#"]
+    with pytest.raises(KeyError):
+        lookup.get_translation("TO_UNKNOWN")
+    with pytest.raises(AttributeError):
+        lookup.TO_UNKNOWN
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+from maccor_utility.incremental_capacity import (
+    get_half_cycles,
+    incremental_capacity,
+    incremental_capacity_many,
+)
+
+
+def get_time_series(num_cycles: int = 3, num_points: int = 101):
+    """Linear voltage curves: 2 Ah between 3 V and 4 V, i.e., dQ/dV = 2 Ah/V"""
+    capacity = np.linspace(0.0, 2.0, num_points)
+    voltage = 3.0 + capacity / 2.0
+    rest = np.full(5, 4.0)
+    cycle = {
+        "Voltage": np.concatenate([voltage, rest, voltage[::-1]]),
+        "Capacity": np.concatenate([capacity, np.full(5, 2.0), capacity]),
+        "Current": np.concatenate(
+            [np.ones(num_points), np.zeros(5), -np.ones(num_points)]
+        ),
+        "HalfCycleNumCalc": np.repeat([0, 0, 1], [num_points, 5, num_points]),
+    }
+    frames = []
+    for num in range(num_cycles):
+        frame = pd.DataFrame(cycle)
+        frame["CycleNumProc"] = num
+        frame["HalfCycleNumCalc"] += 2 * num
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
+
+
+def test_get_half_cycles():
+    half_cycles = get_half_cycles(get_time_series())
+    assert half_cycles["Direction"].tolist() == [1, -1] * 3
+    assert half_cycles["HalfCycleNumCalc"].tolist() == list(range(6))
+    assert (half_cycles["End"] - half_cycles["Start"] == 101).all()
+
+
+def test_incremental_capacity():
+    result = incremental_capacity(get_time_series(), num_points=51, smoothing=5)
+    assert result.curves.shape == (6, 51)
+    assert np.allclose(result.grid[[0, -1]], [3.0, 4.0])
+    assert np.allclose(result.half_cycles["Capacity"], 2.0)
+    # Charge: dQ/dV = 2 Ah/V, discharge: dQ/dV = -2 Ah/V
+    assert np.allclose(result.derivative[0::2], 2.0)
+    assert np.allclose(result.derivative[1::2], -2.0)
+
+
+def test_differential_voltage_many():
+    results = incremental_capacity_many(
+        [get_time_series(), get_time_series(num_cycles=1)],
+        max_workers=2,
+        grid_variable="capacity",
+        num_points=21,
+    )
+    assert [len(result.half_cycles) for result in results] == [6, 2]
+    assert np.allclose(results[1].derivative[0], 0.5)
+    assert np.allclose(results[1].derivative[1], -0.5)
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from maccor_utility.merge import iter_merge_channels, merge_channels
+
+START = 45000.0  # Days since the Delphi epoch
+
+
+def get_channel(time_offset: float, num_records: int = 100, step: float = 1.0):
+    test_time = np.arange(num_records) * step
+    return pd.DataFrame(
+        {
+            "DPtTime": START + (time_offset + test_time) / 86400,
+            "TestTime": test_time,
+            "Voltage": 3.0 + test_time / 1000,
+        }
+    )
+
+
+def test_merge_channels():
+    channels = {"ch1": get_channel(0.0), "ch2": get_channel(0.5, step=2.0)}
+    merged = merge_channels(channels, dt=1.0, columns=["Voltage"], tolerance=1.0)
+    assert list(merged.columns) == ["DPtTime", "ch1/Voltage", "ch2/Voltage"]
+    assert np.allclose(merged["ch1/Voltage"].iloc[:100], 3.0 + np.arange(100) / 1000)
+    # ch2 starts 0.5 s later and logs every 2 s
+    assert np.isnan(merged["ch2/Voltage"].iloc[0])
+    assert np.isclose(merged["ch2/Voltage"].iloc[1], 3.0)
+    assert np.isnan(merged["ch2/Voltage"].iloc[2])  # Beyond the tolerance
+    assert np.isclose(merged["ch2/Voltage"].iloc[3], 3.002)
+    linear = merge_channels(
+        channels, dt=1.0, columns=["Voltage"], tolerance=1.5, method="linear"
+    )
+    assert np.isclose(linear["ch2/Voltage"].iloc[2], 3.0015)
+
+
+def test_iter_merge_channels_equals_merge_channels():
+    ch1, ch2 = get_channel(0.0, num_records=1000), get_channel(100.25, step=0.5)
+    merged = merge_channels({"a": ch1, "b": ch2}, dt=0.5, columns=["Voltage"])
+    streamed = pd.concat(
+        iter_merge_channels(
+            {
+                "a": [ch1.iloc[i : i + 70] for i in range(0, len(ch1), 70)],
+                "b": [ch2.iloc[i : i + 30] for i in range(0, len(ch2), 30)],
+            },
+            dt=0.5,
+            columns=["Voltage"],
+            window=60.0,
+        ),
+        ignore_index=True,
+    )
+    pd.testing.assert_frame_equal(streamed, merged)
@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+from maccor_utility.metrics import OTHER_ERRORS, CountingLibrary, ReadMetrics
+from maccor_utility.read import (
+    MaccorDataFormat,
+    iter_maccor_data_file,
+    read_maccor_data_file,
+)
+
+
+def test_read_metrics_text_file(mims_server2_file):
+    phases = []
+    metrics = ReadMetrics(hooks=[lambda phase, seconds: phases.append(phase)])
+    read_maccor_data_file(
+        mims_server2_file, frmt=MaccorDataFormat.mims_server2, metrics=metrics
+    )
+    assert set(metrics.timings) == {"header", "dataframe", "rename", "validation"}
+    assert set(phases) == set(metrics.timings)
+    assert metrics.num_records == 4
+    assert metrics.num_bytes == mims_server2_file.stat().st_size
+    assert metrics.records_per_second > 0
+    # Exportable for monitoring
+    assert json.loads(json.dumps(metrics.to_dict()))["num_records"] == 4
+
+    metrics = ReadMetrics()
+    chunks = list(
+        iter_maccor_data_file(
+            mims_server2_file,
+            frmt=MaccorDataFormat.mims_server2,
+            chunksize=3,
+            metrics=metrics,
+        )
+    )
+    assert len(chunks) == 2
+    assert metrics.num_records == 4
+    assert metrics.num_bytes == mims_server2_file.stat().st_size
+
+
+def test_read_metrics_bounded_errors():
+    metrics = ReadMetrics(max_error_messages=2)
+    for message in ["a", "b", "a", "c", "d"]:
+        metrics.add_error(ValueError(message))
+    assert metrics.num_errors == 5
+    assert metrics.errors == {"a": 2, "b": 1, OTHER_ERRORS: 2}
+
+
+def test_counting_library():
+    class Library:
+        def GetTestName(self, *args):
+            return 0
+
+    metrics = ReadMetrics()
+    dll = metrics.wrap_dll(Library())
+    assert isinstance(dll, CountingLibrary)
+    for _ in range(3):
+        dll.GetTestName(1)
+    assert metrics.calls == {"GetTestName": 3}
+    with pytest.raises(AttributeError):
+        dll.GetFRAData
+    assert ReadMetrics(count_calls=False).wrap_dll(Library()).__class__ is Library
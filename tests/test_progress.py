@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from maccor_utility.progress import CancellationToken, ReadCancelled
+from maccor_utility.read import (
+    MaccorDataFormat,
+    iter_maccor_data_file,
+    read_maccor_data_file,
+)
+from maccor_utility.write import write_maccor_text_file
+
+
+@pytest.fixture
+def large_file(tmp_path):
+    num_records = 100_000
+    df = pd.DataFrame(
+        {
+            "RecNum": np.arange(1, num_records + 1),
+            "TestTime": np.arange(num_records, dtype=float),
+            "Voltage": np.full(num_records, 3.7),
+        }
+    )
+    return write_maccor_text_file(
+        df, tmp_path / "large.txt", frmt=MaccorDataFormat.mims_server2, decimals=3
+    )
+
+
+def test_read_progress(large_file):
+    reports = []
+    result = read_maccor_data_file(
+        large_file, frmt=MaccorDataFormat.mims_server2, progress=reports.append
+    )
+    assert len(result.data.as_dataframe) == 100_000
+    assert len(reports) > 2
+    assert all(report.unit == "bytes" for report in reports)
+    assert reports[0].fraction == 0.0
+    done = [report.done for report in reports]
+    assert done == sorted(done)
+    assert reports[-1].finished and reports[-1].fraction == 1.0
+    assert reports[-1].num_records == 100_000
+
+
+def test_read_cancelled(large_file):
+    cancel = CancellationToken()
+    reports = []
+
+    def progress(report):
+        reports.append(report)
+        if report.done > 0:
+            cancel.cancel()
+
+    with pytest.raises(ReadCancelled):
+        read_maccor_data_file(
+            large_file,
+            frmt=MaccorDataFormat.mims_server2,
+            progress=progress,
+            cancel=cancel,
+        )
+    assert not reports[-1].finished
+
+    cancel = CancellationToken()
+    chunks = iter_maccor_data_file(
+        large_file, frmt=MaccorDataFormat.mims_server2, chunksize=1000, cancel=cancel
+    )
+    next(chunks)
+    cancel.cancel()
+    with pytest.raises(ReadCancelled):
+        list(chunks)
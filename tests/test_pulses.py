@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+from maccor_utility.pulses import find_pulses
+
+
+def get_hppc(num_pulses: int = 3):
+    """Rest at 3.7 V, 10 s pulses of -2 A with 20 mOhm ohmic resistance plus a
+    polarisation of 1 mV/s, then rest again"""
+    frames = []
+    time_offset = 0.0
+    for num in range(num_pulses):
+        rest_time = np.arange(0.0, 60.0, 1.0)
+        pulse_time = np.arange(0.0, 10.01, 0.1)
+        frames.append(
+            pd.DataFrame(
+                {
+                    "TestTime": time_offset + rest_time,
+                    "StepNum": 2 * num + 1,
+                    "Current": 0.0,
+                    "Voltage": 3.7,
+                }
+            )
+        )
+        frames.append(
+            pd.DataFrame(
+                {
+                    "TestTime": time_offset + 60.0 + pulse_time,
+                    "StepNum": 2 * num + 2,
+                    "Current": -2.0,
+                    "Voltage": 3.7 - 2.0 * 0.02 - 0.001 * pulse_time,
+                }
+            )
+        )
+        time_offset += 80.0
+    df = pd.concat(frames, ignore_index=True)
+    df["CycleNumProc"] = 0
+    df["RecNum"] = np.arange(1, len(df) + 1)
+    return df
+
+
+def test_find_pulses():
+    pulses = find_pulses(get_hppc(), offsets=(0.0, 1.0, 10.0, 20.0))
+    # Pulse starts and the rest steps after them (2 A current change each)
+    assert len(pulses) == 5
+    discharge = pulses[pulses["Current at 0.0 s / A"] < 0]
+    assert len(discharge) == 3
+    assert np.allclose(discharge["Resistance at 0.0 s / Ohm"], 0.02)
+    assert np.allclose(discharge["Resistance at 10.0 s / Ohm"], 0.025)
+    assert discharge["Resistance at 20.0 s / Ohm"].isna().all()
+    assert np.allclose(discharge["Duration / s"], 10.0)
+
+
+def test_find_pulses_duration_range():
+    pulses = find_pulses(get_hppc(), duration_range=(0.0, 30.0))
+    assert len(pulses) == 3
+    assert (pulses["StepNum"] % 2 == 0).all()
@@ -1,4 +1,27 @@
-from maccor_utility.read import MaccorDataFormat
+import bz2
+import ctypes
+import gzip
+import io
+import zipfile
+
+import numpy as np
+
+from maccor_utility.helper_functions import PrefixedStream
+from maccor_utility.lookup import (
+    FRA_RECORD_DTYPE,
+    SCOPE_TRACE_DTYPE,
+    TDLLFRARecord,
+    TDLLScopeTrace,
+    TScopeTraceVI,
+)
+from maccor_utility.read import (
+    MaccorDataFormat,
+    MaccorDataTxtFile,
+    RecordBuffer,
+    get_procedure_and_subroutine,
+    read_maccor_data_file,
+    scope_trace_cube,
+)
 
 
 def test_maccor_data_format():
@@ -11,3 +34,121 @@ def test_maccor_data_format():
         "MIMS Server 2",
     ]:
         assert ele in MaccorDataFormat.__members__.values()
+
+
+def test_record_dtypes_mirror_ctypes():
+    assert SCOPE_TRACE_DTYPE.itemsize == ctypes.sizeof(TDLLScopeTrace)
+    assert FRA_RECORD_DTYPE.itemsize == ctypes.sizeof(TDLLFRARecord)
+    assert list(FRA_RECORD_DTYPE.names) == TDLLFRARecord.field_strings_
+
+
+def test_record_buffer():
+    fra_buffer = RecordBuffer(FRA_RECORD_DTYPE)
+    fra_record = TDLLFRARecord()
+    for rec_num, freq in [(3, 1000.0), (3, 100.0), (8, 10.0)]:
+        fra_record.FRAFreq = freq
+        fra_buffer.append(rec_num, fra_record)
+    fra = fra_buffer.to_records()
+    assert fra["RecNum"].tolist() == [3, 3, 8]
+    assert fra["FRAFreq"].tolist() == [1000.0, 100.0, 10.0]
+
+    smb_buffer = RecordBuffer(np.dtype((np.float32, (3,))))
+    smb_buffer.append(1, (ctypes.c_float * 3)(1.0, 2.0, 3.0))
+    assert smb_buffer.to_records()["Values"].shape == (1, 3)
+
+
+def test_scope_trace_cube():
+    scope_buffer = RecordBuffer(SCOPE_TRACE_DTYPE)
+    scope_trace = TDLLScopeTrace()
+    scope_trace.Samples = 2
+    scope_trace.Reading[0].V = 4.2
+    scope_trace.Reading[1] = TScopeTraceVI(V=3.9, I=-1.0)
+    scope_buffer.append(5, scope_trace)
+    cube = scope_trace_cube(scope_buffer.to_records())
+    assert cube.shape == (1, 50, 2)
+    assert cube.dtype == np.float32
+    assert cube[0, 1, 1] == -1.0
+    assert np.isnan(cube[0, 2:]).all()
+
+
+def test_get_procedure_and_subroutine(tmp_path):
+    procedure = "<MaccorTestProcedure><ProcSteps><TestStep/></ProcSteps>"
+    subroutine = "<MaccorTestProcedure><ProcSteps/></MaccorTestProcedure>"
+    raw_file = tmp_path / "test.024"
+    raw_file.write_bytes(
+        b"\x00\x07Cycling test\x00\x05Test.000\x00"
+        + procedure.encode()
+        + b"</MaccorTestProcedure>\x00\x10\x00Sub.000\x00"
+        + subroutine.encode()
+        + bytes(range(256))
+    )
+    procedures = get_procedure_and_subroutine(raw_file, tmp_path / "Test.000")
+    assert [proc.name for proc in procedures] == ["Test.000", "Sub.000"]
+    assert procedures[0].to_element().find("ProcSteps/TestStep") is not None
+    assert procedures[1].xml == subroutine
+    assert (tmp_path / "Test.000").read_text() == procedures[0].xml
+    assert (tmp_path / "Sub.000").exists()
+
+
+def test_read_meta_only(mims_server2_file):
+    result = read_maccor_data_file(
+        mims_server2_file, frmt=MaccorDataFormat.mims_server2, meta_only=True
+    )
+    assert result.data is None
+    assert result.meta["Date of export"] == "10/04/2023"
+    full = read_maccor_data_file(mims_server2_file, frmt=MaccorDataFormat.mims_server2)
+    assert full.meta == result.meta
+
+
+class NonSeekableStream(io.RawIOBase):
+    def __init__(self, content):
+        self.buffer = io.BytesIO(content)
+
+    def readinto(self, buffer):
+        return self.buffer.readinto(buffer)
+
+    def readable(self):
+        return True
+
+
+def test_prefixed_stream_readline_size():
+    stream = PrefixedStream("ab", io.StringIO("cdef\ngh\n"))
+    assert stream.readline(1) == "a"
+    assert stream.readline(3) == "bcd"
+    assert stream.readline(0) == ""
+    assert stream.readline() == "ef\n"
+    stream = PrefixedStream(b"a\nbc", io.BytesIO(b"d\n"))
+    assert stream.readline(5) == b"a\n"
+    assert stream.readline(None) == b"bcd\n"
+    assert stream.readline() == b""
+    assert list(PrefixedStream("a\nb", io.StringIO("c\nd"))) == ["a\n", "bc\n", "d"]
+
+
+def test_compressed_and_file_like_sources(mims_server2_file, tmp_path):
+    content = mims_server2_file.read_bytes()
+    gz_file = tmp_path / "export.txt.gz"
+    gz_file.write_bytes(gzip.compress(content))
+    zip_file = tmp_path / "export.zip"
+    with zipfile.ZipFile(zip_file, "w") as archive:
+        archive.writestr("export.txt", content)
+    expected = MaccorDataTxtFile(
+        file_path=mims_server2_file, export_format=MaccorDataFormat.mims_server2
+    ).read()
+    for source in [
+        gz_file,
+        zip_file,
+        io.BytesIO(bz2.compress(content)),
+        NonSeekableStream(gzip.compress(content)),
+        io.StringIO(content.decode()),
+    ]:
+        result = MaccorDataTxtFile(
+            file_path=source, export_format=MaccorDataFormat.mims_server2
+        ).read()
+        assert result.meta == expected.meta
+        assert result.data.as_dataframe.equals(expected.data.as_dataframe)
+    chunks = list(
+        MaccorDataTxtFile(
+            file_path=gz_file, export_format=MaccorDataFormat.mims_server2
+        ).iter_chunks(chunksize=3)
+    )
+    assert [len(chunk) for chunk in chunks] == [3, 1]
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+from maccor_utility.read import (
+    MaccorDataFormat,
+    MaccorTabularData,
+    read_maccor_data_file,
+)
+from maccor_utility.reconcile import reconcile
+
+
+def test_reconcile_raw_and_export(mims_server2_file):
+    export = read_maccor_data_file(
+        mims_server2_file, frmt=MaccorDataFormat.mims_server2
+    )
+    raw = pd.DataFrame(
+        {
+            "RecNum": [2, 3, 4, 5],
+            "StepNum": [1, 2, 2, 2],
+            "TestTime": [1.0, 2.0, 3.0, 4.0],
+            "Voltage": [3.5012, 3.6, 3.7, 3.8],
+            "DPtTime": (
+                pd.to_datetime(["10/01/2023 10:00:01", "10/01/2023 10:00:02"] * 2)
+                - pd.Timestamp(1899, 12, 30)
+            )
+            / pd.Timedelta(days=1),
+            "ACZ": 0.0,
+        }
+    )
+    raw_data = MaccorTabularData(
+        as_list=raw.to_dict(orient="records"), data_format=MaccorDataFormat.raw
+    )
+    report = reconcile(export, raw_data, tolerance={"Voltage": 0.001})
+    assert report.num_matched == 3
+    assert report.missing.ranges == [(1, 1)]
+    assert report.extra.ranges == [(5, 5)]
+    assert "ACZ" in report.only_right_columns
+    assert report.columns["StepNum"].max_abs_deviation == 0
+    assert np.isclose(report.columns["Voltage"].max_abs_deviation, 0.0002)
+    assert report.columns["Voltage"].num_exceeding == 0
+    # Time stamps of the export (text) are compared as days since the Delphi epoch
+    assert report.columns["DPtTime"].num_exceeding == 1
+    assert report.columns["DPtTime"].rec_num_of_max == 4
+    assert not report.agrees
+
+
+def test_reconcile_invalid_rec_num():
+    left = pd.DataFrame({"RecNum": [1.0, np.nan, 3.0, 4.0], "Voltage": 3.5})
+    right = pd.DataFrame({"RecNum": [1.0, 2.0, np.nan, 4.0], "Voltage": 3.5})
+    report = reconcile(left, right)
+    assert report.num_matched == 2
+    assert report.num_invalid_rec_num_left == 1
+    assert report.num_invalid_rec_num_right == 1
+    assert report.missing.count == 1
+    assert report.missing.ranges == [(3, 3)]
+    assert report.extra.ranges == [(2, 2)]
+    assert report.columns["Voltage"].num_compared == 2
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+from maccor_utility.read import MaccorDataFormat, iter_maccor_data_file
+from maccor_utility.resample import Resampler, resample, resample_chunks
+
+
+def get_time_series():
+    return pd.DataFrame(
+        {
+            "TestTime": [0.0, 1.0, 2.5, 4.0, 4.0, 5.0, 7.0],
+            "CycleNumProc": [1, 1, 1, 1, 1, 1, 1],
+            "StepNum": [1, 1, 1, 1, 2, 2, 2],
+            "Current": [0.0, 0.0, 0.0, 0.0, 1.0, 1.0, 1.0],
+            "Voltage": [3.0, 3.1, 3.25, 3.4, 3.5, 3.6, 3.8],
+        }
+    )
+
+
+def test_resample_per_step():
+    result = resample(get_time_series(), dt=1.0)
+    assert result["TestTime"].tolist() == [0, 1, 2, 3, 4, 4, 5, 6, 7]
+    assert result["StepNum"].tolist() == [1, 1, 1, 1, 1, 2, 2, 2, 2]
+    # No interpolation across the step boundary at TestTime = 4 s
+    assert np.allclose(result["Voltage"], [3.0, 3.1, 3.2, 3.3, 3.4, 3.5, 3.6, 3.7, 3.8])
+    zoh = resample(get_time_series(), dt=1.0, method="zero_order_hold")
+    assert np.allclose(zoh["Voltage"], [3.0, 3.1, 3.1, 3.25, 3.4, 3.5, 3.6, 3.6, 3.8])
+
+
+def test_resample_chunks_equals_resample():
+    df = get_time_series()
+    chunked = pd.concat(
+        resample_chunks([df.iloc[:2], df.iloc[2:5], df.iloc[5:]], dt=0.5),
+        ignore_index=True,
+    )
+    pd.testing.assert_frame_equal(chunked, resample(df, dt=0.5))
+
+
+def test_resampler_keeps_open_segment_in_pieces():
+    df = get_time_series()
+    resampler = Resampler(dt=0.5)
+    # Step 1 spans the first four chunks and is resampled once step 2 starts
+    for idx in range(4):
+        assert resampler.process(df.iloc[idx : idx + 1]).empty
+    assert len(resampler._carry) == 4
+    first = resampler.process(df.iloc[4:])
+    assert len(resampler._carry) == 1
+    result = pd.concat([first, resampler.flush()], ignore_index=True)
+    pd.testing.assert_frame_equal(result, resample(df, dt=0.5))
+    assert resampler._carry == []
+
+
+def test_resample_text_file_chunks(mims_server2_file):
+    chunks = iter_maccor_data_file(
+        mims_server2_file, frmt=MaccorDataFormat.mims_server2, chunksize=3
+    )
+    result = pd.concat(resample_chunks(chunks, dt=0.5), ignore_index=True)
+    assert result["TestTime"].tolist() == [0.0, 0.5, 1.0, 2.0, 2.5, 3.0]
+    assert np.allclose(result["Voltage"], [3.5, 3.5005, 3.501, 3.6, 3.65, 3.7])
@@ -0,0 +1,113 @@
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from itertools import repeat
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from maccor_utility import shared as shared_module
+from maccor_utility.read import (
+    MaccorDataFormat,
+    MaccorDataTxtFile,
+    read_maccor_data_file,
+)
+from maccor_utility.shared import (
+    SharedResult,
+    read_to_shared_memory,
+    release_worker_blocks,
+    to_shared_memory,
+)
+from maccor_utility.synthetic import write_synthetic_file
+
+
+def test_shared_memory_round_trip(mims_server2_file):
+    result = read_maccor_data_file(
+        mims_server2_file, frmt=MaccorDataFormat.mims_server2
+    )
+    descriptor = to_shared_memory(result)
+    assert len(pickle.dumps(descriptor)) < 2_000
+    with SharedResult(pickle.loads(pickle.dumps(descriptor))) as shared:
+        assert shared.meta["Filename"] == "test.024"
+        df = shared.data.as_dataframe
+        expected = result.data.as_dataframe
+        assert list(df.columns) == list(expected.columns)
+        assert np.shares_memory(
+            df["Voltage"].to_numpy(), shared.data.columns["Voltage"]
+        )
+        pd.testing.assert_frame_equal(df.copy(), expected)
+        assert shared.data.as_list[2]["Mode"] == "C"
+        del df
+    # Removed on exit
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=descriptor.block_name)
+    with pytest.raises(ValueError):
+        to_shared_memory(
+            MaccorDataTxtFile(
+                file_path=mims_server2_file,
+                export_format=MaccorDataFormat.mims_server2,
+            )
+        )
+
+
+def test_shared_memory_missing_values():
+    df = pd.DataFrame(
+        {
+            "Cycle": pd.array([1, None, 3], dtype="Int64"),
+            "MD": pd.Series(["R", None, "C"], dtype="str"),
+            "Voltage": [3.0, np.nan, 3.2],
+        }
+    )
+    with SharedResult(to_shared_memory(df)) as shared:
+        pd.testing.assert_frame_equal(shared.data.as_dataframe.copy(), df)
+
+
+def test_read_to_shared_memory_in_processes(tmp_path):
+    file_paths = [
+        write_synthetic_file(
+            tmp_path / f"test{seed}.txt",
+            MaccorDataFormat.mims_client2,
+            2_000,
+            seed=seed,
+        )
+        for seed in range(2)
+    ]
+    with ExitStack() as stack:
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            descriptors = pool.map(
+                read_to_shared_memory, file_paths, repeat(MaccorDataFormat.mims_client2)
+            )
+            # Mapped before the pool is shut down, as required on Windows
+            results = [stack.enter_context(SharedResult(d)) for d in descriptors]
+        # The mappings outlive the worker processes
+        for shared, file_path in zip(results, file_paths):
+            expected = read_maccor_data_file(
+                file_path, frmt=MaccorDataFormat.mims_client2
+            )
+            assert shared.data.data_format == MaccorDataFormat.mims_client2
+            assert np.allclose(
+                shared.data.as_dataframe["Voltage"],
+                expected.data.as_dataframe["Voltage"],
+            )
+
+
+def test_release_worker_blocks(monkeypatch, mims_server2_file):
+    # As on Windows: the blocks are kept open until the receiver mapped them
+    monkeypatch.setattr(shared_module, "KEEP_BLOCKS_OPEN", True)
+    result = read_maccor_data_file(
+        mims_server2_file, frmt=MaccorDataFormat.mims_server2
+    )
+    first = to_shared_memory(result)
+    second = to_shared_memory(result)
+    assert set(shared_module._worker_blocks) == {first.block_name, second.block_name}
+    with SharedResult(first):
+        assert release_worker_blocks() == 1
+    assert set(shared_module._worker_blocks) == {second.block_name}
+    with SharedResult(second):
+        # Released on the next call, e.g., the next task of a worker
+        third = to_shared_memory(result)
+    assert set(shared_module._worker_blocks) == {third.block_name}
+    SharedResult(third).close()
+    assert release_worker_blocks() == 0
@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+
+from maccor_utility.read import MaccorDataFormat, read_maccor_data_file
+from maccor_utility.spill import ColumnStore, SpilledTabularData, collect_chunks
+from maccor_utility.write import write_maccor_text_file
+
+FRMT = MaccorDataFormat.mims_server2
+
+
+def is_memory_mapped(array):
+    while array is not None:
+        if isinstance(array, np.memmap):
+            return True
+        array = array.base
+    return False
+
+
+def test_read_with_max_memory(tmp_path):
+    num_records = 20_000
+    df = pd.DataFrame(
+        {
+            "RecNum": np.arange(1, num_records + 1),
+            "TestTime": np.arange(num_records, dtype=float),
+            "Voltage": np.linspace(3.0, 4.2, num_records),
+            "DPtTime": 45200.5 + np.arange(num_records) / 86400,
+        }
+    )
+    path = write_maccor_text_file(df, tmp_path / "test.txt", frmt=FRMT)
+    expected = read_maccor_data_file(path, frmt=FRMT).data
+    data = read_maccor_data_file(path, frmt=FRMT, max_memory=0.1).data
+    assert isinstance(data, SpilledTabularData)
+    assert is_memory_mapped(data.as_dataframe["Voltage"].to_numpy())
+    pd.testing.assert_frame_equal(data.as_dataframe.copy(), expected.as_dataframe)
+    assert len(data.as_list) == num_records
+    assert data.as_list[1] == expected.as_list[1]
+    # Within the budget, the data is held in memory as usual
+    data = read_maccor_data_file(path, frmt=FRMT, max_memory=100).data
+    assert not isinstance(data, SpilledTabularData)
+
+
+def test_column_store_promotes_dtypes(tmp_path):
+    store = ColumnStore(tmp_path / "store")
+    chunks = [
+        pd.DataFrame({"RecNum": [1, 2], "MD": ["R", "C"]}),
+        pd.DataFrame({"RecNum": [3, None], "Comment": ["a", "bcd"]}),
+    ]
+    for chunk in chunks:
+        store.append(chunk)
+    df = store.to_dataframe()
+    assert df["RecNum"].tolist()[:3] == [1.0, 2.0, 3.0]
+    assert np.isnan(df["RecNum"].iloc[3])
+    # Missing strings are NaN, as in memory
+    pd.testing.assert_frame_equal(df.copy(), pd.concat(chunks, ignore_index=True))
+
+
+def test_collect_chunks_missing_values_as_in_memory(tmp_path):
+    comment = pd.Series([None, None], dtype="str")  # A string column, all missing
+    chunks = [
+        pd.DataFrame({"RecNum": [1, 2], "MD": ["R", None], "Comment": comment}),
+        pd.DataFrame({"RecNum": [3, 4], "MD": [None, "C" * 100], "Comment": comment}),
+    ]
+    for remove_nan_cols in [False, True]:
+        expected = collect_chunks(chunks, FRMT, remove_nan_cols=remove_nan_cols)
+        spilled = collect_chunks(
+            chunks, FRMT, max_memory=0, remove_nan_cols=remove_nan_cols
+        )
+        assert isinstance(spilled, SpilledTabularData)
+        # The row dicts held in memory turn the all-missing column into float64
+        pd.testing.assert_frame_equal(
+            spilled.as_dataframe.copy(), expected.as_dataframe, check_dtype=False
+        )
+        assert spilled.as_dataframe["MD"].dtype == expected.as_dataframe["MD"].dtype
+        assert ("Comment" in spilled.as_dataframe) != remove_nan_cols
+    # Nullable integers keep their dtype
+    store = ColumnStore(tmp_path / "store")
+    chunks = [pd.DataFrame({"Cycle": pd.array([1, None, 2], dtype="Int64")})] * 2
+    for chunk in chunks:
+        store.append(chunk)
+    pd.testing.assert_frame_equal(
+        store.to_dataframe().copy(), pd.concat(chunks, ignore_index=True)
+    )
+
+
+def test_column_store_widens_strings_rarely(tmp_path, monkeypatch):
+    conversions = []
+    fromfile = np.fromfile
+    monkeypatch.setattr(
+        np,
+        "fromfile",
+        lambda *args, **kwargs: conversions.append(1) or fromfile(*args, **kwargs),
+    )
+    store = ColumnStore(tmp_path / "store")
+    for width in range(1, 1025):
+        store.append(pd.DataFrame({"Comment": ["x" * width]}))
+    assert len(conversions) <= 11  # Doubled each time
+    assert store.to_dataframe()["Comment"].str.len().tolist() == list(range(1, 1025))
@@ -0,0 +1,92 @@
+import json
+import sqlite3
+
+import numpy as np
+import pytest
+
+from maccor_utility.read import MaccorDataFormat, read_maccor_data_file
+from maccor_utility.sql import MaccorSqlSink, SqlEngine
+from maccor_utility.synthetic import SyntheticRawFile, write_synthetic_file
+
+
+def test_sqlite_load_result(tmp_path, mims_server2_file):
+    result = read_maccor_data_file(
+        mims_server2_file, frmt=MaccorDataFormat.mims_server2
+    )
+    with MaccorSqlSink(tmp_path / "tests.db") as sink:
+        assert sink.engine == SqlEngine.sqlite
+        assert sink.load(result) == 1
+    connection = sqlite3.connect(str(tmp_path / "tests.db"))
+    rows = connection.execute(
+        "SELECT RecNum, Mode, DPtTime, typeof(Voltage) FROM records ORDER BY RecNum"
+    ).fetchall()
+    assert [row[:2] for row in rows] == [(1, "R"), (2, "R"), (3, "C"), (4, "C")]
+    assert rows[0][2] == pytest.approx(45200 + 10 / 24)  # Days, like raw files
+    assert rows[0][3] == "real"
+    test = connection.execute(
+        "SELECT test_id, data_format, num_records, meta FROM tests"
+    ).fetchone()
+    assert test[:3] == (1, "MIMS Server 2", 4)
+    assert json.loads(test[3])["Filename"] == "test.024"
+    indexes = connection.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index'"
+    ).fetchall()
+    assert sorted(indexes) == [("records_cyclenumproc",), ("records_recnum",)]
+    connection.close()
+
+
+def test_sqlite_load_file_and_raw(tmp_path):
+    text_file = write_synthetic_file(
+        tmp_path / "synthetic.txt", MaccorDataFormat.mims_server2, 1_000
+    )
+    raw_file = write_synthetic_file(
+        tmp_path / "synthetic.001", MaccorDataFormat.raw, 500
+    )
+    reader = SyntheticRawFile(raw_file)
+    reader.read()
+    with MaccorSqlSink(tmp_path / "tests.db") as sink:
+        assert (
+            sink.load_file(text_file, MaccorDataFormat.mims_server2, chunksize=300) == 1
+        )
+        assert sink.load(reader, index=False) == 2
+        # Columns of the raw file not in TDLLTimeData were added
+        assert sink.column_kinds["CanStr"] == "text"
+        counts = sink.connection.execute(
+            "SELECT test_id, COUNT(*), MAX(CycleNumProc) FROM records "
+            "GROUP BY test_id ORDER BY test_id"
+        ).fetchall()
+        assert counts == [(1, 1_000, 0), (2, 500, 0)]
+        modes = sink.connection.execute(
+            "SELECT DISTINCT Mode FROM records WHERE test_id = 2"
+        ).fetchall()
+        assert modes == [("R",)]  # Character codes of raw files as letters
+        test_name = sink.connection.execute(
+            "SELECT test_name FROM tests WHERE test_id = 2"
+        ).fetchone()[0]
+        assert test_name == "Synthetic"
+    # Reopened with the added columns
+    with MaccorSqlSink(tmp_path / "tests.db") as sink:
+        assert sink.column_kinds["CAN0"] == "text"
+
+
+def test_duckdb_load_chunks(tmp_path):
+    pytest.importorskip("duckdb")
+    file_path = write_synthetic_file(
+        tmp_path / "synthetic.txt", MaccorDataFormat.mims_server2, 2_000
+    )
+    result = read_maccor_data_file(file_path, frmt=MaccorDataFormat.mims_server2)
+    df = result.data.as_dataframe
+    with MaccorSqlSink(tmp_path / "tests.duckdb") as sink:
+        assert sink.engine == SqlEngine.duckdb
+        test_id = sink.load_chunks(
+            [df.iloc[:700], df.iloc[700:]],
+            meta=result.meta,
+            data_format=MaccorDataFormat.mims_server2,
+        )
+        voltage = sink.connection.execute(
+            "SELECT Voltage FROM records WHERE test_id = ? ORDER BY RecNum", [test_id]
+        ).fetchnumpy()["Voltage"]
+        np.testing.assert_allclose(voltage, df["Voltage"].to_numpy())
+        assert sink.connection.execute("SELECT num_records FROM tests").fetchall() == [
+            (2_000,)
+        ]
@@ -0,0 +1,69 @@
+import numpy as np
+from conftest import MIMS_SERVER2_LINES
+
+from maccor_utility import stitch
+from maccor_utility.read import MaccorDataFormat
+from maccor_utility.stitch import iter_file_series, read_file_series
+
+HEADER = MIMS_SERVER2_LINES[:2]
+
+
+def write_file(path, records):
+    lines = [
+        f"{rec}\t{cyc}\t0\t1\t{time:.3f}\t0.000\t0.000\t0.000\t0.000\t3.500\tR\t0\t"
+        f"10/01/2023 10:{minute:02d}:{second:02d}"
+        for rec, cyc, time, minute, second in records
+    ]
+    path.write_text("\n".join(HEADER + lines) + "\n", encoding="utf-8")
+    return path
+
+
+def test_read_file_series(tmp_path):
+    first = write_file(
+        tmp_path / "test.024", [(1, 0, 0.0, 0, 0), (2, 1, 1.0, 0, 1), (3, 1, 2.0, 0, 2)]
+    )
+    # Resumed one minute later, all counters restart
+    second = write_file(tmp_path / "test.025", [(1, 0, 0.0, 1, 2), (2, 1, 1.0, 1, 3)])
+    # Continued counting with one record overlapping the previous file
+    third = write_file(tmp_path / "test.026", [(2, 1, 1.0, 1, 3), (3, 1, 2.0, 1, 4)])
+    df = read_file_series([third, first, second], frmt=MaccorDataFormat.mims_server2)
+    assert df["RecNum"].tolist() == [1, 2, 3, 4, 5, 6]
+    assert np.allclose(df["TestTime"], [0.0, 1.0, 2.0, 62.0, 63.0, 64.0])
+    assert df["CycleNumProc"].tolist() == [0, 1, 1, 1, 2, 2]
+
+
+def test_iter_file_series_chunks(tmp_path):
+    records = [(rec, 0, float(rec), 0, rec) for rec in range(1, 11)]
+    first = write_file(tmp_path / "test.024", records)
+    second = write_file(tmp_path / "test.025", [(1, 0, 0.0, 0, 30)])
+    chunks = list(
+        iter_file_series(
+            [first, second], frmt=MaccorDataFormat.mims_server2, chunksize=3
+        )
+    )
+    assert [len(chunk) for chunk in chunks] == [3, 3, 3, 1, 1]
+    assert chunks[-1]["RecNum"].tolist() == [11]
+    assert np.isclose(chunks[-1]["TestTime"].iloc[0], 30.0)
+
+
+def test_iter_file_series_opens_files_lazily(tmp_path, monkeypatch):
+    active, max_active = [0], [0]
+
+    class CountingReader(stitch.MaccorDataTxtFile):
+        def iter_chunks(self, chunksize=100_000):
+            active[0] += 1
+            max_active[0] = max(max_active[0], active[0])
+            try:
+                yield from super().iter_chunks(chunksize=chunksize)
+            finally:
+                active[0] -= 1
+
+    monkeypatch.setattr(stitch, "MaccorDataTxtFile", CountingReader)
+    paths = [
+        write_file(tmp_path / f"test.{number:03d}", [(minute, 0, 0.0, minute, 0)])
+        for number, minute in [(25, 2), (24, 1), (26, 3)]
+    ]
+    frmt = MaccorDataFormat.mims_server2
+    assert stitch.order_file_series(paths, frmt) == [paths[1], paths[0], paths[2]]
+    assert len(list(stitch.iter_file_series(paths, frmt, chunksize=1))) == 3
+    assert (max_active[0], active[0]) == (1, 0)
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from maccor_utility.metrics import ReadMetrics
+from maccor_utility.read import MaccorDataFormat, read_maccor_data_file
+from maccor_utility.synthetic import (
+    END_OF_STEP,
+    SyntheticRawFile,
+    generate_records,
+    write_synthetic_file,
+)
+
+
+def test_generate_records_deterministic():
+    records = generate_records(2_500, seed=3, step_records=100)
+    assert records.equals(generate_records(2_500, seed=3, step_records=100))
+    assert not records.equals(generate_records(2_500, seed=4, step_records=100))
+    assert records["RecNum"].tolist() == list(range(1, 2_501))
+    assert set(records["Mode"]) == {"R", "C", "D"}
+    assert records["CycleNumProc"].iloc[-1] == 6
+    assert (records["EndCode"] == END_OF_STEP).sum() == 25
+    assert records["Voltage"].between(2.5, 4.5).all()
+    with pytest.raises(ValueError):
+        generate_records(-1)
+
+
+@pytest.mark.parametrize(
+    "frmt", [frmt for frmt in MaccorDataFormat if frmt != MaccorDataFormat.raw]
+)
+def test_synthetic_text_files(tmp_path, frmt):
+    file_path = write_synthetic_file(tmp_path / "test.txt", frmt, 1_000, seed=1)
+    content = file_path.read_bytes()
+    write_synthetic_file(tmp_path / "test.txt", frmt, 1_000, seed=1)
+    assert file_path.read_bytes() == content
+    result = read_maccor_data_file(file_path, frmt=frmt)
+    df = result.data.as_dataframe
+    assert len(df) == 1_000
+    records = generate_records(1_000, seed=1)
+    assert np.allclose(df["Voltage"], records["Voltage"], atol=1e-4)
+
+
+def test_synthetic_raw_file(tmp_path):
+    file_path = write_synthetic_file(
+        tmp_path / "test.024", MaccorDataFormat.raw, 1_500, seed=2
+    )
+    metrics = ReadMetrics()
+    meta = SyntheticRawFile(file_path, metrics=metrics).read_meta()
+    assert meta["Header data"]["LastRecNum"] == 1_500
+    assert meta["Test procedure"].value == "Synthetic.000"
+    assert "LoadAndGetNextTimeData" not in metrics.calls
+
+    file = SyntheticRawFile(file_path, metrics=metrics).read()
+    df = file.data.as_dataframe
+    records = generate_records(1_500, seed=2)
+    assert len(df) == 1_500
+    assert df["RecNum"].tolist() == records["RecNum"].tolist()
+    assert np.allclose(df["Voltage"], records["Voltage"], atol=1e-5)
+    assert np.allclose(df["DPtTime"], records["DPtTime"])
+    assert metrics.calls["LoadAndGetNextTimeData"] == 1_501
+    assert metrics.num_errors == 0
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+from maccor_utility.read import MaccorDataFormat, iter_maccor_data_file
+from maccor_utility.validate import validate, validate_chunks
+
+
+def get_time_series():
+    return pd.DataFrame(
+        {
+            "RecNum": [1, 2, 3, 5, 5, 6, 7, 2],
+            "TestTime": [0.0, 1.0, 2.0, 3.0, 2.5, 4.0, 5.0, 6.0],
+            "Voltage": [3.0, 3.0, np.nan, 4.5, 3.0, 3.0, np.inf, 3.0],
+        }
+    )
+
+
+def test_validate():
+    report = validate(get_time_series(), voltage_range=(2.5, 4.2))
+    assert not report.ok
+    assert report.num_records == 8
+    assert report.violations["RecNum gap"].ranges == [(3, 3)]
+    assert report.violations["Duplicate RecNum"].ranges == [(4, 4), (7, 7)]
+    assert report.violations["TestTime decreasing"].ranges == [(4, 4)]
+    assert report.violations["Not finite: Voltage"].count == 2
+    assert report.violations["Voltage out of range"].ranges == [(3, 3), (6, 6)]
+
+
+def test_validate_chunks():
+    df = get_time_series()
+    chunked = validate_chunks(
+        [df.iloc[:3], df.iloc[3:5], df.iloc[5:]], voltage_range=(2.5, 4.2)
+    )
+    assert chunked == validate(df, voltage_range=(2.5, 4.2))
+
+
+def test_validate_text_file(mims_server2_file):
+    report = validate_chunks(
+        iter_maccor_data_file(
+            mims_server2_file, frmt=MaccorDataFormat.mims_server2, chunksize=2
+        )
+    )
+    assert report.ok
+    assert report.num_records == 4
+
+
+def test_validate_corrupt_rec_num():
+    df = get_time_series()
+    df.loc[3, "RecNum"] = 2**62  # Must not allocate memory by the largest RecNum
+    chunked = validate_chunks([df.iloc[:4], df.iloc[4:]])
+    assert chunked.violations["Duplicate RecNum"].ranges == [(7, 7)]
+
+
+def test_validate_chunks_rec_num_not_monotonic():
+    df = pd.DataFrame({"RecNum": [1, 2, 3, 10, 4, 2, 11, 10, 4, 5, 1]})
+    chunks = [df.iloc[:4], df.iloc[4:8], df.iloc[8:9], df.iloc[9:]]
+    report = validate_chunks(chunks)
+    assert report.violations["Duplicate RecNum"].ranges == [(5, 5), (7, 8), (10, 10)]
+    assert report == validate(df)
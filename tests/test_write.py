@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from maccor_utility.read import MaccorDataFormat, MaccorDataTxtFile
+from maccor_utility.write import (
+    delphi_to_strings,
+    write_maccor_text_chunks,
+    write_maccor_text_file,
+)
+
+TEXT_FORMATS = [frmt for frmt in MaccorDataFormat if frmt != MaccorDataFormat.raw]
+
+
+def get_records(num_records=20):
+    return pd.DataFrame(
+        {
+            "RecNum": np.arange(1, num_records + 1),
+            "CycleNumProc": np.arange(num_records) // 10,
+            "StepNum": np.ones(num_records, dtype=int),
+            "TestTime": np.arange(num_records) * 1.5,
+            "Current": np.linspace(-1.0, 1.0, num_records),
+            "Voltage": np.linspace(3.0, 4.2, num_records),
+            "DPtTime": 45200.5 + np.arange(num_records) / 86400,
+        }
+    )
+
+
+@pytest.mark.parametrize("frmt", TEXT_FORMATS)
+def test_write_maccor_text_file_round_trip(tmp_path, frmt):
+    df = get_records()
+    df.loc[3, "Voltage"] = np.nan
+    path = write_maccor_text_file(df, tmp_path / f"{frmt.name}.txt", frmt=frmt)
+    result = MaccorDataTxtFile(file_path=path, export_format=frmt).read()
+    data = result.data.as_dataframe
+    assert data["RecNum"].tolist() == df["RecNum"].tolist()
+    assert data["CycleNumProc"].tolist() == df["CycleNumProc"].tolist()
+    for col in ["TestTime", "Current", "Voltage"]:
+        assert np.allclose(data[col], df[col], equal_nan=True)
+    assert data["DPtTime"].iloc[1] == "10/01/2023 12:00:01"
+
+
+def test_write_maccor_text_chunks_decimals(tmp_path):
+    df = get_records(num_records=5)
+    path = write_maccor_text_chunks(
+        [df[:2], df[2:]],
+        tmp_path / "export.txt",
+        frmt=MaccorDataFormat.maccor_export2,
+        decimals=3,
+    )
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert lines[-1] == "5\t0\t1\t6,000\t1,000\t4,200\t10/01/2023 12:00:04"
+    assert lines[-4].split("\t")[4] == "-0,500"
+    assert len(lines) == 3 + 5  # Two header lines and the column names
+
+
+def test_delphi_to_strings():
+    days = np.array([45200.5, 45200.5 + 3661 / 86400, np.nan])
+    assert delphi_to_strings(days).tolist() == [
+        "10/01/2023 12:00:00",
+        "10/01/2023 13:01:01",
+        "",
+    ]